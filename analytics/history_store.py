@@ -0,0 +1,296 @@
+"""游戏历史的持久化：预写日志 + 原子替换的快照
+
+每局结束时只向日志文件追加一行（序号、CRC32校验和、JSON记录），由后台线程写盘，
+游戏主循环不等待磁盘；日志积累到一定条数后，把完整的历史写成快照文件（先写临时文件、
+fsync，再原子替换），然后清空日志。
+
+加载时先读快照，再重放日志中序号更大的记录；写到一半的日志行（校验和不符）被跳过。
+快照损坏时从中尽量挑出完整的记录，原文件改名保留（.corrupt），然后重新生成快照。
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+# fsync策略：always 每条记录都fsync；batch 每批记录（写完当前队列中的所有记录）fsync一次；
+# off 不主动fsync，由操作系统决定何时落盘
+FSYNC_POLICIES = ("always", "batch", "off")
+
+
+def _fsync_directory(directory):
+    """fsync目录，保证其中的重命名已落盘（Windows不支持，忽略）"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _encode_line(seq, record):
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return f"{seq} {zlib.crc32(payload.encode('utf-8')):08x} {payload}\n"
+
+
+def _decode_line(line):
+    """解析一行日志，返回(序号, 记录)；行不完整或校验和不符时返回None"""
+    parts = line.rstrip("\n").split(" ", 2)
+    if len(parts) != 3 or not line.endswith("\n"):
+        return None
+    seq, crc, payload = parts
+    try:
+        if int(crc, 16) != zlib.crc32(payload.encode("utf-8")):
+            return None
+        record = json.loads(payload)
+        return int(seq), record
+    except ValueError:
+        return None
+
+
+def salvage_records(text):
+    """从损坏的快照文本中挑出所有完整的游戏记录（包含date和score的JSON对象）
+
+    依次解码每个对象，遇到无法解码的位置时跳到下一个 '{' 继续，因此截断或中间损坏的文件
+    都能保留其余完整的记录。
+    """
+    decoder = json.JSONDecoder()
+    records = []
+    start = text.find("[")
+    index = text.find("{", start + 1 if start >= 0 else 0)
+    while index >= 0:
+        try:
+            record, end = decoder.raw_decode(text, index)
+        except ValueError:
+            index = text.find("{", index + 1)
+            continue
+        if isinstance(record, dict) and "date" in record and "score" in record:
+            records.append(record)
+            index = text.find("{", end)
+        else:
+            # 快照的外层对象或记录中嵌套的对象：继续在其内部查找
+            index = text.find("{", index + 1)
+    return records
+
+
+class HistoryStore:
+    """游戏历史的持久化存储：load()加载，append()异步追加，close()写完并停止后台线程"""
+
+    def __init__(self, directory, name="game_history", limit=100, fsync="batch", compact_every=20):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"未知的fsync策略: {fsync}（可选 {', '.join(FSYNC_POLICIES)}）")
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, name + ".json")
+        self.log_path = os.path.join(directory, name + ".wal")
+        self.limit = limit  # 保留的记录条数
+        self.fsync = fsync
+        self.compact_every = compact_every  # 日志积累多少条记录后生成新快照
+
+        self.seq = 0  # 最后一条记录的序号
+        self.records = []
+        self.log_count = 0  # 日志中的记录条数
+        self.recovered = 0  # 加载时从损坏文件中挽救的记录数
+        self.dropped_lines = 0  # 加载时跳过的不完整日志行数
+
+        self.queue = queue.Queue()
+        self.error = None  # 后台线程最近一次写盘错误
+        self.thread = None
+
+    def load(self):
+        """加载历史记录（快照 + 日志），需要时修复文件并启动后台写线程
+
+        返回的记录列表就是records本身，之后由append()原地追加和裁剪。
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as error:
+            self._write_failed(error)
+        snapshot_seq, records, damaged = self._load_snapshot()
+        replayed = self._load_log(snapshot_seq, records)
+        self.seq = max(snapshot_seq, replayed)
+        self.records = records[-self.limit:]
+        if damaged or self.log_count or self.dropped_lines:
+            # 把日志合并进快照；损坏的快照已改名保留。写盘失败时仍返回已加载的记录，
+            # 日志保留不动，下次加载或压缩时再合并
+            try:
+                self._write_snapshot(self.seq, self.records)
+                self._truncate_log()
+                self.log_count = 0
+            except OSError as error:
+                self._write_failed(error)
+        self._start()
+        return self.records
+
+    def _load_snapshot(self):
+        """返回(快照序号, 记录列表, 是否损坏)"""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return 0, [], False
+        except (OSError, UnicodeDecodeError) as error:
+            print(f"无法读取游戏历史 {self.snapshot_path}: {error}")
+            return 0, [], False
+        try:
+            data = json.loads(text)
+            if isinstance(data, list):
+                # 旧格式：只有记录数组，迁移为带序号的快照
+                return len(data), data, True
+            return data["seq"], data["games"], False
+        except (ValueError, KeyError, TypeError):
+            pass
+        records = salvage_records(text)
+        self.recovered = len(records)
+        backup = f"{self.snapshot_path}.corrupt-{time.strftime('%Y%m%d%H%M%S')}"
+        try:
+            os.replace(self.snapshot_path, backup)
+        except OSError:
+            pass
+        print(f"游戏历史文件已损坏，挽救了 {len(records)} 条记录，原文件保存为 {backup}")
+        return len(records), records, True
+
+    def _load_log(self, snapshot_seq, records):
+        """重放日志中序号大于快照的记录，返回最后的序号"""
+        last = snapshot_seq
+        try:
+            with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return last
+        except OSError as error:
+            print(f"无法读取游戏历史日志 {self.log_path}: {error}")
+            return last
+        for line in lines:
+            entry = _decode_line(line)
+            if entry is None:
+                self.dropped_lines += 1
+                continue
+            seq, record = entry
+            self.log_count += 1
+            if seq > last:
+                records.append(record)
+                last = seq
+        return last
+
+    def append(self, record):
+        """追加一条记录：立即加入records（超过limit时原地删除最旧的），写盘由后台线程完成"""
+        self.seq += 1
+        self.records.append(record)
+        if len(self.records) > self.limit:
+            del self.records[:-self.limit]
+        self.log_count += 1
+        self.queue.put(("append", self.seq, record))
+        if self.log_count >= self.compact_every:
+            self.queue.put(("compact", self.seq, list(self.records)))
+            self.log_count = 0
+
+    def flush(self, timeout=None):
+        """等待后台线程写完目前为止的所有记录，返回是否在超时前完成"""
+        if self.thread is None:
+            return True
+        if not self.thread.is_alive():
+            return False  # 后台线程已经意外退出，不会再处理请求
+        done = threading.Event()
+        self.queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def close(self):
+        """写完剩余的记录后停止后台线程"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def _write_loop(self):
+        log = None
+        try:
+            while True:
+                # 取出队列中所有待处理的操作作为一批
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                pending_sync = False
+                stop = False
+                waiting = []  # 本批中的flush请求：整批写完（包括fsync）后才通知
+                try:
+                    for item in batch:
+                        if item is None:
+                            stop = True
+                            continue
+                        op, value, payload = item
+                        if op == "flush":
+                            waiting.append(value)
+                            continue
+                        try:
+                            if op == "append":
+                                if log is None:
+                                    log = open(self.log_path, "a", encoding="utf-8")
+                                log.write(_encode_line(value, payload))
+                                if self.fsync == "always":
+                                    log.flush()
+                                    os.fsync(log.fileno())
+                                else:
+                                    pending_sync = True
+                            elif op == "compact":
+                                if log is not None:
+                                    log.close()
+                                    log = None
+                                self._write_snapshot(value, payload)
+                                self._truncate_log()
+                        except OSError as error:
+                            self._write_failed(error)
+                    if log is not None and pending_sync:
+                        try:
+                            log.flush()
+                            if self.fsync == "batch":
+                                os.fsync(log.fileno())
+                        except OSError as error:
+                            self._write_failed(error)
+                finally:
+                    # 即使写盘出错也要通知等待者，否则flush()会一直等下去
+                    for done in waiting:
+                        done.set()
+                if stop:
+                    break
+        finally:
+            if log is not None:
+                log.close()
+
+    def _write_failed(self, error):
+        """记录写盘错误（后台线程继续处理之后的记录）"""
+        self.error = error
+        print(f"无法保存游戏历史: {error}")
+
+    def _write_snapshot(self, seq, records):
+        """写入临时文件并fsync后原子替换快照文件"""
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "games": records}, f, ensure_ascii=False)
+            f.flush()
+            if self.fsync != "off":
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        if self.fsync != "off":
+            _fsync_directory(self.directory)
+
+    def _truncate_log(self):
+        with open(self.log_path, "w", encoding="utf-8"):
+            pass
@@ -1,10 +1,10 @@
-import json
 import os
 import time
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg
 import pygame
-import numpy as np
+from analytics.history_store import HistoryStore
+from core import events
+from utils.assets import assets
+from utils.settings import settings_store
 
 class GameStatistics:
     def __init__(self):
@@ -16,14 +16,21 @@ class GameStatistics:
         }
         
         # 确保数据目录存在
-        self.data_dir = os.path.join("d:\\Github Doc\\tetris-common", "data")
+        self.data_dir = settings_store.current.data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # 历史数据文件
-        self.history_file = os.path.join(self.data_dir, "game_history.json")
+        # 历史数据：预写日志加快照，每局结束时由后台线程追加写盘
+        self.store = HistoryStore(self.data_dir, limit=100, fsync=settings_store.current.history_fsync)
+        self.history_file = self.store.snapshot_path
         
-        # 加载历史数据
-        self.history = self._load_history()
+        # 在后台加载历史数据，第一次用到时才等待
+        self._history_asset = f"statistics.history:{id(self)}"
+        assets.submit(self._history_asset, self.store.load)
+    
+    @property
+    def history(self):
+        """历史记录列表（与存储共享），还没加载完时等待加载"""
+        return assets.get(self._history_asset)
     
     def update(self, lines_cleared, block_type):
         """更新当前游戏统计数据"""
@@ -35,6 +42,13 @@ class GameStatistics:
             self.current_stats["block_types"][block_type] = 0
         self.current_stats["block_types"][block_type] += 1
     
+    def handle_event(self, kind, tick, a, b, c):
+        """游戏事件的订阅者：方块固定时累计本局数据，游戏结束时保存记录"""
+        if kind == events.PIECE_LOCKED:
+            self.update(b, a)
+        elif kind == events.GAME_OVER:
+            self.save_game_data(a, b, c)
+    
     def save_game_data(self, score, level, mode):
         """保存游戏结束时的数据"""
         game_duration = time.time() - self.current_stats["start_time"]
@@ -51,11 +65,9 @@ class GameStatistics:
             "block_types": self.current_stats["block_types"]
         }
         
-        # 添加到历史记录
-        self.history.append(game_record)
-        
-        # 保存历史记录
-        self._save_history()
+        # 添加到历史记录（self.history与存储共享），写盘在后台进行，不阻塞游戏主循环
+        assets.get(self._history_asset)  # 确保历史已经加载（append写入的就是这个列表）
+        self.store.append(game_record)
         
         # 重置当前游戏统计
         self.current_stats = {
@@ -69,6 +81,11 @@ class GameStatistics:
     
     def generate_statistics_surface(self, width, height):
         """生成包含游戏统计图表的pygame surface"""
+        # matplotlib导入很慢（约0.4秒），只在需要绘制图表时才导入，不拖慢游戏启动
+        import matplotlib.pyplot as plt
+        import numpy as np
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        
         # 创建matplotlib图表
         fig, axs = plt.subplots(2, 2, figsize=(10, 8))
         fig.patch.set_facecolor('#333333')  # 设置背景色
@@ -223,22 +240,3 @@ class GameStatistics:
             # 返回最近的几局（按日期倒序）
             sorted_games = sorted(self.history, key=lambda x: x.get("date", ""), reverse=True)
             return sorted_games[:limit]
-    
-    def _load_history(self):
-        """加载历史数据"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    def _save_history(self):
-        """保存历史数据"""
-        # 限制历史记录数量
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
-            
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f)
@@ -0,0 +1,224 @@
+"""逐个方块的遥测：记录每个方块的出现和固定时间、旋转、壁踢、下落距离、空洞和堆叠高度
+
+TelemetryRecorder 作为游戏事件的订阅者（见core/events.py），按列追加到 array 模块的紧凑数组中，
+每 batch_size 个方块把这一批交给后台线程写盘。每局一个文件，格式与 numpy.savez 兼容（zip中的
+.npy 成员）：每批数据写为一组 "列名.批次号.npy"，追加到同一个文件中，另有 meta.json 记录模式、
+游戏板尺寸和结束时的分数。load() 把各批拼接为完整的列（iter_batches() 逐批读取），summarize() 用向量运算汇总一局。
+
+空洞数和堆叠高度由游戏在方块固定（并消行）时测量，随PIECE_LOCKED事件发出：订阅者处理事件时游戏板
+可能已经变化（例如对战模式在on_lock中加入的垃圾行）。只有挂接了记录器的游戏才测量，其余游戏没有这部分开销。
+"""
+import atexit
+import io
+import itertools
+import json
+import os
+import time
+import zipfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from core import events
+
+# 列名和array类型码
+COLUMNS = (
+    ("spawn_ms", "q"),  # 方块出现的时间（游戏时钟，毫秒）
+    ("lock_ms", "q"),  # 方块固定的时间
+    ("piece", "b"),  # 单元格值：正数为颜色（方块形状），负数为特殊方块
+    ("rotations", "H"),  # 成功的旋转次数
+    ("kicks", "H"),  # 其中需要壁踢的次数
+    ("kick_mask", "B"),  # 用到的壁踢平移，第i位对应 core.game.KICK_OFFSETS[i]
+    ("drop_distance", "h"),  # 从出现到固定下落的行数
+    ("hard_drop", "B"),  # 是否硬降
+    ("lines_cleared", "B"),  # 固定后消除的行数
+    ("holes", "H"),  # 固定（并消行）后游戏板上的空洞数
+    ("holes_created", "h"),  # 与上一个方块固定后相比空洞数的变化
+    ("stack_height", "H"),  # 固定后的堆叠高度（行）
+)
+
+
+# 文件序号：同一进程中的多个记录器（例如批量模拟）在同一秒开始的局也不会重名
+_file_numbers = itertools.count()
+
+
+def _write_batch(path, batch, columns):
+    """把一批列数据作为 "列名.批次号.npy" 追加到文件中（在写线程中运行）"""
+    import numpy as np
+    with zipfile.ZipFile(path, "a", zipfile.ZIP_STORED) as archive:
+        for (name, _), values in zip(COLUMNS, columns):
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, np.frombuffer(values, dtype=values.typecode))
+            archive.writestr(f"{name}.{batch:05d}.npy", buffer.getvalue())
+
+
+def _write_meta(path, meta):
+    with zipfile.ZipFile(path, "a", zipfile.ZIP_STORED) as archive:
+        archive.writestr("meta.json", json.dumps(meta, ensure_ascii=False))
+
+
+class TelemetryRecorder:
+    """遥测记录器：game.add_subscriber(recorder.handle_event) 后自动逐局记录"""
+
+    def __init__(self, game, directory, batch_size=256):
+        self.game = game
+        self.directory = directory
+        self.batch_size = batch_size
+        self.path = None  # 当前这一局的文件
+        self.meta = None
+        self.batch = 0
+        self.pieces = 0  # 当前这一局已记录的方块数
+        self.columns = self._new_columns()
+        self.last_holes = 0
+        self.files = []  # 已经开始写的文件
+        self._executor = None
+        self.error = None  # 写线程最近一次的错误
+        game.measure_stack_on_lock = True  # 让游戏在方块固定时测量空洞和堆叠高度
+        atexit.register(self.close)
+
+    def _new_columns(self):
+        return [array(typecode) for _, typecode in COLUMNS]
+
+    def handle_event(self, kind, tick, a, b, c):
+        """游戏事件的订阅者"""
+        if kind == events.PIECE_LOCKED:
+            self._record_piece(tick, b, c)
+        elif kind == events.GAME_START:
+            self._start_game(a)
+        elif kind == events.GAME_OVER:
+            self._finish_game({"score": a, "level": b, "game_over": True})
+
+    def _start_game(self, mode):
+        self._finish_game({"game_over": False})
+        board = self.game.board
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.directory, f"telemetry-{stamp}-{os.getpid()}-{next(_file_numbers)}-{mode}.npz")
+        self.meta = {"version": 1, "mode": mode, "board": [board.width, board.height],
+                     "started": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.batch = 0
+        self.pieces = 0
+        self.last_holes = 0
+
+    def _record_piece(self, lock_ms, lines_cleared, piece):
+        if self.path is None:
+            self._start_game(self.game.mode)
+        spawn_ms, cell_value, rotations, kicks, kick_mask, drop_distance, hard_drop, holes, height = piece
+        values = (spawn_ms, lock_ms, cell_value, rotations, kicks, kick_mask, drop_distance,
+                  hard_drop, lines_cleared, holes, holes - self.last_holes, height)
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        self.last_holes = holes
+        self.pieces += 1
+        if len(self.columns[0]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """把当前这一批交给写线程"""
+        if self.path is None or not len(self.columns[0]):
+            return
+        if self._executor is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry")
+        if self.batch == 0:
+            self.files.append(self.path)
+        self._submit(_write_batch, self.path, self.batch, self.columns)
+        self.columns = self._new_columns()
+        self.batch += 1
+
+    def _submit(self, writer, *args):
+        future = self._executor.submit(writer, *args)
+        future.add_done_callback(self._check_write)
+
+    def _check_write(self, future):
+        error = future.exception()
+        if error is not None:
+            self.error = error
+            print(f"无法保存遥测数据: {error}")
+
+    def _finish_game(self, result):
+        """写完当前这一局（没有记录任何方块的局不生成文件）"""
+        if self.path is None:
+            return
+        self.flush()
+        if self.batch:
+            self.meta.update(result, pieces=self.pieces)
+            self._submit(_write_meta, self.path, self.meta)
+        self.path = None
+
+    def close(self):
+        """写完当前这一局并等待写线程完成"""
+        self._finish_game({"game_over": False})
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def read_meta(path):
+    """读取遥测文件的meta.json（写到一半的文件没有时返回空字典）"""
+    with zipfile.ZipFile(path) as archive:
+        try:
+            return json.loads(archive.read("meta.json"))
+        except KeyError:
+            return {}
+
+
+def iter_batches(path):
+    """按批读取遥测文件，每次产生 {列名: numpy数组}，内存占用只与批大小有关"""
+    import numpy as np
+    with zipfile.ZipFile(path) as archive:
+        batches = {}
+        for member in archive.namelist():
+            parts = member.split(".")
+            if len(parts) == 3 and parts[2] == "npy":
+                batches.setdefault(parts[1], set()).add(parts[0])
+        for batch in sorted(batches):
+            columns = {}
+            for name, typecode in COLUMNS:
+                if name in batches[batch]:
+                    with archive.open(f"{name}.{batch}.npy") as f:
+                        columns[name] = np.lib.format.read_array(f)
+                else:
+                    columns[name] = np.zeros(0, dtype=typecode)
+            # 写到一半的文件各列长度可能不同：截到最短的
+            length = min(len(values) for values in columns.values())
+            yield {name: values[:length] for name, values in columns.items()}
+
+
+def load(path):
+    """读取一局的遥测文件，返回(meta, {列名: numpy数组})；各批按顺序拼接"""
+    import numpy as np
+    batches = list(iter_batches(path))
+    columns = {name: np.concatenate([batch[name] for batch in batches]) if batches
+               else np.zeros(0, dtype=typecode)
+               for name, typecode in COLUMNS}
+    return read_meta(path), columns
+
+
+def summarize(columns):
+    """用向量运算汇总一局的遥测：节奏、旋转和壁踢、空洞和堆叠高度"""
+    import numpy as np
+    pieces = len(columns["lock_ms"])
+    if not pieces:
+        return {"pieces": 0}
+    lock_ms = columns["lock_ms"]
+    piece_ms = (lock_ms - columns["spawn_ms"]).astype(np.float64)
+    duration = (lock_ms[-1] - columns["spawn_ms"][0]) / 1000
+    kick_mask = columns["kick_mask"].astype(np.uint8)
+    # 每种壁踢平移被用到的方块数：把位掩码展开为 方块数 x 7 的0/1矩阵后按列求和
+    kick_bits = (kick_mask[:, None] >> np.arange(7, dtype=np.uint8)) & 1
+    return {
+        "pieces": pieces,
+        "pieces_per_minute": pieces / duration * 60 if duration > 0 else 0.0,
+        "piece_ms": {"mean": float(piece_ms.mean()),
+                     "p50": float(np.percentile(piece_ms, 50)),
+                     "p90": float(np.percentile(piece_ms, 90))},
+        "rotations_per_piece": float(columns["rotations"].mean()),
+        "kick_rate": float((columns["kicks"] > 0).mean()),
+        "kick_usage": kick_bits.sum(axis=0).tolist(),
+        "hard_drop_rate": float(columns["hard_drop"].mean()),
+        "drop_distance_mean": float(columns["drop_distance"].mean()),
+        "lines_per_piece": float(columns["lines_cleared"].mean()),
+        "holes_created": int(np.clip(columns["holes_created"], 0, None).sum()),
+        "holes_max": int(columns["holes"].max()),
+        "stack_height_mean": float(columns["stack_height"].mean()),
+        "stack_height_max": int(columns["stack_height"].max()),
+    }
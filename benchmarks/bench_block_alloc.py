@@ -0,0 +1,156 @@
+"""方块分配基准测试：使用tracemalloc对比旧实现（__dict__ + deepcopy）与新实现（__slots__ + 对象池）
+
+运行方式：python benchmarks/bench_block_alloc.py
+"""
+import os
+import random
+import sys
+import tracemalloc
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blocks.base_block import Block
+from blocks.block_factory import BlockFactory
+
+
+class LegacyBlock:
+    """旧版方块实现的复制品：每个实例带__dict__，形状为可变列表"""
+
+    def __init__(self, x, y, shape, color, block_type="normal"):
+        self.x = x
+        self.y = y
+        self.shape = shape
+        self.color = color
+        self.type = block_type
+        self.rotation = 0
+
+    def __deepcopy__(self, memo):
+        result = LegacyBlock(self.x, self.y, deepcopy(self.shape, memo), self.color, self.type)
+        result.rotation = self.rotation
+        return result
+
+
+MOVES_PER_PIECE = 20  # 每个方块生命周期内的移动次数（每次移动都会更新幽灵方块）
+
+
+def _legacy_piece_cycle(factory, keep=None):
+    """旧流程：新建方块，每次移动深拷贝出幽灵方块
+
+    keep不为None时把产生的每个方块都留在其中，使临时对象在快照比较中可见。
+    """
+    key = random.choice(list(factory.shapes.keys()))
+    block = LegacyBlock(4, 0, factory.shapes[key], factory.colors[key])
+    block.gravity_accumulator = 0  # 旧版物理引擎会动态添加该属性
+    ghost = None
+    for _ in range(MOVES_PER_PIECE):
+        ghost = deepcopy(block)
+        if keep is not None:
+            keep.append(ghost)
+    if keep is not None:
+        keep.append(block)
+    return block, ghost
+
+
+def _pooled_piece_cycle(factory, state, keep=None):
+    """新流程：从对象池取方块，幽灵方块复用同一实例"""
+    block = factory.create_block("classic")
+    ghost = state.get("ghost")
+    for _ in range(MOVES_PER_PIECE):
+        if ghost is None:
+            ghost = factory.pool.acquire_copy(block)
+        else:
+            ghost.copy_from(block)
+        if keep is not None:
+            keep.append(ghost)
+    state["ghost"] = ghost
+    factory.pool.release(block)
+    if keep is not None:
+        keep.append(block)
+    return block, ghost
+
+
+def measure_instance_bytes(make, count=10000):
+    """测量单个方块实例占用的字节数（保留count个实例后取平均）"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [make() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # 扣除列表自身的开销
+    diff -= sys.getsizeof(keep)
+    return diff / count
+
+
+def measure_allocations(cycle, pieces=2000):
+    """测量每个方块生命周期分配的内存块数：cycle(keep)把产生的对象留在keep中，比较前后快照的count_diff"""
+    keep = []
+    keep_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(keep_filter)
+    for _ in range(pieces):
+        cycle(keep)
+    after = tracemalloc.take_snapshot().filter_traces(keep_filter)
+    tracemalloc.stop()
+    # keep列表自身只是扩容（realloc不改变块数），计入的都是cycle中新分配的对象
+    count = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return count / pieces
+
+
+def measure_piece_cycles(cycle, pieces=2000):
+    """测量每个方块生命周期的峰值瞬时内存和分配次数"""
+    allocations = measure_allocations(cycle, pieces)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    peak_per_piece = 0
+    for _ in range(pieces):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        cycle(None)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_per_piece = max(peak_per_piece, peak - start)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "allocations_per_piece": allocations,
+        "peak_bytes_per_piece": peak_per_piece,
+        "retained_bytes": current - base
+    }
+
+
+def run(pieces=2000):
+    """运行基准测试，返回结果字典"""
+    random.seed(0)
+    factory = BlockFactory()
+    shape = factory.shapes["T"]
+
+    legacy_bytes = measure_instance_bytes(lambda: LegacyBlock(4, 0, shape, 6))
+    slots_bytes = measure_instance_bytes(lambda: Block(4, 0, shape, 6))
+
+    # 旧流程：每个方块 1 次生成 + 每次移动 1 次深拷贝
+    legacy = measure_piece_cycles(lambda keep: _legacy_piece_cycle(factory, keep), pieces)
+
+    state = {}
+    # 先走一轮，让对象池和幽灵方块就绪（稳态下不应再有分配）
+    _pooled_piece_cycle(factory, state)
+    pooled = measure_piece_cycles(lambda keep: _pooled_piece_cycle(factory, state, keep), pieces)
+
+    return {
+        "legacy": dict(legacy, bytes_per_instance=legacy_bytes),
+        "pooled": dict(pooled, bytes_per_instance=slots_bytes)
+    }
+
+
+def main():
+    results = run()
+    print(f"{'':<10}{'bytes/实例':>14}{'分配/方块':>14}{'峰值字节/方块':>18}")
+    for name in ("legacy", "pooled"):
+        r = results[name]
+        print(f"{name:<10}{r['bytes_per_instance']:>14.1f}"
+              f"{r['allocations_per_piece']:>14.2f}{r['peak_bytes_per_piece']:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""游戏板快照/增量编码基准：编解码吞吐量和每次更新的字节数
+
+编解码耗时注册到 run.py；直接运行本文件打印各种游戏板的编码大小：
+    python benchmarks/bench_board_codec.py
+"""
+import json
+import random
+import sys
+
+from harness import benchmark, timer
+from bench_core import make_board
+
+from blocks.block_factory import BlockFactory
+from core import board_codec
+from core.board import Board
+from physics.engine import PhysicsEngine
+
+
+def _placed_board(kind):
+    """返回(游戏板, 放置前的版本号)：在kind游戏板上放置一个方块并消除所有满行"""
+    board = make_board(kind)
+    base = board.version
+    factory = BlockFactory()
+    physics = PhysicsEngine()
+    random.seed(0)
+    block = factory.create_block("classic")
+    block.move(0, physics.drop_distance(block, board))
+    board.place_block(block)
+    board.clear_lines()
+    return board, base
+
+
+@benchmark("board_codec.encode_snapshot[dense]")
+def bench_encode_snapshot(loops):
+    board = make_board("dense")
+    encode = board_codec.encode_snapshot
+    start = timer()
+    for _ in range(loops):
+        encode(board)
+    return timer() - start
+
+
+@benchmark("board_codec.decode_snapshot[dense]")
+def bench_decode_snapshot(loops):
+    data = board_codec.encode_snapshot(make_board("dense"))
+    decode = board_codec.decode_snapshot
+    start = timer()
+    for _ in range(loops):
+        decode(data)
+    return timer() - start
+
+
+@benchmark("board_codec.encode_delta[place]")
+def bench_encode_delta(loops):
+    board, base = _placed_board("sparse")
+    encode = board_codec.encode_delta
+    start = timer()
+    for _ in range(loops):
+        encode(board, base)
+    return timer() - start
+
+
+@benchmark("board_codec.apply_delta[place]")
+def bench_apply_delta_place(loops):
+    board, base = _placed_board("sparse")
+    data = board_codec.encode_delta(board, base)
+    mirror = make_board("sparse")
+    apply = board_codec.apply_delta
+    start = timer()
+    for _ in range(loops):
+        # 放置方块的变更是写入绝对值，回退版本号即可重复应用
+        mirror.version = base
+        apply(mirror, data)
+    return timer() - start
+
+
+@benchmark("board_codec.apply_delta[clear]")
+def bench_apply_delta_clear(loops):
+    """消行会移动行，每次都要恢复游戏板；恢复本身的耗时单独测量后扣除"""
+    board, base = _placed_board("multi")
+    data = board_codec.encode_delta(board, base)
+    template = make_board("multi").grid
+    mirror = Board(10, 20)
+
+    start = timer()
+    for _ in range(loops):
+        mirror.grid = [row[:] for row in template]
+        mirror.version = base
+    restore = timer() - start
+
+    apply = board_codec.apply_delta
+    start = timer()
+    for _ in range(loops):
+        mirror.grid = [row[:] for row in template]
+        mirror.version = base
+        apply(mirror, data)
+    return max(0.0, timer() - start - restore)
+
+
+def update_sizes(width, height, pieces, seed=0):
+    """模拟一局随机放置方块的游戏，返回每放置一个方块的增量字节数和快照字节数"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    board = Board(width, height)
+    factory = BlockFactory(board_width=width)
+    physics = PhysicsEngine()
+    deltas = []
+    snapshots = []
+    for _ in range(pieces):
+        block = factory.create_block("challenge")
+        block.rotation = rng.randrange(4)
+        block.x = rng.randrange(width)
+        if not physics.is_valid_position(block, board):
+            block.x = factory.spawn_x
+            block.rotation = 0
+            if not physics.is_valid_position(block, board):
+                board.clear()
+                continue
+        base = board.version
+        block.move(0, physics.drop_distance(block, board))
+        board.place_block(block)
+        board.clear_lines(board.last_placed_rows)
+        deltas.append(len(board_codec.encode_delta(board, base)))
+        snapshots.append(len(board_codec.encode_snapshot(board)))
+    return deltas, snapshots
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv=None):
+    print("快照大小（字节）")
+    print(f"{'游戏板':<16}{'原始':>8}{'JSON':>8}{'快照':>8}")
+    for width, height in ((10, 20), (40, 80)):
+        for kind in ("empty", "sparse", "dense", "multi"):
+            board = Board(width, height) if kind == "empty" else make_board(kind, width, height)
+            print(f"{f'{width}x{height} {kind}':<16}{width * height:>8}"
+                  f"{len(json.dumps(board.grid, separators=(',', ':'))):>8}"
+                  f"{len(board_codec.encode_snapshot(board)):>8}")
+
+    print("\n每放置一个方块的更新大小（字节）")
+    print(f"{'游戏板':<10}{'增量平均':>10}{'增量p95':>10}{'增量最大':>10}{'快照平均':>10}")
+    for width, height in ((10, 20), (40, 80)):
+        deltas, snapshots = update_sizes(width, height, 2000)
+        print(f"{f'{width}x{height}':<10}{sum(deltas) / len(deltas):>10.1f}{_percentile(deltas, 0.95):>10}"
+              f"{max(deltas):>10}{sum(snapshots) / len(snapshots):>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""游戏板尺寸扩展性基准：每个方块的模拟开销和每帧渲染开销随游戏板面积的变化
+
+运行方式：python benchmarks/bench_board_size.py
+"""
+import random
+import sys
+
+from harness import headless_screen, timer
+
+from blocks.block_factory import BlockFactory
+from core.board import Board
+from physics.engine import PhysicsEngine
+
+SIZES = [(10, 20), (20, 40), (40, 80), (80, 160)]
+
+
+def simulate_pieces(width, height, pieces, seed=0):
+    """用随机策略放置pieces个方块，返回每个方块的平均耗时(秒)
+
+    每个方块包括：生成、随机旋转和平移、计算落点（与幽灵方块相同）、放置、消行。
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    board = Board(width, height)
+    factory = BlockFactory(board_width=width)
+    physics = PhysicsEngine()
+
+    start = timer()
+    for _ in range(pieces):
+        block = factory.create_block("challenge")
+        block.rotation = rng.randrange(4)
+        block.x = rng.randrange(width)
+        if not physics.is_valid_position(block, board):
+            block.x = factory.spawn_x
+            block.rotation = 0
+            if not physics.is_valid_position(block, board):
+                # 堆满后重新开始，保持游戏板处于"正在游戏"的状态
+                board.clear()
+                factory.pool.release(block)
+                continue
+        block.move(0, physics.drop_distance(block, board))
+        board.place_block(block)
+        board.clear_lines(board.last_placed_rows)
+        factory.pool.release(block)
+    return (timer() - start) / pieces
+
+
+def render_frames(width, height, frames, seed=0):
+    """在堆叠到一半高度的游戏板上渲染frames帧，返回每帧平均耗时(秒)"""
+    import pygame
+    from blocks.base_block import Block
+    from ui.renderer import GameRenderer
+
+    rng = random.Random(seed)
+    board = Board(width, height)
+    for y in range(height // 2, height):
+        for x in range(width):
+            if rng.random() < 0.7:
+                board.grid[y][x] = rng.randint(1, 7)
+    renderer = GameRenderer(headless_screen())
+    current = Block(width // 2 - 1, 0, [[0, 1, 0], [1, 1, 1]], 6)
+    upcoming = Block(0, 0, [[1, 1], [1, 1]], 4)
+
+    renderer.render_game(board, current, upcoming, 0, 1, "classic")
+    start = timer()
+    for i in range(frames):
+        current.y = i % (height // 2)
+        renderer.render_game(board, current, upcoming, 0, 1, "classic")
+        pygame.display.flip()
+    return (timer() - start) / frames
+
+
+def main(argv=None):
+    pieces = 2000
+    frames = 200
+    print(f"{'尺寸':<10}{'面积':>8}{'us/方块':>12}{'ns/方块/格':>14}{'us/帧':>12}")
+    for width, height in SIZES:
+        area = width * height
+        per_piece = simulate_pieces(width, height, pieces)
+        per_frame = render_frames(width, height, frames)
+        print(f"{f'{width}x{height}':<10}{area:>8}{per_piece * 1e6:>12.2f}"
+              f"{per_piece * 1e9 / area:>14.2f}{per_frame * 1e6:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""观战广播基准：每帧发布的开销和每增加一名观众的CPU开销
+
+发布和分发耗时注册到 run.py；直接运行本文件打印不同观众人数下每帧的服务端耗时：
+    python benchmarks/bench_broadcast.py
+"""
+import random
+import socket
+import sys
+
+from harness import benchmark, headless_screen, timer
+
+from core.game import Game
+from net import protocol
+from net.broadcast import BroadcastHub, BroadcastServer, BroadcastView
+
+
+class SimulatedGame:
+    """无界面运行的单人游戏，每帧使用随机输入"""
+
+    def __init__(self, seed=0):
+        self.time = 0
+        self.rng = random.Random(seed)
+        self.game = Game(None, record_stats=False, key_bindings=protocol.NET_KEY_BINDINGS,
+                         time_source=self._get_time, rng=random.Random(seed))
+        self.game.show_ghost = False
+        self.game.set_mode("classic")
+        self.mask = 0
+
+    def _get_time(self):
+        return self.time
+
+    def tick(self):
+        self.time += 16
+        if self.rng.random() < 0.2:
+            self.mask = self.rng.randrange(1 << len(protocol.INPUT_ACTIONS))
+        self.game.update(protocol.INPUT_STATES[self.mask], render=False)
+        if self.game.game_over:
+            self.game.set_mode("classic")
+
+
+def _tick_cost(loops):
+    """只推进游戏、不发布的耗时，用于从广播基准中扣除"""
+    sim = SimulatedGame()
+    start = timer()
+    for _ in range(loops):
+        sim.tick()
+    return timer() - start
+
+
+@benchmark("broadcast.publish[tick]")
+def bench_publish(loops):
+    sim = SimulatedGame()
+    hub = BroadcastHub(sim.game)
+    start = timer()
+    for _ in range(loops):
+        sim.tick()
+        hub.publish()
+    return max(0.0, timer() - start - _tick_cost(loops))
+
+
+@benchmark("broadcast.fanout[100 viewers]")
+def bench_fanout(loops):
+    """发布一帧并由100个进程内观众取出"""
+    sim = SimulatedGame()
+    hub = BroadcastHub(sim.game)
+    subscribers = [hub.subscribe() for _ in range(100)]
+    start = timer()
+    for _ in range(loops):
+        sim.tick()
+        hub.publish()
+        for subscriber in subscribers:
+            subscriber.poll()
+    return max(0.0, timer() - start - _tick_cost(loops))
+
+
+def _socket_viewers(server, count):
+    """用socketpair模拟远程观众，返回观众端的套接字"""
+    readers = []
+    for _ in range(count):
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        server.add_viewer(writer)
+        readers.append(reader)
+    return readers
+
+
+def _drain(readers):
+    for reader in readers:
+        try:
+            while reader.recv(1 << 16):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def fanout_cost(viewers, transport, ticks=600):
+    """返回每帧服务端耗时（发布 + 分发，不含游戏逻辑），单位微秒"""
+    sim = SimulatedGame()
+    hub = BroadcastHub(sim.game)
+    server = BroadcastServer(hub, port=None)
+    subscribers = []
+    readers = []
+    if transport == "socket":
+        readers = _socket_viewers(server, viewers)
+    else:
+        subscribers = [hub.subscribe() for _ in range(viewers)]
+
+    elapsed = 0.0
+    for _ in range(ticks):
+        sim.tick()
+        start = timer()
+        hub.publish()
+        for subscriber in subscribers:
+            subscriber.poll()
+        server.pump()
+        elapsed += timer() - start
+        # 观众端接收不计入服务端耗时
+        _drain(readers)
+
+    server.close()
+    for reader in readers:
+        reader.close()
+    return elapsed / ticks * 1e6
+
+
+def render_cost(frames=200):
+    """作为对比：为一名观众完整渲染一帧的耗时，单位微秒"""
+    import pygame
+    from ui.renderer import GameRenderer
+    screen = headless_screen()
+    renderer = GameRenderer(screen)
+    sim = SimulatedGame()
+    hub = BroadcastHub(sim.game)
+    subscriber = hub.subscribe()
+    view = BroadcastView()
+    player = {"name": "直播", "pending_garbage": 0, "ghost_block": None}
+    elapsed = 0.0
+    for _ in range(frames):
+        sim.tick()
+        hub.publish()
+        for frame in subscriber.poll():
+            view.apply(frame)
+        player.update(board=view.board, current_block=view.current_block, next_block=view.next_block,
+                      score=view.score, game_over=view.game_over)
+        start = timer()
+        renderer.render_versus([player])
+        pygame.display.flip()
+        elapsed += timer() - start
+    return elapsed / frames * 1e6
+
+
+def main(argv=None):
+    print("每帧服务端耗时（微秒，不含游戏逻辑）")
+    print(f"{'观众人数':<10}{'进程内':>12}{'TCP套接字':>12}")
+    base = {}
+    for viewers in (0, 1, 10, 100, 1000):
+        local = fanout_cost(viewers, "local")
+        remote = fanout_cost(viewers, "socket")
+        base.setdefault("local", local)
+        base.setdefault("socket", remote)
+        print(f"{viewers:<10}{local:>12.1f}{remote:>12.1f}")
+        if viewers:
+            per_local = (local - base["local"]) / viewers
+            per_remote = (remote - base["socket"]) / viewers
+    print(f"每增加一名观众: 进程内 {per_local:.2f} us  TCP套接字 {per_remote:.2f} us")
+    print(f"作为对比，为一名观众渲染一帧: {render_cost():.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""核心逻辑热点基准：方块坐标、碰撞检测、消行、幽灵方块、方块生成、事件总线、遥测和离线分析"""
+import random
+
+from harness import benchmark, headless_screen, timer
+
+from blocks.base_block import Block
+from blocks.block_factory import BlockFactory
+from core.board import Board
+from physics.engine import PhysicsEngine
+
+T_SHAPE = [[0, 1, 0], [1, 1, 1]]
+
+
+def make_board(kind, width=10, height=20, seed=0):
+    """构造测试用游戏板
+
+    sparse: 底部几行零散方块，没有满行
+    dense:  下半部分密集填充，其中1行已满
+    multi:  下半部分密集填充，其中4行已满
+    """
+    rng = random.Random(seed)
+    board = Board(width, height)
+    if kind == "sparse":
+        for y in range(height - 4, height):
+            for x in range(width):
+                if rng.random() < 0.3:
+                    board.grid[y][x] = rng.randint(1, 7)
+        return board
+
+    full_rows = {"dense": 1, "multi": 4}[kind]
+    for y in range(height // 2, height):
+        hole = rng.randrange(width)
+        for x in range(width):
+            if x != hole:
+                board.grid[y][x] = rng.randint(1, 7)
+    for y in rng.sample(range(height // 2, height), full_rows):
+        board.grid[y] = [rng.randint(1, 7) for _ in range(width)]
+    return board
+
+
+@benchmark("block.get_occupied_cells")
+def bench_occupied_cells(loops):
+    block = Block(4, 5, T_SHAPE, 6)
+    block.rotation = 1
+    get_cells = block.get_occupied_cells
+    start = timer()
+    for _ in range(loops):
+        get_cells()
+    return timer() - start
+
+
+@benchmark("physics.is_valid_position")
+def bench_is_valid_position(loops):
+    physics = PhysicsEngine()
+    board = make_board("dense")
+    block = Block(4, 6, T_SHAPE, 6)
+    start = timer()
+    for _ in range(loops):
+        physics.is_valid_position(block, board)
+    return timer() - start
+
+
+@benchmark("physics.can_move")
+def bench_can_move(loops):
+    physics = PhysicsEngine()
+    board = make_board("dense")
+    block = Block(4, 6, T_SHAPE, 6)
+    start = timer()
+    for _ in range(loops):
+        physics.can_move(block, board, 0, 1)
+    return timer() - start
+
+
+def _bench_clear_lines(kind, loops):
+    """消行会修改游戏板，每次都要恢复原状；恢复本身的耗时单独测量后扣除"""
+    template = make_board(kind).grid
+    board = Board(10, 20)
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+    restore = timer() - start
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+        board.clear_lines()
+    return max(0.0, timer() - start - restore)
+
+
+@benchmark("board.clear_lines[sparse]")
+def bench_clear_lines_sparse(loops):
+    return _bench_clear_lines("sparse", loops)
+
+
+@benchmark("board.clear_lines[dense]")
+def bench_clear_lines_dense(loops):
+    return _bench_clear_lines("dense", loops)
+
+
+@benchmark("board.clear_lines[multi]")
+def bench_clear_lines_multi(loops):
+    return _bench_clear_lines("multi", loops)
+
+
+@benchmark("effects.apply[explode chain]")
+def bench_effects_explode(loops):
+    """爆炸方块连锁引爆游戏板上另外3个爆炸方块单元格，恢复游戏板的耗时同样扣除"""
+    from core.effects import EffectEngine
+    template = make_board("dense")
+    template.set_cells([(2, 15, -1), (4, 17, -1), (6, 18, -1)])
+    template = template.grid
+    board = Board(10, 20)
+    effects = EffectEngine()
+    block = Block(1, 13, [[1, 1], [1, 1]], 0, "exploding")
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+    restore = timer() - start
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+        effects.queue(block)
+        effects.apply(board)
+    return max(0.0, timer() - start - restore)
+
+
+@benchmark("cascade.settle[40x80]")
+def bench_cascade_settle(loops):
+    """40x80游戏板中间挖空3行并切开一列，上方分成两个悬空的方块团下落，恢复游戏板的耗时同样扣除"""
+    from core.cascade import CascadeGravity
+    template = make_board("dense", 40, 80)
+    template.fill_rect(0, 60, 40, 63)
+    template.fill_rect(20, 40, 21, 60)
+    template = template.grid
+    board = Board(40, 80)
+    cascade = CascadeGravity()
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+    restore = timer() - start
+
+    start = timer()
+    for _ in range(loops):
+        board.grid = [row[:] for row in template]
+        cascade.settle(board)
+    return max(0.0, timer() - start - restore)
+
+
+@benchmark("game.update_ghost_block")
+def bench_update_ghost_block(loops):
+    from core.game import Game
+    game = Game(headless_screen())
+    game.board = make_board("sparse")
+    game.current_block = Block(4, 0, T_SHAPE, 6)
+    start = timer()
+    for _ in range(loops):
+        game._update_ghost_block()
+    return timer() - start
+
+
+@benchmark("block_factory.create_block")
+def bench_create_block(loops):
+    random.seed(0)
+    factory = BlockFactory()
+    create = factory.create_block
+    release = factory.pool.release
+    start = timer()
+    for _ in range(loops):
+        # 与游戏中一致：方块放置后归还对象池
+        release(create("challenge"))
+    return timer() - start
+
+
+@benchmark("event_bus.emit")
+def bench_event_bus_emit(loops):
+    """游戏逻辑一侧的开销：每个方块固定时写入的一个事件"""
+    from core.events import EventBus, PIECE_LOCKED
+    bus = EventBus()
+    emit = bus.emit
+    start = timer()
+    for i in range(loops):
+        emit(PIECE_LOCKED, i, 6, 0)
+    return timer() - start
+
+
+@benchmark("event_bus.drain[2 subscribers]")
+def bench_event_bus_drain(loops):
+    """每帧：写入一次消行的事件（固定、消行），音效和统计两个订阅者各读取一次"""
+    from core.events import EventBus, LINES_CLEARED, PIECE_LOCKED
+
+    def handler(kind, tick, a, b, c):
+        pass
+
+    bus = EventBus()
+    subscribers = [bus.subscribe(), bus.subscribe()]
+    start = timer()
+    for i in range(loops):
+        bus.emit(PIECE_LOCKED, i, 6, 1)
+        bus.emit(LINES_CLEARED, i, 1, 1)
+        for subscription in subscribers:
+            subscription.drain(handler)
+    return timer() - start
+
+
+class _StubGame:
+    """遥测记录器只需要游戏的 board 和 mode"""
+
+    def __init__(self, board):
+        self.board = board
+        self.mode = "classic"
+
+
+@benchmark("telemetry.record_piece")
+def bench_telemetry_record_piece(loops):
+    """每个方块固定时订阅者的开销：追加一行（写盘在后台线程，批次足够大不触发）"""
+    from analytics.telemetry import TelemetryRecorder
+    from core.events import PIECE_LOCKED
+    recorder = TelemetryRecorder(_StubGame(make_board("dense")), "unused", batch_size=loops + 1)
+    piece = (0, 6, 1, 0, 0, 15, True, 3, 8)
+    handle = recorder.handle_event
+    start = timer()
+    for i in range(loops):
+        handle(PIECE_LOCKED, i, "normal", 0, piece)
+    elapsed = timer() - start
+    recorder.path = None  # 不写盘
+    return elapsed
+
+
+@benchmark("telemetry.summarize[100k pieces]")
+def bench_telemetry_summarize(loops):
+    import numpy as np
+    from analytics.telemetry import COLUMNS, summarize
+    rng = np.random.default_rng(0)
+    count = 100_000
+    columns = {name: rng.integers(0, 20, count).astype(typecode) for name, typecode in COLUMNS}
+    columns["spawn_ms"] = np.arange(count, dtype=np.int64) * 500
+    columns["lock_ms"] = columns["spawn_ms"] + 400
+    start = timer()
+    for _ in range(loops):
+        summarize(columns)
+    return timer() - start
+
+
+@benchmark("pipeline.aggregate[10k records]")
+def bench_pipeline_aggregate(loops):
+    """离线分析汇总一块（默认chunk_size）游戏历史记录：按模式分组、分数分箱、等级计数"""
+    from analytics.pipeline import Aggregates
+    rng = random.Random(0)
+    records = [{"score": rng.randrange(200000), "level": rng.randrange(1, 40), "mode": rng.choice(("classic", "timed")),
+                "duration": rng.random() * 600, "lines_cleared": rng.randrange(200), "blocks_placed": rng.randrange(600),
+                "block_types": {"normal": 500, "bomb": 3}}
+               for _ in range(10000)]
+    start = timer()
+    for _ in range(loops):
+        Aggregates().add_records(records)
+    return timer() - start
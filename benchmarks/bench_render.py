@@ -0,0 +1,83 @@
+"""渲染热点基准：文本渲染和完整的无窗口游戏帧（SDL dummy驱动），以及4K分辨率下两种缩放方式的帧"""
+from harness import benchmark, headless_screen, timer
+
+from bench_core import make_board, T_SHAPE
+
+
+@benchmark("font_manager.render_text[cached]")
+def bench_render_text_cached(loops):
+    headless_screen()
+    from utils.font_manager import FontManager
+    fonts = FontManager()
+    fonts.render_text("分数: 1200", 36, (255, 255, 255))
+    start = timer()
+    for _ in range(loops):
+        fonts.render_text("分数: 1200", 36, (255, 255, 255))
+    return timer() - start
+
+
+@benchmark("font_manager.render_text[uncached]")
+def bench_render_text_uncached(loops):
+    headless_screen()
+    from utils.font_manager import FontManager
+    fonts = FontManager()
+    fonts.get_font(36)
+    # 每次使用不同文本，模拟缓存未命中（例如不断变化的分数）
+    texts = [f"分数: {i}" for i in range(loops)]
+    start = timer()
+    for text in texts:
+        fonts.render_text(text, 36, (255, 255, 255))
+    return timer() - start
+
+
+@benchmark("renderer.render_game[frame]")
+def bench_render_game(loops):
+    import pygame
+    from blocks.base_block import Block
+    from ui.renderer import GameRenderer
+    screen = headless_screen()
+    renderer = GameRenderer(screen)
+    board = make_board("sparse")
+    current = Block(4, 2, T_SHAPE, 6)
+    ghost = Block(4, 14, T_SHAPE, 6)
+    upcoming = Block(4, 0, [[1, 1], [1, 1]], 4)
+    combo = (2, True, 2, 255)
+    start = timer()
+    for _ in range(loops):
+        renderer.render_game(board, current, upcoming, 1200, 2, "classic", ghost,
+                             combo_info=combo, highest_score=5000)
+        pygame.display.flip()
+    return timer() - start
+
+
+def _render_4k(loops, smooth):
+    import pygame
+    from blocks.base_block import Block
+    from ui.layout import LOGICAL_SIZE, layout_for
+    from ui.renderer import GameRenderer
+    headless_screen()
+    window = pygame.Surface((3840, 2160)).convert()
+    # native：直接按4K布局绘制；smooth：画在逻辑分辨率的缓冲区上再平滑缩放
+    canvas = pygame.Surface(LOGICAL_SIZE).convert() if smooth else window
+    renderer = GameRenderer(canvas)
+    board = make_board("sparse")
+    current = Block(4, 2, T_SHAPE, 6)
+    ghost = Block(4, 14, T_SHAPE, 6)
+    upcoming = Block(4, 0, [[1, 1], [1, 1]], 4)
+    target = window.subsurface(layout_for(window.get_size()).rect)
+    start = timer()
+    for _ in range(loops):
+        renderer.render_game(board, current, upcoming, 1200, 2, "classic", ghost, highest_score=5000)
+        if smooth:
+            pygame.transform.smoothscale(canvas, target.get_size(), target)
+    return timer() - start
+
+
+@benchmark("renderer.render_game[4k native]")
+def bench_render_game_4k_native(loops):
+    return _render_4k(loops, smooth=False)
+
+
+@benchmark("renderer.render_game[4k smoothscale]")
+def bench_render_game_4k_smooth(loops):
+    return _render_4k(loops, smooth=True)
@@ -0,0 +1,118 @@
+"""冷启动基准：从启动Python进程到显示第一帧菜单的时间、后台资源全部加载完成的时间，
+以及从单独的文件和从资源包加载音效的耗时
+
+每次测量都在新的子进程中进行（模块导入、字体扫描、音效解码都是冷的）。
+启动耗时注册到 run.py；直接运行本文件打印各阶段的耗时：
+    python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import ROOT, benchmark, headless_screen, timer
+
+# 在子进程中按 main.py 的顺序启动游戏，输出各阶段距离进程启动的时间（秒）
+_STARTUP_SCRIPT = """
+import os, time
+start = float(os.environ["TETRIS_BENCH_LAUNCH"])
+import json, sys
+sys.path.insert(0, os.getcwd())
+import pygame
+pygame.init()
+screen = pygame.display.set_mode((800, 680))
+marks = {"pygame": time.time() - start}
+from core.game import Game
+from ui.menu import MainMenu
+from utils.assets import assets
+marks["imports"] = time.time() - start
+menu = MainMenu(screen)
+game = Game(screen)
+menu.update()
+pygame.display.flip()
+marks["first_frame"] = time.time() - start
+assets.wait()
+marks["assets_ready"] = time.time() - start
+game.stats.history
+marks["history_ready"] = time.time() - start
+print(json.dumps(marks))
+"""
+
+
+def cold_start():
+    """在新进程中启动一次，返回各阶段距离启动子进程的时间（秒，包括解释器启动）"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    # 使用临时的设置和数据目录，不读写用户的设置和游戏历史
+    with tempfile.TemporaryDirectory(prefix="tetris-startup-") as scratch:
+        env["TETRIS_CONFIG_DIR"] = scratch
+        env["XDG_DATA_HOME"] = scratch
+        env["TETRIS_BENCH_LAUNCH"] = repr(time.time())
+        output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@benchmark("startup.first_menu_frame")
+def bench_first_menu_frame(loops):
+    """解释器启动的时间也计入，反映用户实际等待的时间"""
+    return sum(cold_start()["first_frame"] for _ in range(loops))
+
+
+_bundle_dir = None  # 临时构建的资源包所在目录（TemporaryDirectory，进程退出时删除）
+
+
+def _sound_sources():
+    """项目资源目录中存在的音效文件（包内名称, 路径）"""
+    from sound.audio_manager import SOUND_FILES
+    names = [f"sounds/{filename}" for filename in SOUND_FILES.values()]
+    return [(name, os.path.join(ROOT, "assets", name)) for name in names
+            if os.path.exists(os.path.join(ROOT, "assets", name))]
+
+
+@benchmark("assets.load_sounds[files]")
+def bench_load_sounds_files(loops):
+    """逐个打开并解码音效文件"""
+    headless_screen()
+    from sound.audio_manager import _load_sound
+    sources = _sound_sources()
+    start = timer()
+    for _ in range(loops):
+        for _, path in sources:
+            _load_sound(path)
+    return timer() - start
+
+
+@benchmark("assets.load_sounds[bundle]")
+def bench_load_sounds_bundle(loops):
+    """打开资源包（内存映射、解析索引）并从PCM切片创建同样的音效"""
+    global _bundle_dir
+    headless_screen()
+    from utils.asset_bundle import BUNDLE_NAME, AssetBundle, build
+    if _bundle_dir is None:
+        _bundle_dir = tempfile.TemporaryDirectory(prefix="tetris-bundle-")
+        build(os.path.join(ROOT, "assets"), os.path.join(_bundle_dir.name, BUNDLE_NAME))
+    path = os.path.join(_bundle_dir.name, BUNDLE_NAME)
+    names = [name for name, _ in _sound_sources()]
+    start = timer()
+    for _ in range(loops):
+        bundle = AssetBundle(path)
+        for name in names:
+            bundle.sound(name)
+        bundle.close()
+    return timer() - start
+
+
+def main(argv=None):
+    runs = [cold_start() for _ in range(5)]
+    print("冷启动各阶段距离进程启动的时间（毫秒，5次中位数）")
+    for name in ("pygame", "imports", "first_frame", "assets_ready", "history_ready"):
+        values = sorted(run[name] * 1000 for run in runs)
+        print(f"{name:<16}{values[len(values) // 2]:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
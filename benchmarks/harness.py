@@ -0,0 +1,70 @@
+"""基准测试框架：注册测试用例、自动校准循环次数并统计每次操作的耗时"""
+import gc
+import os
+import statistics
+import sys
+import time
+
+# 保证从任意目录运行时都能导入项目模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 已注册的基准测试：名称 -> 函数(loops) -> 耗时(秒)
+BENCHMARKS = {}
+
+_screen = None
+
+
+def benchmark(name):
+    """注册基准测试的装饰器
+
+    被装饰的函数接收循环次数 loops，自行准备数据并只对需要测量的部分计时，
+    返回这 loops 次操作的总耗时（秒）。
+    """
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def headless_screen(size=(800, 680)):
+    """在SDL dummy驱动下创建（并复用）一个无窗口的显示Surface"""
+    global _screen
+    if _screen is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import pygame
+        pygame.init()
+        _screen = pygame.display.set_mode(size)
+    return _screen
+
+
+def measure(func, min_time=0.1, repeat=5):
+    """测量单个基准：先倍增循环次数直到单轮耗时超过min_time，再重复repeat轮"""
+    # 测量期间关闭垃圾回收，减少抖动
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            elapsed = func(loops)
+            if elapsed >= min_time or loops >= 1 << 24:
+                break
+            # 按已测耗时估算所需循环次数，至少翻倍
+            loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+        per_op = [func(loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+        gc.collect()
+    return {
+        "loops": loops,
+        "median": statistics.median(per_op),
+        "min": min(per_op),
+        "stdev": statistics.stdev(per_op) if len(per_op) > 1 else 0.0
+    }
+
+
+timer = time.perf_counter
@@ -0,0 +1,117 @@
+"""基准测试运行器
+
+用法：
+    python benchmarks/run.py                          # 运行全部基准
+    python benchmarks/run.py -k board                 # 只运行名称包含 board 的基准
+    python benchmarks/run.py --save baseline.json     # 保存结果作为基线
+    python benchmarks/run.py --compare baseline.json  # 与基线比较，超出阈值时返回非零退出码
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import BENCHMARKS, measure
+import bench_core  # noqa: F401  注册核心逻辑基准
+import bench_render  # noqa: F401  注册渲染基准
+import bench_board_codec  # noqa: F401  注册游戏板编码基准
+import bench_broadcast  # noqa: F401  注册观战广播基准
+import bench_startup  # noqa: F401  注册冷启动基准
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def _resolve(path):
+    """不含目录的文件名默认放在 benchmarks/baselines 下"""
+    if os.path.dirname(path):
+        return path
+    return os.path.join(BASELINE_DIR, path)
+
+
+def _environment():
+    """记录结果对应的运行环境，便于判断基线是否可比"""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    return info
+
+
+def run(names, min_time, repeat):
+    """运行指定的基准，逐项打印并返回结果"""
+    results = {}
+    for name in names:
+        result = measure(BENCHMARKS[name], min_time=min_time, repeat=repeat)
+        results[name] = result
+        print(f"{name:<40}{result['median'] * 1e6:>12.3f} us{result['min'] * 1e6:>12.3f} us (min)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """与基线比较最小耗时（受系统抖动影响最小），返回超出阈值的回归项列表"""
+    regressions = []
+    print(f"\n{'基准':<40}{'基线(us)':>12}{'当前(us)':>12}{'变化':>10}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<40}{'-':>12}{result['min'] * 1e6:>12.3f}{'新增':>10}")
+            continue
+        change = result["min"] / base["min"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  <-- 回归"
+            regressions.append(name)
+        print(f"{name:<40}{base['min'] * 1e6:>12.3f}{result['min'] * 1e6:>12.3f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="俄罗斯方块性能基准测试")
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的基准")
+    parser.add_argument("--min-time", type=float, default=0.1, help="每轮测量的最短时间(秒)")
+    parser.add_argument("--repeat", type=int, default=5, help="每个基准重复测量的轮数")
+    parser.add_argument("--save", metavar="FILE", help="把结果保存为JSON基线")
+    parser.add_argument("--compare", metavar="FILE", help="与指定的JSON基线比较")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="最小耗时变慢超过该比例时判定为回归（默认0.25即25%%）")
+    parser.add_argument("--list", action="store_true", help="列出所有基准名称")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(names, args.min_time, args.repeat)
+
+    if args.save:
+        path = _resolve(args.save)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"environment": _environment(), "results": results}, f, indent=2)
+        print(f"\n结果已保存到 {path}")
+
+    if args.compare:
+        with open(_resolve(args.compare)) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项性能回归: {', '.join(regressions)}")
+            return 1
+        print("\n没有超出阈值的性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,75 +1,132 @@
+class ShapeData:
+    """不可变的方块形状数据，所有同形状的方块实例共享同一份"""
+    __slots__ = ("rows", "size", "rotations")
+
+    def __init__(self, rows):
+        # 形状矩阵以元组保存，避免被意外修改
+        self.rows = tuple(tuple(row) for row in rows)
+        self.size = len(self.rows)
+        # 预先计算四个旋转状态下的相对坐标
+        self.rotations = tuple(
+            tuple(
+                _transform(x, y, self.size, rotation)
+                for y, row in enumerate(self.rows)
+                for x, cell in enumerate(row)
+                if cell
+            )
+            for rotation in range(4)
+        )
+
+
+def _transform(x, y, size, rotation):
+    """根据旋转状态转换相对坐标"""
+    if rotation == 0:
+        return x, y
+    elif rotation == 1:  # 90度
+        return size - 1 - y, x
+    elif rotation == 2:  # 180度
+        return size - 1 - x, size - 1 - y
+    elif rotation == 3:  # 270度
+        return y, size - 1 - x
+
+
+# 形状数据缓存：相同的形状只生成一份ShapeData
+_shape_cache = {}
+
+
+def get_shape_data(shape):
+    """获取（或创建）形状对应的共享ShapeData"""
+    if isinstance(shape, ShapeData):
+        return shape
+    key = tuple(tuple(row) for row in shape)
+    data = _shape_cache.get(key)
+    if data is None:
+        data = ShapeData(key)
+        _shape_cache[key] = data
+    return data
+
+
+# 特殊方块对应的单元格值
+SPECIAL_CODES = {
+    "exploding": -1,
+    "rainbow": -2,
+    "freezing": -3
+}
+
+
 class Block:
+    __slots__ = ("x", "y", "shape_data", "color", "type", "rotation", "gravity_accumulator")
+
     def __init__(self, x, y, shape, color, block_type="normal"):
         self.x = x
         self.y = y
-        self.shape = shape  # 二维数组表示方块形状
+        self.shape_data = get_shape_data(shape)  # 共享的不可变形状数据
         self.color = color  # 颜色代码
         self.type = block_type  # 方块类型
         self.rotation = 0  # 当前旋转状态
-        
+        self.gravity_accumulator = 0.0  # 重力累积量（由物理引擎使用）
+
+    @property
+    def shape(self):
+        """二维元组表示方块形状"""
+        return self.shape_data.rows
+
+    def reset(self, x, y, shape, color, block_type="normal"):
+        """重新初始化方块（供对象池复用实例）"""
+        self.x = x
+        self.y = y
+        self.shape_data = get_shape_data(shape)
+        self.color = color
+        self.type = block_type
+        self.rotation = 0
+        self.gravity_accumulator = 0.0
+        return self
+
+    def copy_from(self, other):
+        """将另一个方块的状态复制到当前实例，不分配新对象"""
+        self.x = other.x
+        self.y = other.y
+        self.shape_data = other.shape_data
+        self.color = other.color
+        self.type = other.type
+        self.rotation = other.rotation
+        self.gravity_accumulator = other.gravity_accumulator
+        return self
+
     def __deepcopy__(self, memo):
-        """支持深拷贝操作"""
-        import copy
-        # 创建一个新实例
-        result = Block(
-            self.x, 
-            self.y, 
-            copy.deepcopy(self.shape, memo),
-            self.color,
-            self.type
-        )
-        # 复制旋转状态
-        result.rotation = self.rotation
-        return result
+        """支持深拷贝操作（形状数据不可变，直接共享）"""
+        return Block.__new__(Block).copy_from(self)
 
     def get_occupied_cells(self):
         """获取当前方块占据的所有单元格坐标"""
-        cells = []
-        for y, row in enumerate(self.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    # 根据旋转状态转换坐标
-                    real_x, real_y = self._transform_coordinates(x, y)
-                    cells.append((self.x + real_x, self.y + real_y))
-        return cells
-    
+        x = self.x
+        y = self.y
+        return [(x + dx, y + dy) for dx, dy in self.shape_data.rotations[self.rotation]]
+
     def _transform_coordinates(self, x, y):
         """根据旋转状态转换相对坐标"""
-        size = len(self.shape)
-        if self.rotation == 0:
-            return x, y
-        elif self.rotation == 1:  # 90度
-            return size - 1 - y, x
-        elif self.rotation == 2:  # 180度
-            return size - 1 - x, size - 1 - y
-        elif self.rotation == 3:  # 270度
-            return y, size - 1 - x
-            
+        return _transform(x, y, self.shape_data.size, self.rotation)
+
     def move(self, dx, dy):
         """移动方块"""
         self.x += dx
         self.y += dy
-    
+
     def rotate(self, clockwise=True):
         """旋转方块"""
         if clockwise:
             self.rotation = (self.rotation + 1) % 4
         else:
             self.rotation = (self.rotation - 1) % 4
-    
+
     def get_cell_value(self):
         """获取方块单元格的值（用于游戏板）"""
         if self.type == "normal":
             return self.color  # 正常方块返回颜色代码（正整数）
         else:
             # 特殊方块返回负值
-            special_codes = {
-                "exploding": -1,
-                "rainbow": -2,
-                "freezing": -3
-            }
-            return special_codes.get(self.type, -99)
-    
+            return SPECIAL_CODES.get(self.type, -99)
+
     def is_special(self):
         """判断是否为特殊方块"""
         return self.type != "normal"
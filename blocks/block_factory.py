@@ -1,8 +1,9 @@
 import random
-from blocks.base_block import Block
+from blocks.base_block import get_shape_data
+from blocks.block_pool import BlockPool
 
 class BlockFactory:
-    def __init__(self):
+    def __init__(self, pool=None, board_width=10, rng=None):
         # 经典俄罗斯方块形状定义
         self.shapes = {
             'I': [[1, 1, 1, 1]],
@@ -34,11 +35,27 @@ class BlockFactory:
         
         # 特殊方块类型
         self.special_types = ["exploding", "rainbow", "freezing"]
+        
+        # 预先生成共享的形状数据和随机选择用的键序列，避免每次生成方块时重新分配
+        self._shape_data = {key: get_shape_data(shape) for key, shape in self.shapes.items()}
+        self._special_shape_data = {key: get_shape_data(shape) for key, shape in self.special_shapes.items()}
+        self._shape_keys = tuple(self.shapes.keys())
+        self._special_shape_keys = tuple(self.special_shapes.keys())
+        
+        # 方块对象池（可与游戏共享，用于回收已放置的方块）
+        self.pool = pool if pool is not None else BlockPool()
+        
+        # 随机数生成器：默认使用全局random，对战模式下各玩家使用相同种子的独立生成器以获得相同的方块序列
+        self.random = rng or random
+        
+        # 方块生成的水平位置：游戏板中间偏左（10列宽时为第4列）
+        self.board_width = board_width
+        self.spawn_x = board_width // 2 - 1
     
     def create_block(self, game_mode):
         """根据游戏模式创建方块"""
         # 起始位置
-        start_x = 4
+        start_x = self.spawn_x
         start_y = 0
         
         # 根据游戏模式决定方块生成策略
@@ -46,13 +63,13 @@ class BlockFactory:
             return self._create_classic_block(start_x, start_y)
         elif game_mode == "challenge":
             # 挑战模式有10%概率生成特殊方块
-            if random.random() < 0.1:
+            if self.random.random() < 0.1:
                 return self._create_special_block(start_x, start_y)
             else:
                 return self._create_classic_block(start_x, start_y)
         elif game_mode == "timed":
             # 限时模式方块更加多样
-            if random.random() < 0.2:
+            if self.random.random() < 0.2:
                 return self._create_special_block(start_x, start_y)
             else:
                 return self._create_classic_block(start_x, start_y)
@@ -62,25 +79,25 @@ class BlockFactory:
     
     def _create_classic_block(self, x, y):
         """创建经典俄罗斯方块"""
-        shape_key = random.choice(list(self.shapes.keys()))
-        shape = self.shapes[shape_key]
+        shape_key = self.random.choice(self._shape_keys)
+        shape = self._shape_data[shape_key]
         color = self.colors[shape_key]
-        return Block(x, y, shape, color)
+        return self.pool.acquire(x, y, shape, color)
     
     def _create_special_block(self, x, y):
         """创建特殊方块"""
         # 随机选择特殊形状
-        if random.random() < 0.5:
-            shape_key = random.choice(list(self.shapes.keys()))
-            shape = self.shapes[shape_key]
+        if self.random.random() < 0.5:
+            shape_key = self.random.choice(self._shape_keys)
+            shape = self._shape_data[shape_key]
         else:
-            shape_key = random.choice(list(self.special_shapes.keys()))
-            shape = self.special_shapes[shape_key]
+            shape_key = self.random.choice(self._special_shape_keys)
+            shape = self._special_shape_data[shape_key]
         
         # 特殊方块有特殊颜色 (8-10)
-        color = random.randint(8, 10)
+        color = self.random.randint(8, 10)
         
         # 随机选择特殊类型
-        special_type = random.choice(self.special_types)
+        special_type = self.random.choice(self.special_types)
         
-        return Block(x, y, shape, color, special_type)
+        return self.pool.acquire(x, y, shape, color, special_type)
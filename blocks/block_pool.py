@@ -0,0 +1,32 @@
+from blocks.base_block import Block
+
+
+class BlockPool:
+    """方块对象池：回收已放置的方块、幽灵方块和模拟用方块，避免反复分配"""
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size  # 池中最多保留的空闲实例数
+        self._free = []
+        self.created = 0  # 池为空时新建的实例数（用于统计分配次数）
+
+    def acquire(self, x, y, shape, color, block_type="normal"):
+        """取出一个方块实例（池为空时才新建）"""
+        if self._free:
+            return self._free.pop().reset(x, y, shape, color, block_type)
+        self.created += 1
+        return Block(x, y, shape, color, block_type)
+
+    def acquire_copy(self, block):
+        """取出一个实例并复制指定方块的状态"""
+        if self._free:
+            return self._free.pop().copy_from(block)
+        self.created += 1
+        return Block.__new__(Block).copy_from(block)
+
+    def release(self, block):
+        """归还不再使用的方块"""
+        if block is not None and len(self._free) < self.max_size:
+            self._free.append(block)
+
+    def __len__(self):
+        return len(self._free)
@@ -1,13 +1,174 @@
+from array import array
+from collections import deque
+from itertools import islice
+
+# 对战模式中垃圾行使用的单元格值
+GARBAGE_VALUE = 11
+
+# 单元格值的字节 -> ASCII的'0'/'1'
+_OCCUPANCY_TABLE = bytes([ord("0")] + [ord("1")] * 255)
+
+
+def row_mask(row):
+    """一行中有方块的单元格的位掩码（第x位对应第x列）
+    
+    单元格值的字节映射为'0'/'1'后反转，交给int(..., 2)在C层解析。
+    """
+    return int(array("b", row).tobytes().translate(_OCCUPANCY_TABLE)[::-1], 2)
+
+
+def measure_stack(board):
+    """返回(空洞数, 堆叠高度)：空洞是上方有方块的空单元格"""
+    above = 0
+    holes = 0
+    height = 0
+    for y, row in enumerate(board.grid):
+        mask = row_mask(row)
+        if not above:
+            if not mask:
+                continue
+            height = board.height - y
+        else:
+            holes += bin(above & ~mask).count("1")
+        above |= mask
+    return holes, height
+
+
 class Board:
+    # 变更日志最多保留的条数，更早的版本只能通过快照恢复
+    HISTORY_LIMIT = 64
+    
     def __init__(self, width, height):
         self.width = width
         self.height = height
         self.grid = [[0 for _ in range(width)] for _ in range(height)]
         # 0表示空格，正整数表示不同颜色的方块，负整数表示特殊方块
+        
+        # 最近一次放置的方块所在的行：只有这些行可能因放置而被填满
+        self.last_placed_rows = None
+        
+        # 垃圾行把已有方块顶出游戏板顶部时置为True
+        self.topped_out = False
+        
+        # 变更监听器：callback(kind, data)
+        # kind为"cells"时data是变化的(x, y)列表，为"rows"时是变化的行号，为"all"时data为None
+        self._listeners = []
+        
+        # 版本号和变更日志：每次修改版本号加1，日志中第i条（从末尾数）对应版本 version - i
+        # 变更以元组记录，可以用apply_change在另一块游戏板上重放（见core/board_codec.py）
+        self.version = 0
+        self.history = deque(maxlen=self.HISTORY_LIMIT)
+    
+    def add_listener(self, callback):
+        """注册游戏板变更监听器"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """移除游戏板变更监听器"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, kind, data=None):
+        """通知所有监听器游戏板发生了变化"""
+        for callback in self._listeners:
+            callback(kind, data)
+    
+    def _commit(self, change, kind, data=None):
+        """记录一次变更：版本号加1、写入变更日志并通知监听器"""
+        self.version += 1
+        self.history.append(change)
+        self._notify(kind, data)
+    
+    def changes_since(self, version):
+        """返回version之后的所有变更（按顺序），日志中已没有这么早的变更时返回None"""
+        count = self.version - version
+        if count == 0:
+            return []
+        if count < 0 or count > len(self.history):
+            return None
+        return list(islice(self.history, len(self.history) - count, None))
+    
+    def apply_change(self, change):
+        """重放一条变更日志中的变更"""
+        kind = change[0]
+        if kind == "cells":
+            self.set_cells(change[1])
+        elif kind == "rect":
+            self.fill_rect(*change[1:])
+        elif kind == "clear":
+            self._remove_rows(change[1])
+        elif kind == "garbage":
+            self.add_garbage_rows(*change[1:])
+        elif kind == "mask":
+            self.fill_mask(change[1], change[2])
+        elif kind == "rows":
+            self.set_rows(change[1], change[2])
+        elif kind == "grid":
+            self.load_grid(change[1])
+        elif kind == "reset":
+            self.clear()
+        else:
+            raise ValueError(f"未知的变更类型: {kind}")
     
     def clear(self):
         """清空游戏板"""
         self.grid = [[0 for _ in range(self.width)] for _ in range(self.height)]
+        self.last_placed_rows = None
+        self.topped_out = False
+        self._commit(("reset",), "all")
+    
+    def set_cells(self, cells):
+        """批量写入单元格，cells为(x, y, value)序列"""
+        grid = self.grid
+        cells = tuple(cells)
+        for x, y, value in cells:
+            grid[y][x] = value
+        self._commit(("cells", cells), "cells", [(x, y) for x, y, _ in cells])
+    
+    def fill_rect(self, left, top, right, bottom, value=0):
+        """把[left, right) x [top, bottom)范围内（超出游戏板的部分忽略）的单元格设为value"""
+        left = max(0, left)
+        top = max(0, top)
+        right = min(self.width, right)
+        bottom = min(self.height, bottom)
+        if left >= right or top >= bottom:
+            return
+        for y in range(top, bottom):
+            self.grid[y][left:right] = [value] * (right - left)
+        self._commit(("rect", left, top, right, bottom, value), "rows", range(top, bottom))
+    
+    def fill_mask(self, masks, value=0):
+        """按位掩码批量写入单元格：masks为(行号, 位掩码)序列，位掩码的第x位对应第x列
+        
+        每行按掩码中连续的位分段，用切片赋值写入。
+        """
+        masks = tuple((y, mask) for y, mask in masks if mask)
+        if not masks:
+            return
+        grid = self.grid
+        for y, mask in masks:
+            row = grid[y]
+            while mask:
+                start = (mask & -mask).bit_length() - 1
+                run = ((mask >> start) + 1 & ~(mask >> start)).bit_length() - 1  # 从start开始连续的1的个数
+                row[start:start + run] = [value] * run
+                mask &= ~(((1 << run) - 1) << start)
+        self._commit(("mask", masks, value), "rows", [y for y, _ in masks])
+    
+    def set_rows(self, start, rows):
+        """从第start行开始整行替换"""
+        rows = tuple(tuple(row) for row in rows)
+        for offset, row in enumerate(rows):
+            self.grid[start + offset] = list(row)
+        self._commit(("rows", start, rows), "rows", range(start, start + len(rows)))
+    
+    def load_grid(self, grid):
+        """整体替换游戏板内容"""
+        grid = tuple(tuple(row) for row in grid)
+        self.grid = [list(row) for row in grid]
+        self.last_placed_rows = None
+        self._commit(("grid", grid), "all")
     
     def is_valid_position(self, x, y):
         """检查坐标是否有效"""
@@ -21,59 +182,67 @@ class Board:
     
     def place_block(self, block):
         """将方块放置到游戏板上"""
+        value = block.get_cell_value()
+        grid = self.grid
+        width = self.width
+        height = self.height
+        changed = []
         for cell_x, cell_y in block.get_occupied_cells():
-            if self.is_valid_position(cell_x, cell_y):
-                self.grid[cell_y][cell_x] = block.get_cell_value()
-                
-        # 如果是特殊方块，触发特殊效果
-        if block.is_special():
-            self._trigger_special_effect(block)
-    
-    def _trigger_special_effect(self, block):
-        """触发特殊方块效果"""
-        if block.type == "exploding":
-            self._explode_area(block.x, block.y)
-        elif block.type == "freezing":
-            # 冰冻效果在Game类中处理
-            pass
-        elif block.type == "rainbow":
-            self._rainbow_adapt(block)
-    
-    def _explode_area(self, center_x, center_y):
-        """爆炸方块效果：清除周围的方块"""
-        radius = 2
-        for y in range(center_y - radius, center_y + radius + 1):
-            for x in range(center_x - radius, center_x + radius + 1):
-                if self.is_valid_position(x, y):
-                    self.grid[y][x] = 0
-    
-    def _rainbow_adapt(self, block):
-        """彩虹方块效果：适应周围颜色形成消除组合"""
-        # 检测周围最常见的颜色并应用
-        pass
-    
-    def clear_lines(self):
-        """检查并消除已填满的行，返回消除的行数"""
-        lines_to_clear = []
-        for y in range(self.height):
-            if all(cell != 0 for cell in self.grid[y]):
-                lines_to_clear.append(y)
+            if 0 <= cell_x < width and 0 <= cell_y < height:
+                grid[cell_y][cell_x] = value
+                changed.append((cell_x, cell_y))
+        self.last_placed_rows = {cell_y for _, cell_y in changed}
+        self._commit(("cells", tuple((x, y, value) for x, y in changed)), "cells", changed)
+
+    
+    def clear_lines(self, candidate_rows=None):
+        """检查并消除已填满的行，返回消除的行数
+        
+        candidate_rows 指定只检查哪些行（例如刚放置方块所在的行），为None时检查所有行。
+        """
+        grid = self.grid
+        if candidate_rows is None:
+            candidate_rows = range(self.height)
+        # "0 not in row" 在C层逐个比较，遇到第一个空格立即返回，大尺寸游戏板上也很快
+        lines_to_clear = sorted(y for y in candidate_rows if 0 not in grid[y])
         
         if not lines_to_clear:
             return 0  # 没有需要消除的行
         
-        # 创建新的游戏板，只保留非满行
-        new_grid = []
-        for y in range(self.height):
-            if y not in lines_to_clear:
-                new_grid.append(self.grid[y])
-        
-        # 在顶部添加足够数量的空行
-        empty_rows_needed = len(lines_to_clear)
-        for _ in range(empty_rows_needed):
-            new_grid.insert(0, [0 for _ in range(self.width)])
+        self._remove_rows(tuple(lines_to_clear))
+        return len(lines_to_clear)
+    
+    def _remove_rows(self, rows):
+        """删除指定的行（升序），上方的行下移，顶部补充空行"""
+        # 只保留未删除的行，并在顶部补充相同数量的空行
+        removed = set(rows)
+        width = self.width
+        new_grid = [[0] * width for _ in range(len(rows))]
+        new_grid.extend(row for y, row in enumerate(self.grid) if y not in removed)
         
         # 更新游戏板
         self.grid = new_grid
+        self.last_placed_rows = None
         
-        return len(lines_to_clear)
+        # 最低被消除行及其上方的所有行都发生了移动
+        self._commit(("clear", rows), "rows", range(0, rows[-1] + 1))
+    
+    def add_garbage_rows(self, count, hole_x, value=GARBAGE_VALUE):
+        """在底部插入count行垃圾行（每行在hole_x处留一个空洞），整体上移，返回是否有方块被顶出顶部"""
+        count = min(count, self.height)
+        if count <= 0:
+            return False
+        
+        # 被顶出顶部的行中只要有方块就算顶出
+        if any(any(row) for row in self.grid[:count]):
+            self.topped_out = True
+        
+        garbage = []
+        for _ in range(count):
+            row = [value] * self.width
+            row[hole_x] = 0
+            garbage.append(row)
+        self.grid = self.grid[count:] + garbage
+        self.last_placed_rows = None
+        self._commit(("garbage", count, hole_x, value), "all")
+        return self.topped_out
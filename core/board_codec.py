@@ -0,0 +1,233 @@
+"""游戏板的紧凑二进制编码：快照和增量
+
+快照 = 头部(宽, 高, 版本) + 按位打包的占用图 + 只包含有方块单元格的颜色平面。
+颜色平面先列出调色板（出现过的单元格值），再用游程编码：每个字节高4位是调色板
+序号，低4位是游程长度减1，超过16格的游程拆成多个字节。
+
+增量 = 头部(起始版本, 变更条数) + 按顺序编码的变更日志（见Board.history），第i条变更
+对应版本 起始版本+i+1。应用时跳过游戏板已经拥有的版本，因此同一段增量可以重复应用。
+
+坐标和行号使用单字节，游戏板最大为256x256，每条单元格变更最多255个单元格。
+"""
+import re
+import struct
+from array import array
+from itertools import chain, compress
+
+SNAPSHOT_HEADER = struct.Struct("!HHI")  # 宽, 高, 版本
+DELTA_HEADER = struct.Struct("!IH")  # 起始版本, 变更条数
+
+OP_RESET = 0
+OP_CELLS = 1  # 数量, 每格(x, y, 值)
+OP_CELLS_SAME = 2  # 值, 数量, 每格(x, y)：放置方块时所有单元格的值相同
+OP_RECT = 3  # 左, 上, 右, 下, 值
+OP_CLEAR = 4  # 行数, 每行行号
+OP_GARBAGE = 5  # 行数, 空洞位置, 值
+OP_ROWS = 6  # 起始行, 行数, 每行的所有单元格值
+OP_GRID = 7  # 不带头部的快照
+OP_MASK = 8  # 值, 行数, 每行(行号, 位掩码)，位掩码按宽度向上取整到字节
+
+# 占用图：把单元格值的字节映射为ASCII的'0'/'1'，再交给int(..., 2)在C层完成打包
+_OCCUPANCY_TABLE = bytes([ord("0")] + [ord("1")] * 255)
+# 解码时反过来把'0'/'1'映射为0/1，用于compress筛选有方块的位置
+_BIT_TABLE = bytes(range(256)).replace(b"0", b"\x00").replace(b"1", b"\x01")
+# 颜色游程：同一调色板序号最多连续16个；游程字节串 -> 编码字节
+_RUN_PATTERN = re.compile(rb"(.)\1{0,15}", re.S)
+_RUN_CODES = {bytes([index]) * length: index << 4 | (length - 1) for index in range(16) for length in range(1, 17)}
+
+
+def _pack_occupancy(flat_bytes):
+    """按位打包占用图，返回字节串"""
+    count = len(flat_bytes)
+    if not count:
+        return b""
+    bits = int(flat_bytes.translate(_OCCUPANCY_TABLE), 2)
+    # 末尾补0，使第一个单元格对应第一个字节的最高位
+    padding = -count % 8
+    return (bits << padding).to_bytes((count + padding) // 8, "big")
+
+
+def _encode_colors(values):
+    """调色板 + 游程编码颜色平面，values为有方块单元格的值（有符号字节）"""
+    palette = sorted(set(values))
+    if len(palette) > 16:
+        raise ValueError("颜色种类超过16种，无法编码")
+    # 先把单元格值映射为调色板序号，再由正则在C层切分游程，每个游程查表得到编码
+    table = bytearray(256)
+    for i, value in enumerate(palette):
+        table[value] = i
+    runs = map(re.Match.group, _RUN_PATTERN.finditer(values.translate(table)))
+    return bytes([len(palette)]) + bytes(palette) + bytes(map(_RUN_CODES.__getitem__, runs))
+
+
+def encode_grid(grid, width, height):
+    """编码游戏板内容（不含头部）"""
+    flat = array("b", chain.from_iterable(grid)).tobytes()
+    occupancy = _pack_occupancy(flat)
+    return occupancy + _encode_colors(flat.replace(b"\x00", b""))
+
+
+def decode_grid(data, offset, width, height):
+    """解码游戏板内容，返回(行列表, 新的偏移)"""
+    count = width * height
+    size = (count + 7) // 8
+    bits = format(int.from_bytes(data[offset:offset + size], "big"), f"0{size * 8}b")[:count]
+    offset += size
+
+    palette_size = data[offset]
+    offset += 1
+    palette = array("b", data[offset:offset + palette_size]).tolist()
+    offset += palette_size
+
+    flat = [0] * count
+    positions = list(compress(range(count), bits.encode().translate(_BIT_TABLE)))
+    position = 0
+    while position < len(positions):
+        code = data[offset]
+        offset += 1
+        value = palette[code >> 4]
+        for i in positions[position:position + (code & 15) + 1]:
+            flat[i] = value
+        position += (code & 15) + 1
+    return [flat[y * width:(y + 1) * width] for y in range(height)], offset
+
+
+def encode_snapshot(board):
+    """编码游戏板快照"""
+    return SNAPSHOT_HEADER.pack(board.width, board.height, board.version) \
+        + encode_grid(board.grid, board.width, board.height)
+
+
+def decode_snapshot(data):
+    """解码快照，返回(宽, 高, 版本, 行列表)"""
+    width, height, version = SNAPSHOT_HEADER.unpack_from(data)
+    grid, _ = decode_grid(data, SNAPSHOT_HEADER.size, width, height)
+    return width, height, version, grid
+
+
+def restore_snapshot(board, data):
+    """用快照覆盖游戏板内容和版本号（尺寸必须一致）"""
+    width, height, version, grid = decode_snapshot(data)
+    if (width, height) != (board.width, board.height):
+        raise ValueError(f"快照尺寸 {width}x{height} 与游戏板 {board.width}x{board.height} 不一致")
+    board.load_grid(grid)
+    board.version = version
+    board.history.clear()
+
+
+def _signed(value):
+    return value - 256 if value > 127 else value
+
+
+def _encode_change(change, width, height):
+    kind = change[0]
+    if kind == "cells":
+        cells = change[1]
+        values = {value for _, _, value in cells}
+        if len(values) == 1:
+            return bytes((OP_CELLS_SAME, next(iter(values)) & 0xFF, len(cells))) \
+                + bytes(chain.from_iterable((x, y) for x, y, _ in cells))
+        return bytes((OP_CELLS, len(cells))) \
+            + bytes(chain.from_iterable((x, y, value & 0xFF) for x, y, value in cells))
+    if kind == "rect":
+        _, left, top, right, bottom, value = change
+        return bytes((OP_RECT, left, top, right - 1, bottom - 1, value & 0xFF))
+    if kind == "clear":
+        return bytes((OP_CLEAR, len(change[1]))) + bytes(change[1])
+    if kind == "garbage":
+        _, count, hole_x, value = change
+        return bytes((OP_GARBAGE, count, hole_x, value & 0xFF))
+    if kind == "rows":
+        _, start, rows = change
+        return bytes((OP_ROWS, start, len(rows) - 1)) + array("b", chain.from_iterable(rows)).tobytes()
+    if kind == "grid":
+        return bytes((OP_GRID,)) + encode_grid(change[1], width, height)
+    if kind == "mask":
+        _, masks, value = change
+        size = (width + 7) // 8
+        return bytes((OP_MASK, value & 0xFF, len(masks))) \
+            + b"".join(bytes((y,)) + mask.to_bytes(size, "big") for y, mask in masks)
+    if kind == "reset":
+        return bytes((OP_RESET,))
+    raise ValueError(f"未知的变更类型: {kind}")
+
+
+def encode_delta(board, since_version):
+    """编码since_version之后的所有变更；变更日志中已没有这么早的版本时返回None（应改发快照）"""
+    changes = board.changes_since(since_version)
+    if changes is None:
+        return None
+    width = board.width
+    height = board.height
+    return DELTA_HEADER.pack(since_version, len(changes)) \
+        + b"".join(_encode_change(change, width, height) for change in changes)
+
+
+def _decode_change(data, offset, width, height):
+    """解码一条变更，返回(变更, 新的偏移)"""
+    op = data[offset]
+    offset += 1
+    if op == OP_CELLS_SAME:
+        value = _signed(data[offset])
+        count = data[offset + 1]
+        offset += 2
+        cells = tuple((data[i], data[i + 1], value) for i in range(offset, offset + count * 2, 2))
+        return ("cells", cells), offset + count * 2
+    if op == OP_CELLS:
+        count = data[offset]
+        offset += 1
+        cells = tuple((data[i], data[i + 1], _signed(data[i + 2])) for i in range(offset, offset + count * 3, 3))
+        return ("cells", cells), offset + count * 3
+    if op == OP_RECT:
+        left, top, right, bottom, value = data[offset:offset + 5]
+        return ("rect", left, top, right + 1, bottom + 1, _signed(value)), offset + 5
+    if op == OP_CLEAR:
+        count = data[offset]
+        return ("clear", tuple(data[offset + 1:offset + 1 + count])), offset + 1 + count
+    if op == OP_GARBAGE:
+        count, hole_x, value = data[offset:offset + 3]
+        return ("garbage", count, hole_x, _signed(value)), offset + 3
+    if op == OP_ROWS:
+        start = data[offset]
+        count = data[offset + 1] + 1
+        offset += 2
+        cells = array("b", data[offset:offset + count * width]).tolist()
+        rows = tuple(tuple(cells[i * width:(i + 1) * width]) for i in range(count))
+        return ("rows", start, rows), offset + count * width
+    if op == OP_GRID:
+        grid, offset = decode_grid(data, offset, width, height)
+        return ("grid", grid), offset
+    if op == OP_MASK:
+        value = _signed(data[offset])
+        count = data[offset + 1]
+        offset += 2
+        size = (width + 7) // 8
+        masks = []
+        for _ in range(count):
+            masks.append((data[offset], int.from_bytes(data[offset + 1:offset + 1 + size], "big")))
+            offset += 1 + size
+        return ("mask", tuple(masks), value), offset
+    if op == OP_RESET:
+        return ("reset",), offset
+    raise ValueError(f"未知的变更类型: {op}")
+
+
+def apply_delta(board, data, offset=0):
+    """把增量应用到游戏板，返回(实际应用的变更条数, 新的偏移)
+
+    游戏板的版本号必须不早于增量的起始版本；已经拥有的版本会被跳过。
+    """
+    since_version, count = DELTA_HEADER.unpack_from(data, offset)
+    offset += DELTA_HEADER.size
+    skip = board.version - since_version
+    if skip < 0:
+        raise ValueError(f"游戏板版本 {board.version} 早于增量的起始版本 {since_version}")
+    width = board.width
+    height = board.height
+    applied = 0
+    for i in range(count):
+        change, offset = _decode_change(data, offset, width, height)
+        if i >= skip:
+            board.apply_change(change)
+            applied += 1
+    return applied, offset
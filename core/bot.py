@@ -0,0 +1,108 @@
+from blocks.base_block import Block
+from physics.engine import PhysicsEngine
+
+
+class PlacementBot:
+    """简单的放置AI：为每个新方块枚举所有旋转和列，选出评分最高的落点，再逐帧给出到达该落点的操作
+
+    评分使用常见的四项特征：总高度、消除行数、空洞数和相邻列高度差，供视频导出和批量模拟使用。
+    """
+
+    # 特征权重：总高度, 消除行数, 空洞数, 高度差
+    DEFAULT_WEIGHTS = (-0.51, 0.76, -0.36, -0.18)
+
+    def __init__(self, weights=DEFAULT_WEIGHTS, action_interval=2, max_attempts=20):
+        self.weights = weights
+        self.action_interval = action_interval  # 两次操作之间至少间隔的帧数（操作是按下-抬起的边沿触发）
+        self.max_attempts = max_attempts  # 超过该操作次数仍未到达目标时直接硬降
+        self.physics = PhysicsEngine()
+        self.probe = Block(0, 0, [[1]], 0)  # 评估落点用的临时方块，避免每次分配
+        self.target = None  # (旋转状态, x)
+        self._board_version = None
+        self._wait = 0
+        self._attempts = 0
+
+    def reset(self):
+        self.target = None
+        self._board_version = None
+        self._wait = 0
+
+    def next_action(self, game):
+        """返回本帧要执行的动作名称（left/right/rotate/hard_drop），不操作时返回None"""
+        block = game.current_block
+        if game.game_over or game.paused or game.is_hard_dropping or block is None:
+            return None
+        if self._wait:
+            self._wait -= 1
+            return None
+
+        # 方块锁定后游戏板版本号会变化，此时为新方块选择落点
+        if self.target is None or game.board.version != self._board_version:
+            self.target = self.choose(game.board, block)
+            self._board_version = game.board.version
+            self._attempts = 0
+
+        self._wait = self.action_interval
+        self._attempts += 1
+        rotation, x = self.target
+        if self._attempts > self.max_attempts:
+            return "hard_drop"
+        if block.rotation != rotation:
+            return "rotate"
+        if block.x < x:
+            return "right"
+        if block.x > x:
+            return "left"
+        return "hard_drop"
+
+    def choose(self, board, block):
+        """返回评分最高的落点(旋转状态, x)；没有可行落点时保持原地"""
+        probe = self.probe.copy_from(block)
+        best = None
+        best_score = None
+        width = board.width
+        for rotation in range(4):
+            probe.rotation = rotation
+            offsets = probe.shape_data.rotations[rotation]
+            min_dx = min(dx for dx, _ in offsets)
+            max_dx = max(dx for dx, _ in offsets)
+            for x in range(-min_dx, width - max_dx):
+                probe.x = x
+                probe.y = block.y
+                if not self.physics.is_valid_position(probe, board):
+                    continue
+                probe.y += self.physics.drop_distance(probe, board)
+                score = self._evaluate(board, probe.get_occupied_cells())
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best = (rotation, x)
+        return best or (block.rotation, block.x)
+
+    def _evaluate(self, board, cells):
+        """计算把方块放在cells后游戏板的评分"""
+        width = board.width
+        height = board.height
+        grid = board.grid
+        placed = set(cells)
+        rows = {y for _, y in cells}
+        full = {y for y in rows
+                if all(grid[y][x] or (x, y) in placed for x in range(width))}
+
+        # 消行后剩下的行从上到下依次排列在游戏板底部；逐列找到最高的方块，其下方的空格都是空洞
+        remaining = [y for y in range(height) if y not in full]
+        count = len(remaining)
+        heights = []
+        holes = 0
+        for x in range(width):
+            column_height = 0
+            for i, y in enumerate(remaining):
+                if grid[y][x] or (x, y) in placed:
+                    if not column_height:
+                        column_height = count - i
+                elif column_height:
+                    holes += 1
+            heights.append(column_height)
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        w_height, w_lines, w_holes, w_bumpiness = self.weights
+        return (w_height * sum(heights) + w_lines * len(full)
+                + w_holes * holes + w_bumpiness * bumpiness)
@@ -0,0 +1,140 @@
+from core.board import row_mask
+
+
+def _fill_runs(seed, mask):
+    """把seed中的位扩展到mask里包含它们的整段连续位"""
+    seed &= mask
+    while True:
+        grown = (seed | seed << 1 | seed >> 1) & mask
+        if grown == seed:
+            return seed
+        seed = grown
+
+
+def _flood(region, filled, top, bottom):
+    """在region（每行一个位掩码）中从filled出发按四连通扩展，只处理第top到bottom行
+
+    交替自下而上、自上而下扫描，每行先接收上下两行已填充的位，再沿行内连续段扩展，直到不再变化。
+    filled会被原地修改并返回。
+    """
+    changed = True
+    while changed:
+        changed = False
+        for rows in (range(bottom, top - 1, -1), range(top, bottom + 1)):
+            for y in rows:
+                mask = region[y]
+                if not mask:
+                    continue
+                seed = filled[y]
+                if y > top:
+                    seed |= filled[y - 1]
+                if y < bottom:
+                    seed |= filled[y + 1]
+                seed &= mask
+                if seed & ~filled[y]:
+                    filled[y] = _fill_runs(seed | filled[y], mask)
+                    changed = True
+    return filled
+
+
+def _runs(mask):
+    """位掩码中每段连续的1，依次返回(起始位, 结束位+1)"""
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        end = (~(mask >> start) & ((mask >> start) + 1)).bit_length() - 1 + start
+        yield start, end
+        mask &= ~0 << end
+
+
+class CascadeGravity:
+    """连锁重力：爆炸或消行后，不再与底部相连的方块团整体下落，落地后可能继续消行
+
+    每行的占用情况用一个整数位掩码表示，与底部相连的单元格和悬空的方块团都用按位的
+    泛洪填充求出；只处理最高的方块所在行以下的部分。每次锁定最多下落 max_passes 轮，
+    保证连锁反应在大尺寸游戏板上的耗时也有上限。
+    """
+
+    def __init__(self, max_passes=8):
+        self.max_passes = max_passes
+
+        # 统计
+        self.passes = 0
+        self.moved_cells = 0
+
+    def settle(self, board):
+        """让悬空的方块团下落并消除由此填满的行，重复直到稳定，返回额外消除的行数
+
+        方块团按最低的单元格从下往上依次下落，少数情况下会落在另一个尚未下落的方块团上，
+        消行后也可能出现新的悬空部分，因此重复进行，直到没有方块下落或达到 max_passes 次。
+        """
+        total = 0
+        for _ in range(self.max_passes):
+            landed_rows = self.collapse(board)
+            if not landed_rows:
+                break
+            self.passes += 1
+            total += board.clear_lines(landed_rows)
+        return total
+
+    def collapse(self, board):
+        """让所有悬空的方块团各自整体下落到底，返回方块落到的行号集合（没有下落时为空）"""
+        height = board.height
+        grid = board.grid
+        occupancy = [row_mask(row) for row in grid]
+        top = next((y for y, mask in enumerate(occupancy) if mask), height)
+        if top >= height - 1:
+            return set()
+        bottom = height - 1
+
+        # 与底部相连的单元格
+        supported = [0] * height
+        supported[bottom] = occupancy[bottom]
+        _flood(occupancy, supported, top, bottom)
+        floating = [occupancy[y] & ~supported[y] for y in range(height)]
+        if not any(floating):
+            return set()
+
+        # 悬空部分按四连通分成方块团，从最低的开始依次下落
+        clusters = []
+        for y in range(bottom, top - 1, -1):
+            while floating[y]:
+                seed = [0] * height
+                seed[y] = floating[y] & -floating[y]
+                cluster = _flood(floating, seed, top, bottom)
+                clusters.append({row: mask for row, mask in enumerate(cluster) if mask})
+                for row, mask in clusters[-1].items():
+                    floating[row] &= ~mask
+
+        moves = []
+        for cluster in clusters:
+            for y, mask in cluster.items():
+                occupancy[y] &= ~mask
+            distance = 0
+            while all(y + distance + 1 < height and not mask & occupancy[y + distance + 1]
+                      for y, mask in cluster.items()):
+                distance += 1
+            for y, mask in cluster.items():
+                occupancy[y + distance] |= mask
+            if distance:
+                moves.append((cluster, distance))
+        if not moves:
+            return set()
+
+        # 按行内连续段整段取出所有移动的单元格再写入新位置，整段受影响的行作为一次变更写回游戏板
+        first = min(min(cluster) for cluster, _ in moves)
+        last = max(max(cluster) + distance for cluster, distance in moves)
+        rows = [grid[y][:] for y in range(first, last + 1)]
+        runs = []
+        landed_rows = set()
+        for cluster, distance in moves:
+            for y, mask in cluster.items():
+                row = rows[y - first]
+                for start, end in _runs(mask):
+                    runs.append((y + distance - first, start, end, row[start:end]))
+                    row[start:end] = [0] * (end - start)
+                landed_rows.add(y + distance)
+        for y, start, end, values in runs:
+            rows[y][start:end] = values
+        board.set_rows(first, rows)
+        self.moved_cells += sum(end - start for _, start, end, _ in runs)
+        return landed_rows
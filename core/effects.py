@@ -0,0 +1,136 @@
+from collections import Counter
+from itertools import chain
+
+from blocks.base_block import SPECIAL_CODES
+from core.board import row_mask
+
+EXPLODING = SPECIAL_CODES["exploding"]
+
+
+class EffectResult:
+    """一次批量应用特殊效果的结果"""
+    __slots__ = ("exploded", "detonations", "adapted_color", "freeze_ms")
+
+    def __init__(self):
+        self.exploded = 0  # 被爆炸清除的单元格数
+        self.detonations = 0  # 引爆次数（包括连锁引爆）
+        self.adapted_color = None  # 彩虹方块适应后的颜色
+        self.freeze_ms = 0  # 冰冻方块让下落暂停的时间(毫秒)
+
+    @property
+    def triggered(self):
+        return bool(self.detonations or self.adapted_color is not None or self.freeze_ms)
+
+
+class EffectEngine:
+    """特殊方块效果：放置特殊方块时先排队，每次锁定后统一批量应用
+
+    exploding  清除方块中心周围 (2*radius+1)^2 范围内的单元格；范围内其他爆炸方块的单元格会连锁引爆，
+               每次锁定最多引爆 max_detonations 次。所有爆炸范围先合并为每行一个位掩码，最后一次写入游戏板。
+    rainbow    统计方块周围一圈单元格的颜色，把方块变成出现最多的颜色。
+    freezing   暂停自动下落 freeze_ms 毫秒（由Game的下落计时使用）。
+    """
+
+    def __init__(self, explosion_radius=2, max_detonations=8, rainbow_radius=1, freeze_ms=3000):
+        self.explosion_radius = explosion_radius
+        self.max_detonations = max_detonations
+        self.rainbow_radius = rainbow_radius
+        self.freeze_ms = freeze_ms
+        self.pending = []  # (类型, 单元格列表)
+
+    def queue(self, block):
+        """记录一个刚放置的特殊方块的效果，普通方块忽略"""
+        if block.is_special():
+            self.pending.append((block.type, block.get_occupied_cells()))
+
+    def apply(self, board):
+        """应用所有排队的效果，返回EffectResult"""
+        result = EffectResult()
+        if not self.pending:
+            return result
+        pending = self.pending
+        self.pending = []
+
+        explosions = [cells for kind, cells in pending if kind == "exploding"]
+        if explosions:
+            self._explode(board, explosions, result)
+        for kind, cells in pending:
+            if kind == "rainbow":
+                self._rainbow_adapt(board, cells, result)
+            elif kind == "freezing":
+                result.freeze_ms = max(result.freeze_ms, self.freeze_ms)
+        return result
+
+    def _explode(self, board, explosions, result):
+        grid = board.grid
+        width = board.width
+        height = board.height
+        radius = self.explosion_radius
+        # 每行要清除的单元格位掩码（第x位对应第x列）
+        masks = {}
+        # 待引爆的中心点；方块以其外接矩形的中心为爆炸中心
+        centers = []
+        # 已经引爆（或正在引爆的方块自身）的单元格，不再连锁引爆
+        spent = set()
+        for cells in explosions:
+            xs = [x for x, _ in cells]
+            ys = [y for _, y in cells]
+            centers.append(((min(xs) + max(xs)) // 2, (min(ys) + max(ys)) // 2))
+            spent.update(cells)
+
+        while centers and result.detonations < self.max_detonations:
+            cx, cy = centers.pop()
+            result.detonations += 1
+            left = max(0, cx - radius)
+            right = min(width, cx + radius + 1)
+            top = max(0, cy - radius)
+            bottom = min(height, cy + radius + 1)
+            if left >= right or top >= bottom:
+                continue
+            span = ((1 << (right - left)) - 1) << left
+            for y in range(top, bottom):
+                masks[y] = masks.get(y, 0) | span
+                # 范围内其他爆炸方块的单元格连锁引爆
+                row = grid[y]
+                x = left
+                while True:
+                    try:
+                        x = row.index(EXPLODING, x, right)
+                    except ValueError:
+                        break
+                    if (x, y) not in spent:
+                        spent.add((x, y))
+                        centers.append((x, y))
+                    x += 1
+
+        # 只清除非空的单元格，记录为一次变更
+        masks = {y: mask & row_mask(grid[y]) for y, mask in masks.items()}
+        masks = {y: mask for y, mask in masks.items() if mask}
+        if masks:
+            result.exploded = sum(bin(mask).count("1") for mask in masks.values())
+            board.fill_mask(sorted(masks.items()), 0)
+
+    def _rainbow_adapt(self, board, cells, result):
+        """把彩虹方块仍在游戏板上的单元格变为周围出现最多的颜色"""
+        grid = board.grid
+        value = SPECIAL_CODES["rainbow"]
+        height = board.height
+        # 部分固定在顶部之外的方块：负的行号会被Python当作倒数的行，先排除
+        cells = [(x, y) for x, y in cells if 0 <= y < height and grid[y][x] == value]
+        if not cells:
+            return  # 已经被爆炸清除
+        radius = self.rainbow_radius
+        left = max(0, min(x for x, _ in cells) - radius)
+        right = min(board.width, max(x for x, _ in cells) + radius + 1)
+        top = max(0, min(y for _, y in cells) - radius)
+        bottom = min(board.height, max(y for _, y in cells) + radius + 1)
+        # 周围矩形区域内的颜色直方图，只统计普通颜色（正数），方块自身的单元格是负数，自然被排除
+        histogram = Counter(chain.from_iterable(row[left:right] for row in grid[top:bottom]))
+        colors = [(count, -color) for color, count in histogram.items() if color > 0]
+        if not colors:
+            return
+        # 出现次数最多的颜色，次数相同时取编号较小的颜色
+        color = -max(colors)[1]
+        board.set_cells((x, y, color) for x, y in cells)
+        result.adapted_color = color
+
@@ -0,0 +1,96 @@
+"""游戏事件总线：游戏逻辑把事件写入预先分配的环形缓冲区，音效、统计等订阅者按自己的节奏读取
+
+只有一个写入者（游戏逻辑），每个订阅者有自己的读取位置，因此写入和读取都不需要加锁：
+写入者先填好槽位再增加 head，读取者只读 [cursor, head) 之间的槽位。读取者落后超过
+缓冲区容量时，被覆盖的事件无法再读取，计入 dropped 并跳到最旧的可用事件。
+
+游戏逻辑只调用 emit()（写几个字段），不播放声音、不写盘；订阅者的处理在 drain() 中进行。
+事件的参数（a、b、c）按类型约定：
+    GAME_START         a=模式
+    PIECE_LOCKED       a=方块类型  b=消除的行数  c=(出现时间, 单元格值, 旋转次数, 壁踢次数,
+                       壁踢位掩码, 下落行数, 是否硬降, 空洞数, 堆叠高度)
+                       空洞数和堆叠高度只在 game.measure_stack_on_lock 打开时测量，否则为0
+    SPECIAL_TRIGGERED  （特殊方块生效）
+    HARD_DROP          （开始硬降）
+    LINES_CLEARED      a=消除的行数  b=连消计数
+    LEVEL_UP           a=新等级
+    GAME_OVER          a=分数  b=等级  c=模式
+"""
+
+PIECE_LOCKED = 1
+SPECIAL_TRIGGERED = 2
+HARD_DROP = 3
+LINES_CLEARED = 4
+LEVEL_UP = 5
+GAME_OVER = 6
+GAME_START = 7
+
+EVENT_NAMES = {
+    PIECE_LOCKED: "piece_locked",
+    SPECIAL_TRIGGERED: "special_triggered",
+    HARD_DROP: "hard_drop",
+    LINES_CLEARED: "lines_cleared",
+    LEVEL_UP: "level_up",
+    GAME_OVER: "game_over",
+    GAME_START: "game_start",
+}
+
+
+class EventBus:
+    """单写入者、多订阅者的环形事件缓冲区"""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        # 每个槽位是 [类型, 时间, a, b, c]，预先分配，写入时原地修改
+        self.slots = [[0, 0, None, None, None] for _ in range(capacity)]
+        self.head = 0  # 已写入的事件总数（下一个事件的序号）
+
+    def emit(self, kind, tick=0, a=None, b=None, c=None):
+        """写入一个事件（只由游戏逻辑调用）"""
+        slot = self.slots[self.head % self.capacity]
+        slot[0] = kind
+        slot[1] = tick
+        slot[2] = a
+        slot[3] = b
+        slot[4] = c
+        # 槽位填好之后才推进head，读取者不会看到写了一半的事件
+        self.head += 1
+
+    def subscribe(self):
+        """新建订阅，从下一个事件开始读取"""
+        return Subscription(self)
+
+
+class Subscription:
+    """一个订阅者的读取位置"""
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.cursor = bus.head
+        self.dropped = 0  # 因为落后太多而丢失的事件数
+
+    def poll(self):
+        """读取自上次以来的所有事件，返回 (类型, 时间, a, b, c) 元组的列表"""
+        bus = self.bus
+        head = bus.head
+        cursor = self.cursor
+        if head - cursor > bus.capacity:
+            self.dropped += head - cursor - bus.capacity
+            cursor = head - bus.capacity
+        capacity = bus.capacity
+        slots = bus.slots
+        events = [tuple(slots[seq % capacity]) for seq in range(cursor, head)]
+        # 复制期间写入者可能又绕了一圈，覆盖了开头的槽位：丢弃这些已失效的事件
+        stale = bus.head - capacity - cursor
+        if stale > 0:
+            self.dropped += stale
+            events = events[stale:]
+        self.cursor = head
+        return events
+
+    def drain(self, handler):
+        """把自上次以来的事件逐个交给 handler(类型, 时间, a, b, c)，返回处理的数量"""
+        events = self.poll()
+        for event in events:
+            handler(*event)
+        return len(events)
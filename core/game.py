@@ -1,41 +1,110 @@
+import os
 import pygame
-from core.board import Board
+from core.board import Board, measure_stack
+from core.cascade import CascadeGravity
+from core.effects import EffectEngine
+from core import events
+from core.rules import DEFAULT_RULESET
 from blocks.block_factory import BlockFactory
 from physics.engine import PhysicsEngine
 from ui.renderer import GameRenderer
-from sound.audio_manager import AudioManager
+from sound.audio_manager import AudioManager, SilentAudio
 from analytics.statistics import GameStatistics
-from copy import deepcopy
+from analytics.telemetry import TelemetryRecorder
+from utils.profiler import profiler
+from utils.settings import DEFAULTS, settings_store
+
+# 默认游戏板尺寸（列 x 行）
+DEFAULT_BOARD_WIDTH = 10
+DEFAULT_BOARD_HEIGHT = 20
+
+# 默认按键绑定：动作 -> 按键，值为None表示该玩家没有这个动作（例如对战中由比赛统一处理暂停）
+DEFAULT_KEY_BINDINGS = {
+    "left": pygame.K_LEFT,
+    "right": pygame.K_RIGHT,
+    "soft_drop": pygame.K_DOWN,
+    "rotate": pygame.K_UP,
+    "hard_drop": pygame.K_SPACE,
+    "pause": pygame.K_p,
+    "return": pygame.K_r
+}
+
+# 旋转无效时依次尝试的"壁踢"平移：先尝试小的移动，再尝试大的移动（序号即遥测中kick_mask的位）
+KICK_OFFSETS = (
+    (-1, 0), (1, 0),  # 左右移动1格
+    (-2, 0), (2, 0),  # 左右移动2格
+    (0, -1),          # 上移1格(用于特殊情况)
+    (-1, -1), (1, -1) # 对角线移动
+)
 
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, board_width=DEFAULT_BOARD_WIDTH, board_height=DEFAULT_BOARD_HEIGHT,
+                 renderer=None, audio=None, stats=None, record_stats=True,
+                 key_bindings=None, time_source=None, rng=None, rules=None, settings=None):
+        """创建一局游戏
+
+        screen为None时以无界面模式运行（不渲染、不播放声音），供对战服务器和模拟使用。
+        renderer、audio、stats可以由多个Game共享；time_source替换pygame.time.get_ticks，
+        用于在固定步长的模拟时钟上运行；rng是方块生成使用的随机数生成器；
+        rules是计分、升级和下落速度使用的规则（RuleSet，默认为DEFAULT_RULESET）；
+        settings是设置快照，默认读取设置文件，无界面模式下使用默认设置，保证模拟结果可重复。
+        """
         self.screen = screen
-        self.board = Board(10, 20)  # 10x20的游戏板
-        self.block_factory = BlockFactory()
+        if settings is None:
+            settings = settings_store.current if screen is not None else DEFAULTS
+        self.settings = settings
+        self.board = Board(board_width, board_height)  # 默认10x20的游戏板
+        self.block_factory = BlockFactory(board_width=board_width, rng=rng)
+        self.block_pool = self.block_factory.pool  # 方块对象池，与工厂共享
         self.physics = PhysicsEngine()
-        self.renderer = GameRenderer(screen)
-        self.audio = AudioManager()
-        self.stats = GameStatistics()
+        self.effects = EffectEngine()  # 特殊方块效果，每次放置后批量应用
+        self.cascade = None  # 连锁重力，由规则决定是否启用
+        if screen is not None:
+            self.renderer = renderer or GameRenderer(screen)
+            self.audio = audio or AudioManager()
+        else:
+            self.renderer = renderer
+            self.audio = audio or SilentAudio()
+        if stats is None and record_stats and screen is not None:
+            stats = GameStatistics()
+        self.stats = stats
+        self.record_stats = record_stats and stats is not None  # 是否把本局数据写入统计
+        self.get_ticks = time_source or pygame.time.get_ticks
+        
+        # 事件总线：游戏逻辑只写入事件，音效和统计作为订阅者在每帧逻辑更新之后处理，
+        # 逻辑本身不播放声音也不写盘（无界面模式下没有订阅者）。回放、联机等也可以订阅。
+        self.events = events.EventBus()
+        self.subscribers = []  # (订阅, 处理函数)
+        if not isinstance(self.audio, SilentAudio):
+            self.add_subscriber(self.audio.handle_event)
+        if self.record_stats:
+            self.add_subscriber(self.stats.handle_event)
+        # 遥测：逐个方块记录出现和固定时间、旋转、壁踢、下落距离、空洞和堆叠高度（见analytics/telemetry.py）
+        self.telemetry = None
+        self.measure_stack_on_lock = False  # 方块固定时测量空洞和堆叠高度（挂接遥测记录器时打开）
+        if self.record_stats and self.settings.telemetry:
+            self.telemetry = TelemetryRecorder(self, os.path.join(self.settings.data_dir, "telemetry"))
+            self.add_subscriber(self.telemetry.handle_event)
+        
+        # 方块放置（并完成消行）后的回调（同步调用）：on_lock(game, lines_cleared)，对战模式用它收发垃圾行
+        self.on_lock = None
         
         self.current_block = None
         self.next_block = None
+        self._reset_piece_stats()
         self.game_over = False
         self.score = 0
         self.level = 1
         self.mode = "classic"
+        self.ruleset = rules or DEFAULT_RULESET
+        self.rules = self.ruleset.for_mode(self.mode)  # 当前模式编译后的规则表
         self.last_fall_time = 0
-        self.fall_speed = 1000  # 初始下落速度 (毫秒)
-        
-        # 扩展按键状态跟踪，包含所有方向键
-        self.last_key_states = {
-            pygame.K_UP: False,
-            pygame.K_DOWN: False,
-            pygame.K_LEFT: False,
-            pygame.K_RIGHT: False,
-            pygame.K_SPACE: False,
-            pygame.K_p: False,
-            pygame.K_r: False
-        }
+        self.fall_speed = self.rules.fall_speed(1)  # 初始下落速度 (毫秒)
+        self.cascade = CascadeGravity() if self.rules.cascade else None
+        
+        # 按键绑定和按键状态跟踪
+        self.key_bindings = dict(key_bindings or DEFAULT_KEY_BINDINGS)
+        self.last_key_states = {key: False for key in self.key_bindings.values() if key is not None}
         
         # 添加硬降状态跟踪
         self.is_hard_dropping = False
@@ -44,14 +113,17 @@ class Game:
 
         # 添加软降状态跟踪
         self.is_soft_dropping = False
-        self.soft_drop_factor = 3  # 软降加速系数，下落速度会变为原来的1/5
+        self.soft_drop_factor = self.settings.soft_drop_factor  # 软降加速系数，下落间隔除以该系数
+        
+        # 冰冻方块：在此时间之前暂停自动下落
+        self.frozen_until = 0
 
         # 添加幽灵方块属性
         self.ghost_block = None
-        self.show_ghost = True  # 可以通过设置选项控制是否显示幽灵方块
+        self.show_ghost = self.settings.show_ghost  # 由设置文件控制是否显示幽灵方块
 
         # 添加限时模式的时间相关属性
-        self.time_limit = 180  # 默认3分钟（180秒）
+        self.time_limit = self.settings.time_limit or self.rules.time_limit  # 默认3分钟（180秒）
         self.time_remaining = self.time_limit
         self.last_time_tick = 0
 
@@ -72,27 +144,49 @@ class Game:
         self.combo_show = False  # 是否显示连消信息
         self.last_lines_cleared = 0  # 最后一次消除的行数
     
+    def add_subscriber(self, handler):
+        """订阅游戏事件：handler(类型, 时间, a, b, c) 在每次update()的逻辑更新之后被调用"""
+        subscription = self.events.subscribe()
+        self.subscribers.append((subscription, handler))
+        return subscription
+    
+    def dispatch_events(self):
+        """把新事件交给各订阅者处理"""
+        for subscription, handler in self.subscribers:
+            subscription.drain(handler)
+    
     def set_mode(self, mode):
         """设置游戏模式"""
         self.mode = mode
+        self.rules = self.ruleset.for_mode(mode)
         self.game_over = False
         self.score = 0
         self.level = 1
+        self.fall_speed = self.rules.fall_speed(1)
+        self.time_limit = self.settings.time_limit or self.rules.time_limit
+        self.cascade = CascadeGravity() if self.rules.cascade else None
+        self.frozen_until = 0
         self.board.clear()
+        # 回收上一局遗留的方块
+        self.block_pool.release(self.current_block)
+        if self.next_block is not self.current_block:  # 游戏结束时两者可能是同一实例
+            self.block_pool.release(self.next_block)
         self.current_block = self.block_factory.create_block(mode)
         self.next_block = self.block_factory.create_block(mode)
+        self._reset_piece_stats()
+        self.events.emit(events.GAME_START, self.get_ticks(), mode)
         self.audio.play_music(f"{mode}_theme")
-        self.audio.set_music_volume(0.2)  # 设置背景音乐音量
         self.is_hard_dropping = False  # 重置硬降状态
+        self.block_pool.release(self.ghost_block)
         self.ghost_block = None
         
         # 获取此模式下的历史最高分
-        self.highest_score = self.stats.get_highest_score(mode)
+        self.highest_score = self.stats.get_highest_score(mode) if self.stats is not None else 0
         
         # 重置时间（仅在限时模式下有效）
         if mode == "timed":
             self.time_remaining = self.time_limit
-            self.last_time_tick = pygame.time.get_ticks()
+            self.last_time_tick = self.get_ticks()
         
         # 重置状态
         self.paused = False
@@ -103,21 +197,53 @@ class Game:
         self.combo_count = 0
         self.combo_show = False
     
-    def update(self):
-        """更新游戏状态"""
-        current_time = pygame.time.get_ticks()
+    def _reset_piece_stats(self):
+        """新方块出现：重置逐个方块的统计（只是几个计数，固定时随PIECE_LOCKED事件发出）"""
+        self.piece_spawn_time = self.get_ticks()
+        self.piece_spawn_y = self.current_block.y if self.current_block else 0
+        self.piece_rotations = 0
+        self.piece_kicks = 0
+        self.piece_kick_mask = 0
+        self.piece_hard_dropped = False
+    
+    def _pressed(self, keys, action):
+        """动作对应的按键当前是否按下"""
+        key = self.key_bindings.get(action)
+        return key is not None and bool(keys[key])
+    
+    def _just_pressed(self, keys, action):
+        """动作对应的按键是否刚刚按下（上一帧未按下）"""
+        key = self.key_bindings.get(action)
+        return key is not None and bool(keys[key]) and not self.last_key_states.get(key, False)
+    
+    def _remember_keys(self, keys, *actions):
+        """记录这些动作的按键状态，用于下一帧的"按下抬起"判断"""
+        for action in actions:
+            key = self.key_bindings.get(action)
+            if key is not None:
+                self.last_key_states[key] = bool(keys[key])
+    
+    def update(self, keys=None, render=True):
+        """更新游戏状态
+
+        keys为按键状态（可用按键码索引），默认读取pygame.key.get_pressed()；
+        render为False时只更新逻辑，由调用者统一渲染（例如对战模式）。
+        """
+        current_time = self.get_ticks()
+        render = render and self.renderer is not None
         
         # 处理键盘输入 - 暂停和返回功能
-        keys = pygame.key.get_pressed()
+        if keys is None:
+            keys = pygame.key.get_pressed()
         
         # 检查P键按下（暂停/继续）
-        if keys[pygame.K_p] and not self.last_key_states.get(pygame.K_p, False):
+        if self._just_pressed(keys, "pause"):
             self.paused = not self.paused
             if self.paused:
                 self.audio.play_sound("menu_select")
             
         # 检查R键按下（返回确认）
-        if keys[pygame.K_r] and not self.last_key_states.get(pygame.K_r, False):
+        if self._just_pressed(keys, "return"):
             if self.return_confirm:
                 # 已经在确认状态，确认返回
                 return "return_to_menu"
@@ -128,8 +254,7 @@ class Game:
                 self.audio.play_sound("menu_select")
         
         # 更新按键状态
-        self.last_key_states[pygame.K_p] = keys[pygame.K_p]
-        self.last_key_states[pygame.K_r] = keys[pygame.K_r]
+        self._remember_keys(keys, "pause", "return")
         
         # 检查返回确认超时
         if self.return_confirm and current_time - self.return_confirm_time > self.return_confirm_duration:
@@ -147,17 +272,22 @@ class Game:
         # 如果游戏暂停，只进行渲染，不更新游戏状态
         if self.paused:
             # 渲染暂停状态的游戏
-            self.renderer.render_game(
-                self.board, self.current_block, self.next_block,
-                self.score, self.level, self.mode, self.ghost_block,
-                self.time_remaining if self.mode == "timed" else None,
-                paused=True, return_confirm=self.return_confirm,
-                game_over=self.game_over_display
-            )
+            if render:
+                with profiler.section("render"):
+                    self.renderer.render_game(
+                        self.board, self.current_block, self.next_block,
+                        self.score, self.level, self.mode, self.ghost_block,
+                        self.time_remaining if self.mode == "timed" else None,
+                        paused=True, return_confirm=self.return_confirm,
+                        game_over=self.game_over_display
+                    )
             return "playing"
         
+        if self.game_over:
+            # 游戏已结束：结束画面显示期间不再处理输入和下落（否则会继续固定方块、重复保存本局记录）
+            self.is_hard_dropping = False
         # 如果处于硬降状态，执行快速下落
-        if self.is_hard_dropping:
+        elif self.is_hard_dropping:
             # 高速下落
             if current_time - self.last_hard_drop_time > self.hard_drop_speed:
                 # 尝试下移方块
@@ -167,43 +297,39 @@ class Game:
                 self.last_hard_drop_time = current_time
         else:
             # 正常游戏逻辑
-            # 处理键盘输入
-            keys = pygame.key.get_pressed()
-            
             # 修改所有方向键的处理逻辑，使用"按下抬起"模式
             # 左移动
-            if keys[pygame.K_LEFT] and not self.last_key_states[pygame.K_LEFT]:
+            if self._just_pressed(keys, "left"):
                 self._move_block(-1, 0)
             
             # 右移动
-            if keys[pygame.K_RIGHT] and not self.last_key_states[pygame.K_RIGHT]:
+            if self._just_pressed(keys, "right"):
                 self._move_block(1, 0)
             
             # 下移 - 移除"按下抬起"模式限制，支持长按
             # 设置软降状态，用于加速下落
-            self.is_soft_dropping = keys[pygame.K_DOWN]
-            if keys[pygame.K_DOWN]:
+            self.is_soft_dropping = self._pressed(keys, "soft_drop")
+            if self.is_soft_dropping:
                 self._move_block(0, 1)
                 
             # 旋转和硬降
-            if keys[pygame.K_UP] and not self.last_key_states[pygame.K_UP]:
+            if self._just_pressed(keys, "rotate"):
                 self._rotate_block()
-            if keys[pygame.K_SPACE] and not self.last_key_states[pygame.K_SPACE]:
+            if self._just_pressed(keys, "hard_drop"):
                 self._hard_drop()
                 
             # 更新所有按键状态记录
-            self.last_key_states[pygame.K_LEFT] = keys[pygame.K_LEFT]
-            self.last_key_states[pygame.K_RIGHT] = keys[pygame.K_RIGHT]
-            self.last_key_states[pygame.K_DOWN] = keys[pygame.K_DOWN]
-            self.last_key_states[pygame.K_UP] = keys[pygame.K_UP]
-            self.last_key_states[pygame.K_SPACE] = keys[pygame.K_SPACE]
+            self._remember_keys(keys, "left", "right", "soft_drop", "rotate", "hard_drop")
                 
             # 自动下落 - 考虑软降状态，调整下落速度
             current_fall_speed = self.fall_speed
             if self.is_soft_dropping:
                 current_fall_speed = self.fall_speed // self.soft_drop_factor
             
-            if current_time - self.last_fall_time > current_fall_speed:
+            if current_time < self.frozen_until:
+                # 冰冻期间暂停自动下落，解冻后重新计时
+                self.last_fall_time = current_time
+            elif current_time - self.last_fall_time > current_fall_speed:
                 self._move_block(0, 1)
                 self.last_fall_time = current_time
             
@@ -219,8 +345,7 @@ class Game:
             if self.time_remaining <= 0:
                 self.time_remaining = 0
                 self.game_over = True
-                self.audio.play_sound("game_over")
-                self.stats.save_game_data(self.score, self.level, self.mode)
+                self.events.emit(events.GAME_OVER, current_time, self.score, self.level, self.mode)
         
         # 检查连消显示是否应该隐藏
         if self.combo_show and current_time - self.combo_timer > self.combo_display_duration:
@@ -230,22 +355,42 @@ class Game:
         if self.current_block and self.show_ghost:
             self._update_ghost_block()
         
+        # 逻辑更新完毕，订阅者处理本帧的事件（播放音效、累计统计）
+        if self.subscribers:
+            self.dispatch_events()
+        
         # 渲染游戏
-        time_display = self.time_remaining if self.mode == "timed" else None
-        self.renderer.render_game(
-            self.board, self.current_block, self.next_block,
-            self.score, self.level, self.mode, self.ghost_block,
-            time_display, paused=False, return_confirm=self.return_confirm,
-            game_over=self.game_over_display, 
-            combo_info=(self.combo_count, self.combo_show, self.last_lines_cleared),
-            highest_score=self.highest_score  # 传递最高分信息
-        )
+        if render:
+            time_display = self.time_remaining if self.mode == "timed" else None
+            with profiler.section("render"):
+                self.renderer.render_game(
+                    self.board, self.current_block, self.next_block,
+                    self.score, self.level, self.mode, self.ghost_block,
+                    time_display, paused=False, return_confirm=self.return_confirm,
+                    game_over=self.game_over_display, 
+                    combo_info=(self.combo_count, self.combo_show, self.last_lines_cleared,
+                                self._combo_alpha(current_time)),
+                    highest_score=self.highest_score  # 传递最高分信息
+                )
         
         if self.game_over_display:
             # 游戏结束时不再自动返回菜单，需按Q键返回
             return "playing"  
         return "game_over" if self.game_over else "playing"
 
+    def is_static(self):
+        """画面是否静止：暂停中，或游戏结束画面显示完毕后，只有按键才会改变画面（主循环据此等待事件）"""
+        if self.paused:
+            return True
+        return self.game_over_display and self.get_ticks() - self.game_over_time > self.game_over_duration
+
+    def _combo_alpha(self, current_time):
+        """计算连消横幅的透明度：最后500毫秒逐渐淡出"""
+        remaining = self.combo_display_duration - (current_time - self.combo_timer)
+        if remaining >= 500:
+            return 255
+        return max(0, remaining * 255 // 500)
+
     def _move_block(self, dx, dy):
         """移动当前方块，返回是否成功移动"""
         # 利用物理引擎检查移动是否有效
@@ -275,27 +420,23 @@ class Game:
         
         # 如果旋转位置有效，直接返回
         if self.physics.is_valid_position(self.current_block, self.board):
+            self.piece_rotations += 1
             # 如果旋转成功，重新计算幽灵方块
             if self.show_ghost:
                 self._update_ghost_block()
             return
         
         # 旋转位置无效，尝试"壁踢"
-        # 定义平移尝试顺序：先尝试小的移动，再尝试大的移动
-        offsets = [
-            (-1, 0), (1, 0),  # 左右移动1格
-            (-2, 0), (2, 0),  # 左右移动2格
-            (0, -1),          # 上移1格(用于特殊情况)
-            (-1, -1), (1, -1) # 对角线移动
-        ]
-        
-        for dx, dy in offsets:
+        for index, (dx, dy) in enumerate(KICK_OFFSETS):
             # 尝试平移
             self.current_block.x += dx
             self.current_block.y += dy
             
             # 检查平移后位置是否有效
             if self.physics.is_valid_position(self.current_block, self.board):
+                self.piece_rotations += 1
+                self.piece_kicks += 1
+                self.piece_kick_mask |= 1 << index
                 # 找到有效位置，重新计算幽灵方块
                 if self.show_ghost:
                     self._update_ghost_block()
@@ -313,80 +454,84 @@ class Game:
         """硬降实现为极速下落，而不是瞬间到底"""
         # 设置硬降状态
         self.is_hard_dropping = True
-        self.last_hard_drop_time = pygame.time.get_ticks()
-        # 播放相应音效
-        self.audio.play_sound("special_block")  # 或者创建一个专用的硬降音效
+        self.last_hard_drop_time = self.get_ticks()
+        self.piece_hard_dropped = True
+        self.events.emit(events.HARD_DROP, self.last_hard_drop_time)
     
     def _place_block(self):
         """放置方块并检查消行"""
         self.board.place_block(self.current_block)
-        self.audio.play_sound("block_placed")
+        tick = self.get_ticks()
+        
+        # 特殊方块的效果（爆炸、彩虹、冰冻）在消行之前一次性应用
+        self.effects.queue(self.current_block)
+        effect = self.effects.apply(self.board)
+        if effect.triggered:
+            self.events.emit(events.SPECIAL_TRIGGERED, tick)
+        if effect.freeze_ms:
+            self.frozen_until = tick + effect.freeze_ms
         
         # 检查消行并更新分数
-        lines_cleared = self.board.clear_lines()
+        # 只有刚放置方块所在的行可能被填满
+        lines_cleared = self.board.clear_lines(self.board.last_placed_rows)
+        # 连锁重力：爆炸或消行后悬空的方块团下落，落地后可能继续消行
+        if self.cascade is not None and (lines_cleared or effect.exploded):
+            lines_cleared += self.cascade.settle(self.board)
         self.last_lines_cleared = lines_cleared  # 保存消除的行数
         
         if lines_cleared > 0:
             # 连消计数增加
             self.combo_count += 1
             self.combo_show = True  # 确保设置为True
-            self.combo_timer = pygame.time.get_ticks()
+            self.combo_timer = tick
             
-            # 基础分数计算
-            base_score = lines_cleared * 100 * self.level
+            # 分数 = (基础分 + 行数奖励 + 连消奖励) * 等级，由规则表查出
+            self.score += self.rules.clear_score(lines_cleared, self.combo_count, self.level)
             
-            # 连消奖励计算 - 每次连消增加递增的奖励
-            combo_bonus = 0
-            if self.combo_count > 1:  # 第二次连消开始计算奖励
-                combo_bonus = self.combo_count * 50 * self.level  # 连消倍数 * 50 * 等级
+            self.events.emit(events.LINES_CLEARED, tick, lines_cleared, self.combo_count)
             
-            # 行数奖励 - 一次消除多行有额外奖励
-            line_bonus = 0
-            if lines_cleared >= 4:  # 一次消4行
-                line_bonus = 800 * self.level
-            elif lines_cleared >= 3:  # 一次消3行
-                line_bonus = 300 * self.level
-            elif lines_cleared >= 2:  # 一次消2行
-                line_bonus = 100 * self.level
-                
-            # 总分 = 基础分 + 连消奖励 + 行数奖励
-            total_score = base_score + combo_bonus + line_bonus
-            self.score += total_score
-            
-            # 播放连消音效
-            if self.combo_count >= 3:
-                self.audio.play_sound("combo_special")  # 特殊连消音效
-            else:
-                self.audio.play_sound("line_clear")
-            
-            # 每清除10行提升一个等级
-            if self.score // 1000 > self.level - 1:
-                self.level += 1
-                self.fall_speed = max(100, 1000 -(self.level - 1) * 100)
-                self.audio.play_sound("level_up")
+            # 分数达到下一级的门槛时升级（每次消行最多升一级）
+            level = self.rules.next_level(self.score, self.level)
+            if level != self.level:
+                self.level = level
+                self.fall_speed = self.rules.fall_speed(level)
+                self.events.emit(events.LEVEL_UP, tick, level)
         else:
             # 没有消行，重置连消计数
             self.combo_count = 0
             self.combo_show = False
         
-        self.stats.update(lines_cleared, self.current_block.type)
+        block = self.current_block
+        # 在on_lock（例如对战模式加入垃圾行）之前测量，反映的是这个方块固定后的游戏板
+        holes, height = measure_stack(self.board) if self.measure_stack_on_lock else (0, 0)
+        self.events.emit(events.PIECE_LOCKED, tick, block.type, lines_cleared,
+                         (self.piece_spawn_time, block.get_cell_value(), self.piece_rotations,
+                          self.piece_kicks, self.piece_kick_mask, block.y - self.piece_spawn_y,
+                          self.piece_hard_dropped, holes, height))
+        
+        # 已放置的方块数据已写入游戏板，实例归还对象池
+        self.block_pool.release(self.current_block)
+        
+        # 通知外部（例如对战模式收发垃圾行）
+        if self.on_lock is not None:
+            self.on_lock(self, lines_cleared)
         
         # 更改方块生成逻辑：首先检查是否可以放置下一个方块
         self.current_block = self.next_block
         
-        # 检查游戏是否应该结束
-        if not self.physics.is_valid_position(self.current_block, self.board):
+        # 检查游戏是否应该结束（垃圾行把方块顶出游戏板顶部同样算作结束）
+        if self.board.topped_out or not self.physics.is_valid_position(self.current_block, self.board):
             self.game_over = True
-            self.audio.play_sound("game_over")
-            self.stats.save_game_data(self.score, self.level, self.mode)
+            self.events.emit(events.GAME_OVER, tick, self.score, self.level, self.mode)
             # 不再直接返回game_over，而是启动显示结束分数的倒计时
             self.game_over_display = True
-            self.game_over_time = pygame.time.get_ticks()
+            self.game_over_time = tick
             # 游戏结束后不再生成新方块
             return
         
         # 只有游戏未结束时才生成新的下一个方块
         self.next_block = self.block_factory.create_block(self.mode)
+        self._reset_piece_stats()
         
         # 在更新分数后检查是否超过最高分
         if self.score > self.highest_score:
@@ -395,12 +540,16 @@ class Game:
     def _update_ghost_block(self):
         """更新幽灵方块位置 - 计算当前方块直接落到底部的位置"""
         if not self.current_block:
+            self.block_pool.release(self.ghost_block)
             self.ghost_block = None
             return
             
-        # 创建当前方块的深拷贝
-        self.ghost_block = deepcopy(self.current_block)
-        
-        # 将幽灵方块移动到底部
-        while self.physics.can_move(self.ghost_block, self.board, 0, 1):
-            self.ghost_block.move(0, 1)
+        with profiler.section("ghost"):
+            # 复用幽灵方块实例，只复制当前方块的状态
+            if self.ghost_block is None:
+                self.ghost_block = self.block_pool.acquire_copy(self.current_block)
+            else:
+                self.ghost_block.copy_from(self.current_block)
+            
+            # 将幽灵方块直接移动到底部
+            self.ghost_block.move(0, self.physics.drop_distance(self.ghost_block, self.board))
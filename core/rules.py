@@ -0,0 +1,123 @@
+"""规则表：计分、升级门槛和下落速度曲线
+
+规则用普通的字典描述（可以从JSON文件加载），每种游戏模式可以覆盖其中的部分项。
+使用前按模式编译为扁平的查找表，游戏中计分、升级和调整下落速度都只是按下标查表，
+调整规则或对比不同规则（见 core/simulator.py）都不需要修改代码。
+"""
+import json
+
+# 默认规则，与原先写在Game中的计算方式一致
+DEFAULT_RULES = {
+    "line_score": 100,  # 每消除一行的基础分（乘以等级）
+    "line_bonus": [0, 0, 100, 300, 800],  # 一次消除N行的额外奖励（乘以等级），超出部分按最后一项
+    "combo_score": 50,  # 第二次及以后的连续消行奖励：连消次数 * combo_score * 等级
+    "max_combo": 255,  # 连消奖励表的长度，更高的连消次数按最后一项计算
+    "level_score": 1000,  # 每升一级所需的分数；也可以用 level_thresholds 直接给出每级的门槛
+    "level_thresholds": None,
+    "max_level": 99,
+    # 下落间隔(毫秒)：从start开始每级变化step，不低于min；也可以用 fall_speeds 直接给出每级的间隔
+    "gravity": {"start": 1000, "step": -100, "min": 100},
+    "fall_speeds": None,
+    "time_limit": 180,  # 限时模式的时长(秒)
+    "cascade": False,  # 连锁重力：爆炸或消行后悬空的方块团下落（见core/cascade.py）
+    "modes": {}  # 模式名 -> 覆盖的规则项
+}
+
+
+class Rules:
+    """按模式编译好的规则表（只读）"""
+    __slots__ = ("mode", "line_score", "max_line_bonus", "clear_scores", "combo_scores", "level_thresholds", "fall_speeds",
+                 "max_level", "time_limit", "cascade")
+
+    def __init__(self, spec, mode=None):
+        self.mode = mode
+        line_score = self.line_score = spec["line_score"]
+        bonus = list(spec["line_bonus"]) or [0]
+        self.max_line_bonus = bonus[-1]
+        # 一次消除的行数 -> 每级得分（基础分 + 多行奖励）；更多的行数（连锁重力下的高游戏板）在clear_score中计算
+        self.clear_scores = tuple(lines * line_score + bonus[min(lines, len(bonus) - 1)]
+                                  for lines in range(max(len(bonus), 16)))
+        # 连消次数 -> 每级奖励，第一次消行没有连消奖励
+        combo_score = spec["combo_score"]
+        self.combo_scores = tuple(combo * combo_score if combo > 1 else 0
+                                  for combo in range(spec["max_combo"] + 1))
+
+        max_level = self.max_level = spec["max_level"]
+        # 下标为等级（下标0不使用），升到该等级所需的分数
+        thresholds = spec["level_thresholds"]
+        if thresholds is None:
+            thresholds = [(level - 1) * spec["level_score"] for level in range(1, max_level + 1)]
+        self.level_thresholds = (0,) + tuple(_extend(thresholds, max_level))
+
+        speeds = spec["fall_speeds"]
+        if speeds is None:
+            gravity = spec["gravity"]
+            speeds = [max(gravity["min"], gravity["start"] + (level - 1) * gravity["step"])
+                      for level in range(1, max_level + 1)]
+        self.fall_speeds = (speeds[0],) + tuple(_extend(speeds, max_level))
+        self.time_limit = spec["time_limit"]
+        self.cascade = bool(spec["cascade"])
+
+    def clear_score(self, lines, combo, level):
+        """一次消除lines行（当前连消次数combo）得到的分数"""
+        clear_scores = self.clear_scores
+        combo_scores = self.combo_scores
+        if lines < len(clear_scores):
+            clear = clear_scores[lines]
+        else:
+            clear = lines * self.line_score + self.max_line_bonus
+        return (clear + combo_scores[min(combo, len(combo_scores) - 1)]) * level
+
+    def next_level(self, score, level):
+        """分数达到下一级的门槛时返回下一级，否则返回当前等级"""
+        if level < self.max_level and score >= self.level_thresholds[level + 1]:
+            return level + 1
+        return level
+
+    def fall_speed(self, level):
+        """该等级的下落间隔(毫秒)"""
+        return self.fall_speeds[min(level, self.max_level)]
+
+
+def _extend(values, length):
+    """截断或用最后一项补齐到指定长度"""
+    values = list(values[:length])
+    return values + [values[-1]] * (length - len(values))
+
+
+def _merge(base, override):
+    """用override覆盖base中的项；两边都是字典的项（例如gravity）逐项合并"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+class RuleSet:
+    """一套规则：默认项加上各模式的覆盖项，按模式编译一次后缓存"""
+
+    def __init__(self, spec=None, name="default"):
+        self.name = name
+        self.spec = _merge(DEFAULT_RULES, spec or {})
+        self._compiled = {}
+
+    @classmethod
+    def load(cls, path):
+        """从JSON文件加载规则，文件中没有给出的项使用默认值"""
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec, name=spec.get("name", path))
+
+    def for_mode(self, mode):
+        """返回该模式编译后的规则表"""
+        rules = self._compiled.get(mode)
+        if rules is None:
+            spec = _merge(self.spec, self.spec["modes"].get(mode, {}))
+            rules = self._compiled[mode] = Rules(spec, mode)
+        return rules
+
+
+DEFAULT_RULESET = RuleSet()
@@ -0,0 +1,159 @@
+"""批量模拟：用放置AI无界面地进行多局游戏，比较不同规则下的分数、等级和游戏时长
+
+每套规则使用同一批种子（方块序列相同），结果可以逐局成对比较：
+    python -m core.simulator --games 50
+    python -m core.simulator --games 50 --rules rules_a.json rules_b.json
+
+--history-out 把每局结果按游戏历史的记录格式追加写入JSON Lines文件，供离线分析
+（python -m analytics.pipeline）使用。
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from analytics.telemetry import TelemetryRecorder
+from core.bot import PlacementBot
+from core.game import Game, DEFAULT_BOARD_WIDTH, DEFAULT_BOARD_HEIGHT
+from core.rules import DEFAULT_RULESET, RuleSet
+
+# 模拟使用的按键绑定：把动作序号当作"按键码"，按键状态是只有一位为True的元组
+ACTIONS = ("left", "right", "soft_drop", "rotate", "hard_drop")
+KEY_BINDINGS = {action: index for index, action in enumerate(ACTIONS)}
+KEY_BINDINGS["pause"] = None
+KEY_BINDINGS["return"] = None
+IDLE_KEYS = (False,) * len(ACTIONS)
+ACTION_KEYS = {action: tuple(i == index for i in range(len(ACTIONS))) for index, action in enumerate(ACTIONS)}
+
+
+class _LockCounter:
+    """统计放置的方块数、各类型方块数和消除的行数（Game.on_lock回调）"""
+
+    def __init__(self):
+        self.pieces = 0
+        self.lines = 0
+        self.block_types = {}
+
+    def __call__(self, game, lines_cleared):
+        self.pieces += 1
+        self.lines += lines_cleared
+        block_type = game.current_block.type  # 回调时current_block还是刚放置的方块
+        self.block_types[block_type] = self.block_types.get(block_type, 0) + 1
+
+
+def simulate_game(ruleset=DEFAULT_RULESET, seed=0, mode="classic", max_seconds=300, tick_ms=16,
+                  board_width=DEFAULT_BOARD_WIDTH, board_height=DEFAULT_BOARD_HEIGHT, bot=None,
+                  telemetry_dir=None):
+    """用放置AI进行一局游戏，游戏结束或模拟时间达到max_seconds时停止，返回本局统计
+
+    指定telemetry_dir时把逐个方块的遥测写入该目录（每局一个文件，见analytics/telemetry.py）。
+    """
+    clock = [0]
+    game = Game(None, board_width, board_height, record_stats=False, key_bindings=KEY_BINDINGS,
+                time_source=lambda: clock[0], rng=random.Random(seed), rules=ruleset)
+    game.show_ghost = False
+    counter = game.on_lock = _LockCounter()
+    recorder = None
+    if telemetry_dir is not None:
+        recorder = TelemetryRecorder(game, telemetry_dir)
+        game.add_subscriber(recorder.handle_event)
+    game.set_mode(mode)
+    bot = bot or PlacementBot()
+    bot.reset()
+
+    max_ticks = int(max_seconds * 1000 / tick_ms)
+    tick = 0
+    while tick < max_ticks and not game.game_over:
+        tick += 1
+        clock[0] = tick * tick_ms
+        action = bot.next_action(game)
+        game.update(ACTION_KEYS[action] if action else IDLE_KEYS, render=False)
+    if recorder is not None:
+        game.dispatch_events()
+        recorder.close()
+    return {
+        "seed": seed,
+        "score": game.score,
+        "level": game.level,
+        "lines": counter.lines,
+        "pieces": counter.pieces,
+        "block_types": counter.block_types,
+        "seconds": tick * tick_ms / 1000,
+        "game_over": game.game_over,
+    }
+
+
+def run_batch(rulesets, games=20, seed=0, **options):
+    """每套规则用相同的种子各模拟games局，返回 {规则名称: [每局统计]}"""
+    seeds = [seed + i for i in range(games)]
+    return {ruleset.name: [simulate_game(ruleset, s, **options) for s in seeds] for ruleset in rulesets}
+
+
+def summarize(results):
+    """汇总一组对局统计：各项的平均值、中位数和90分位，以及游戏结束的比例"""
+    summary = {"games": len(results),
+               "game_over_rate": sum(r["game_over"] for r in results) / len(results)}
+    for key in ("score", "level", "lines", "pieces", "seconds"):
+        values = sorted(r[key] for r in results)
+        summary[key] = {
+            "mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "p90": values[min(len(values) - 1, int(len(values) * 0.9))],
+        }
+    return summary
+
+
+def history_record(result, ruleset_name, mode):
+    """把一局的模拟结果转换为游戏历史的记录格式（与GameStatistics.save_game_data一致）"""
+    return {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "score": result["score"],
+        "level": result["level"],
+        "mode": mode,
+        "duration": result["seconds"],
+        "lines_cleared": result["lines"],
+        "blocks_placed": result["pieces"],
+        "block_types": result["block_types"],
+        "rules": ruleset_name,
+        "seed": result["seed"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用放置AI批量模拟对局，比较不同规则")
+    parser.add_argument("--rules", nargs="*", default=[], help="规则文件（JSON），不指定时使用默认规则")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", default="classic", choices=("classic", "timed", "challenge"))
+    parser.add_argument("--max-seconds", type=float, default=300, help="每局最长的模拟时间(秒)")
+    parser.add_argument("--telemetry", default=None, metavar="DIR", help="把逐个方块的遥测写入该目录")
+    parser.add_argument("--history-out", default=None, metavar="FILE",
+                        help="把每局结果按游戏历史的格式追加写入JSON Lines文件")
+    args = parser.parse_args(argv)
+
+    rulesets = [RuleSet.load(path) for path in args.rules] or [DEFAULT_RULESET]
+    start = time.perf_counter()
+    batch = run_batch(rulesets, args.games, args.seed, mode=args.mode, max_seconds=args.max_seconds,
+                      telemetry_dir=args.telemetry)
+    elapsed = time.perf_counter() - start
+    if args.history_out:
+        with open(args.history_out, "a", encoding="utf-8") as f:
+            for name, results in batch.items():
+                for result in results:
+                    f.write(json.dumps(history_record(result, name, args.mode), ensure_ascii=False) + "\n")
+
+    print(f"{'规则':<20}{'平均分':>10}{'分数中位数':>12}{'平均等级':>10}{'平均消行':>10}"
+          f"{'平均时长(秒)':>14}{'结束比例':>10}")
+    for name, results in batch.items():
+        summary = summarize(results)
+        print(f"{name:<20}{summary['score']['mean']:>10.0f}{summary['score']['median']:>12.0f}"
+              f"{summary['level']['mean']:>10.1f}{summary['lines']['mean']:>10.1f}"
+              f"{summary['seconds']['mean']:>14.1f}{summary['game_over_rate']:>10.0%}")
+    print(f"共模拟 {args.games * len(rulesets)} 局，耗时 {elapsed:.1f} 秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import random
+import pygame
+from core.game import Game, DEFAULT_BOARD_WIDTH, DEFAULT_BOARD_HEIGHT
+from ui.renderer import GameRenderer
+
+# 各玩家的按键绑定；暂停和返回由比赛统一处理，因此不绑定到单个玩家
+PLAYER_KEY_BINDINGS = [
+    {  # 玩家1：WASD + 空格
+        "left": pygame.K_a, "right": pygame.K_d, "soft_drop": pygame.K_s,
+        "rotate": pygame.K_w, "hard_drop": pygame.K_SPACE, "pause": None, "return": None
+    },
+    {  # 玩家2：方向键 + 右Ctrl
+        "left": pygame.K_LEFT, "right": pygame.K_RIGHT, "soft_drop": pygame.K_DOWN,
+        "rotate": pygame.K_UP, "hard_drop": pygame.K_RCTRL, "pause": None, "return": None
+    },
+    {  # 玩家3：IJKL + U
+        "left": pygame.K_j, "right": pygame.K_l, "soft_drop": pygame.K_k,
+        "rotate": pygame.K_i, "hard_drop": pygame.K_u, "pause": None, "return": None
+    },
+    {  # 玩家4：小键盘 8456 + 0
+        "left": pygame.K_KP4, "right": pygame.K_KP6, "soft_drop": pygame.K_KP5,
+        "rotate": pygame.K_KP8, "hard_drop": pygame.K_KP0, "pause": None, "return": None
+    }
+]
+
+# 一次消除的行数 -> 发送给对手的垃圾行数
+GARBAGE_TABLE = [0, 0, 1, 2, 4]
+
+VERSUS_CONTROLS = "玩家1: WASD 移动/旋转, 空格 硬降    玩家2: 方向键, 右Ctrl 硬降    P: 暂停  Q: 返回菜单"
+
+
+class VersusMatch:
+    """本地多人对战：多个游戏状态在同一进程中按固定步长同步推进，消行时向对手发送垃圾行"""
+
+    def __init__(self, screen, players=2, board_width=DEFAULT_BOARD_WIDTH,
+                 board_height=DEFAULT_BOARD_HEIGHT, audio=None, tick_ms=16, key_bindings=None):
+        self.screen = screen
+        self.tick_ms = tick_ms  # 固定模拟步长(毫秒)
+        self.max_ticks_per_update = 5  # 单帧最多追赶的步数，避免卡顿后雪崩
+        self.sim_time = 0  # 模拟时钟(毫秒)，所有玩家共享
+        self.accumulator = 0
+        self.last_real_time = 0
+
+        # 所有玩家共享一个渲染器（图集、文本缓存）和一个音频管理器
+        self.renderer = GameRenderer(screen) if screen is not None else None
+        key_bindings = key_bindings or PLAYER_KEY_BINDINGS
+        self.games = []
+        for i in range(players):
+            game = Game(screen, board_width, board_height,
+                        renderer=self.renderer, audio=audio, record_stats=False,
+                        key_bindings=key_bindings[i % len(key_bindings)],
+                        time_source=self._get_sim_time, rng=random.Random())
+            game.on_lock = self._on_lock
+            if audio is None:
+                audio = game.audio
+            self.games.append(game)
+
+        self.pending_garbage = [0] * players  # 每个玩家即将收到的垃圾行数
+        self.garbage_rng = random.Random()
+        self.paused = False
+        self.winner = None
+        self.last_key_states = {pygame.K_p: False, pygame.K_r: False}
+
+        # 渲染用的玩家视图，复用同一组字典避免每帧分配
+        self.views = [{"name": f"玩家{i + 1}", "pending_garbage": 0} for i in range(players)]
+
+    def _get_sim_time(self):
+        return self.sim_time
+
+    def start(self, seed=None):
+        """开始新的一局：所有玩家使用相同种子，获得完全相同的方块序列"""
+        if seed is None:
+            seed = random.randrange(1 << 30)
+        self.sim_time = 0
+        self.accumulator = 0
+        self.last_real_time = pygame.time.get_ticks()
+        self.paused = False
+        self.winner = None
+        self.garbage_rng.seed(seed)
+        for i, game in enumerate(self.games):
+            game.block_factory.random.seed(seed)
+            game.last_fall_time = 0
+            game.set_mode("versus")
+            self.pending_garbage[i] = 0
+
+    def _on_lock(self, game, lines_cleared):
+        """方块放置后：先用消行抵消自己待收的垃圾行，剩余部分发给下一位存活的对手，再接收垃圾行"""
+        index = self.games.index(game)
+        outgoing = GARBAGE_TABLE[min(lines_cleared, len(GARBAGE_TABLE) - 1)]
+        cancelled = min(outgoing, self.pending_garbage[index])
+        self.pending_garbage[index] -= cancelled
+        outgoing -= cancelled
+
+        if outgoing:
+            target = self._next_alive(index)
+            if target is not None:
+                self.pending_garbage[target] += outgoing
+
+        # 没有消行时，待收的垃圾行进入自己的游戏板
+        incoming = self.pending_garbage[index]
+        if incoming and not lines_cleared:
+            hole_x = self.garbage_rng.randrange(game.board.width)
+            game.board.add_garbage_rows(incoming, hole_x)
+            self.pending_garbage[index] = 0
+
+    def _next_alive(self, index):
+        """按顺序找到下一个仍在游戏中的玩家"""
+        count = len(self.games)
+        for offset in range(1, count):
+            candidate = (index + offset) % count
+            if not self.games[candidate].game_over:
+                return candidate
+        return None
+
+    def tick(self, keys):
+        """推进一个固定步长：所有存活玩家使用同一份按键状态（各自的按键绑定）更新一次"""
+        self.step([keys] * len(self.games))
+
+    def step(self, inputs):
+        """推进一个固定步长，inputs为每个玩家各自的按键状态（联机对战中来自不同客户端）"""
+        self.sim_time += self.tick_ms
+        for game, keys in zip(self.games, inputs):
+            if not game.game_over:
+                game.update(keys, render=False)
+
+        alive = [i for i, game in enumerate(self.games) if not game.game_over]
+        if len(alive) <= 1 and len(self.games) > 1:
+            self.winner = self.views[alive[0]]["name"] if alive else "平局"
+
+    def update(self, keys=None):
+        """每帧调用：处理暂停/重开，按固定步长推进模拟，最后一次性渲染所有游戏板"""
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        now = pygame.time.get_ticks()
+        elapsed = now - self.last_real_time
+        self.last_real_time = now
+
+        # P 键暂停，比赛结束后 R 键再来一局
+        if keys[pygame.K_p] and not self.last_key_states[pygame.K_p] and self.winner is None:
+            self.paused = not self.paused
+        if keys[pygame.K_r] and not self.last_key_states[pygame.K_r] and self.winner is not None:
+            self.start()
+        self.last_key_states[pygame.K_p] = keys[pygame.K_p]
+        self.last_key_states[pygame.K_r] = keys[pygame.K_r]
+
+        if not self.paused and self.winner is None:
+            self.accumulator = min(self.accumulator + elapsed, self.tick_ms * self.max_ticks_per_update)
+            while self.accumulator >= self.tick_ms:
+                self.accumulator -= self.tick_ms
+                self.tick(keys)
+                if self.winner is not None:
+                    break
+
+        self.render()
+        return "playing"
+
+    def render(self):
+        """把所有玩家的状态写入复用的视图字典并一次渲染"""
+        if self.renderer is None:
+            return
+        for i, game in enumerate(self.games):
+            view = self.views[i]
+            view["board"] = game.board
+            view["current_block"] = None if game.game_over else game.current_block
+            view["next_block"] = game.next_block
+            view["ghost_block"] = None if game.game_over else game.ghost_block
+            view["score"] = game.score
+            view["pending_garbage"] = self.pending_garbage[i]
+            view["game_over"] = game.game_over
+        self.renderer.render_versus(self.views, paused=self.paused, winner=self.winner,
+                                    controls=VERSUS_CONTROLS)
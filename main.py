@@ -1,13 +1,58 @@
 import pygame
+import os
 import sys
-from core.game import Game
+from core.game import Game, DEFAULT_BOARD_WIDTH, DEFAULT_BOARD_HEIGHT
 from ui.menu import MainMenu
+from ui.debug_overlay import DebugOverlay
+from ui.layout import SCALING_MODES, ScaledDisplay
 from utils.font_manager import FontManager
+from utils.frame_scheduler import FrameScheduler
+from utils.profiler import profiler
+from utils.settings import settings_store
 from utils.system_utils import switch_to_english_input  # 导入输入法切换功能
 
+def profile_requested():
+    """是否通过环境变量 TETRIS_PROFILE 开启了帧耗时分析"""
+    return os.environ.get("TETRIS_PROFILE", "") not in ("", "0")
+
+def quit_game():
+    """退出游戏，通过环境变量开启了性能分析时先导出帧耗时数据（F3调试信息不导出）"""
+    if profile_requested() and profiler.frame_count:
+        profiler.dump(os.environ.get("TETRIS_PROFILE_OUT", "frame_profile.json"))
+    settings_store.flush()  # 写入还在等待的设置修改
+    pygame.quit()
+    sys.exit()
+
+def parse_board_size(text):
+    """解析形如 "40x80" 的游戏板尺寸，格式无效时使用默认尺寸"""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+        if width >= 4 and height >= 4:
+            return width, height
+    except ValueError:
+        pass
+    return DEFAULT_BOARD_WIDTH, DEFAULT_BOARD_HEIGHT
+
+def create_display(settings):
+    """按设置创建窗口，返回(各界面绘制的Surface, 平滑缩放的ScaledDisplay或None)
+
+    native 方式下各界面直接在窗口上按窗口大小绘制；smooth 方式下画在800x680的缓冲区上，
+    每帧由ScaledDisplay缩放到窗口。
+    """
+    if settings.fullscreen:
+        window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        window = pygame.display.set_mode(tuple(settings.window_size), pygame.RESIZABLE)
+    if settings.render_scaling not in SCALING_MODES:
+        print(f"未知的缩放方式 {settings.render_scaling}（可选 {', '.join(SCALING_MODES)}），使用 native")
+    elif settings.render_scaling == "smooth":
+        display = ScaledDisplay(window)
+        return display.surface, display
+    return window, None
+
 def main():
     pygame.init()
-    screen = pygame.display.set_mode((800, 680))
+    screen, scaled_display = create_display(settings_store.current)
     pygame.display.set_caption("tetris")
     
     # 启动时尝试切换到英文输入法
@@ -16,23 +61,51 @@ def main():
     # 初始化字体管理器
     font_manager = FontManager()
     
+    # 设置环境变量 TETRIS_PROFILE=1 开启帧耗时分析，F3 切换屏幕调试信息
+    profiler.enabled = profile_requested()
+    # 帧调度：画面变化时60帧，静止时等待事件（最多100毫秒刷新一次，不超过菜单的按键重复间隔）
+    scheduler = FrameScheduler(fps=60, idle_wait_ms=100)
+    debug_overlay = DebugOverlay(profiler, scheduler=scheduler)
+    
     # 创建主菜单和游戏实例
+    # 设置环境变量 TETRIS_BOARD_SIZE=40x80 可以使用更大的游戏板（压力测试、派对模式）
+    board_width, board_height = parse_board_size(os.environ.get("TETRIS_BOARD_SIZE", ""))
     main_menu = MainMenu(screen)
-    game = Game(screen)
+    # 设置环境变量 TETRIS_RULES=rules.json 使用自定义规则（见 core/rules.py）
+    rules = None
+    if os.environ.get("TETRIS_RULES"):
+        from core.rules import RuleSet
+        rules = RuleSet.load(os.environ["TETRIS_RULES"])
+    game = Game(screen, board_width, board_height, rules=rules)
+    scheduler.add_target(game.renderer)
+    versus = None  # 对战模式在第一次进入时才创建
+    
+    # 设置环境变量 TETRIS_BROADCAST_PORT=9998 把单人游戏广播给观众（python -m net.broadcast 观看）
+    broadcast = None
+    if os.environ.get("TETRIS_BROADCAST_PORT"):
+        from net.broadcast import BroadcastHub, BroadcastServer
+        broadcast = BroadcastServer(BroadcastHub(game), port=int(os.environ["TETRIS_BROADCAST_PORT"]))
     
     current_screen = "menu"  # 初始界面为菜单
     
     # 主循环
-    clock = pygame.time.Clock()
     while True:
-        for event in pygame.event.get():
+        # 菜单、暂停和游戏结束等静止画面不按60帧重绘，而是等待事件（超时后仍刷新一次，
+        # 以便处理按住方向键的重复和返回确认提示的超时）
+        waited = scheduler.wait()
+        profiler.begin_frame()
+        with profiler.section("input"):
+            events = scheduler.poll_events(waited)
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
             
             if event.type == pygame.KEYDOWN:
-                # 在游戏界面按Q返回菜单
-                if event.key == pygame.K_q and current_screen == "game":
+                # F3 切换帧耗时调试信息
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                # 在游戏界面或对战界面按Q返回菜单
+                elif event.key == pygame.K_q and current_screen in ("game", "versus"):
                     current_screen = "menu"
                 # 处理菜单界面的R键
                 elif event.key == pygame.K_r and current_screen == "menu":
@@ -51,19 +124,44 @@ def main():
                 elif action == "start_challenge":
                     game.set_mode("challenge")
                     current_screen = "game"
+                elif action == "start_versus":
+                    if versus is None:
+                        # 与单人游戏共用音频管理器，避免重复加载音效
+                        from core.versus import VersusMatch
+                        versus = VersusMatch(screen, 2, board_width, board_height, audio=game.audio)
+                        scheduler.add_target(versus.renderer)
+                    versus.start()
+                    current_screen = "versus"
                 elif action == "quit":
-                    pygame.quit()
-                    sys.exit()
+                    quit_game()
         elif current_screen == "game":
-            game_status = game.update()
+            with profiler.section("update"):
+                game_status = game.update()
+            if broadcast is not None:
+                broadcast.hub.publish()
             if game_status == "return_to_menu":
                 # 直接返回菜单
                 current_screen = "menu"
             # 游戏结束不再自动返回菜单，需要玩家按Q键
             # 删除了之前自动返回菜单的代码
+        elif current_screen == "versus":
+            with profiler.section("update"):
+                versus.update()
+        
+        if broadcast is not None:
+            with profiler.section("broadcast"):
+                broadcast.pump()
+        
+        debug_overlay.draw(screen)
+        if scaled_display is not None:
+            with profiler.section("scale"):
+                scaled_display.present()
+        with profiler.section("flip"):
+            pygame.display.flip()
+        profiler.end_frame()
         
-        pygame.display.flip()
-        clock.tick(60)
+        scheduler.end_frame(idle=not profiler.overlay_visible and (
+            current_screen == "menu" or (current_screen == "game" and game.is_static())))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,350 @@
+"""观战广播：把一局游戏的状态每帧编码一次，分发给任意数量的只读观众
+
+BroadcastHub 每帧把游戏状态编码为一个广播帧（方块和分数 + 游戏板增量，定期插入关键帧），
+写入固定容量的环形缓冲区。编码只做一次，与观众人数无关；每个观众只是一个读取位置：
+
+- 进程内的观众调用 Subscriber.poll() 按自己的节奏取帧；
+- BroadcastServer 在非阻塞TCP套接字上把帧转发给远程观众，发送缓冲区满时暂停取帧（背压）。
+
+观众落后太多、需要的帧已被环形缓冲区覆盖时，从最近的关键帧重新开始；新加入的观众也从
+最近的关键帧开始追赶。
+
+观看方式：python -m net.broadcast --host 127.0.0.1 --port 9998
+"""
+import argparse
+import socket
+import struct
+
+from core.board import Board
+from core import board_codec
+from net import protocol
+
+# 帧头：帧长度(含帧头), 类型, 帧序号, 游戏帧号；后跟玩家状态(PLAYER_STATUS)和游戏板同步数据(BOARD_CHUNK)
+FRAME_HEADER = struct.Struct("!HBII")
+FRAME_DELTA = 0
+FRAME_KEYFRAME = 1  # 游戏板数据是快照，观众可以从这一帧开始
+
+
+class Subscriber:
+    """进程内的观众：在环形缓冲区中的读取位置"""
+    __slots__ = ("hub", "cursor", "resyncs")
+
+    def __init__(self, hub, cursor):
+        self.hub = hub
+        self.cursor = cursor  # 下一个要读取的帧序号
+        self.resyncs = 0  # 因落后太多而跳到关键帧的次数
+
+    @property
+    def lag(self):
+        """尚未读取的帧数"""
+        return self.hub.head - self.cursor
+
+    def poll(self, limit=None):
+        """取出尚未读取的帧（最多limit个），返回帧字节串的列表"""
+        hub = self.hub
+        head = hub.head
+        if self.cursor < head - hub.capacity:
+            # 需要的帧已被覆盖，从最近的关键帧重新开始
+            self.cursor = hub.keyframe_seq
+            self.resyncs += 1
+        end = head if limit is None else min(head, self.cursor + limit)
+        if end <= self.cursor:
+            return []
+        frames = hub.frames
+        capacity = hub.capacity
+        start = self.cursor % capacity
+        stop = end % capacity
+        self.cursor = end
+        if start < stop:
+            return frames[start:stop]
+        return frames[start:] + frames[:stop]
+
+
+class BroadcastHub:
+    """把一局游戏的状态发布到环形缓冲区，供任意数量的观众读取"""
+
+    def __init__(self, game, capacity=256, keyframe_interval=120, max_delta_bytes=512):
+        if not 0 < keyframe_interval <= capacity:
+            raise ValueError("关键帧间隔必须在1到环形缓冲区容量之间")
+        self.game = game
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval  # 每隔多少帧插入一个关键帧
+        self.max_delta_bytes = max_delta_bytes  # 增量超过该大小时改发关键帧
+
+        self.frames = [b""] * capacity
+        self.head = 0  # 下一帧的序号
+        self.keyframe_seq = None  # 最近一个关键帧的序号
+        self.tick = 0
+        self._board = None
+        self._version = 0
+        self._last_body = None
+
+        # 发布新帧后的回调：listener(hub)
+        self.listeners = []
+
+        # 统计
+        self.keyframes = 0
+        self.bytes_published = 0
+
+    def subscribe(self):
+        """新建一个进程内观众，从最近的关键帧开始读取"""
+        return Subscriber(self, self.head if self.keyframe_seq is None else self.keyframe_seq)
+
+    def publish(self):
+        """发布当前帧的游戏状态；状态与上一帧完全相同时不发布，返回是否发布了新帧"""
+        self.tick += 1
+        game = self.game
+        board = game.board
+        keyframe = (board is not self._board or self.keyframe_seq is None
+                    or self.head - self.keyframe_seq >= self.keyframe_interval)
+        if keyframe:
+            chunk = protocol.encode_snapshot_chunk(board)
+        else:
+            chunk, keyframe = protocol.encode_board_chunk(board, self._version, self.max_delta_bytes)
+        body = protocol.encode_status(game, 0) + chunk
+        if not keyframe and body == self._last_body:
+            return False
+        self._board = board
+        self._version = board.version
+        # 游戏板没有变化时增量数据为空，下一帧若仍不变也可以去重
+        self._last_body = body if not keyframe else None
+
+        seq = self.head
+        frame = FRAME_HEADER.pack(FRAME_HEADER.size + len(body),
+                                  FRAME_KEYFRAME if keyframe else FRAME_DELTA, seq, self.tick) + body
+        self.frames[seq % self.capacity] = frame
+        self.head = seq + 1
+        self.bytes_published += len(frame)
+        if keyframe:
+            self.keyframe_seq = seq
+            self.keyframes += 1
+        for listener in self.listeners:
+            listener(self)
+        return True
+
+
+class RemoteViewer:
+    """BroadcastServer上的一个TCP观众连接"""
+    __slots__ = ("sock", "addr", "subscriber", "buffer")
+
+    def __init__(self, sock, addr, subscriber):
+        self.sock = sock
+        self.addr = addr
+        self.subscriber = subscriber
+        self.buffer = bytearray()  # 已取出但尚未发送完的数据
+
+
+class BroadcastServer:
+    """通过非阻塞TCP把广播帧转发给远程观众，由游戏主循环每帧调用pump()驱动，不需要额外线程"""
+
+    def __init__(self, hub, host="0.0.0.0", port=9998, max_buffer=1 << 16, batch=64):
+        self.hub = hub
+        self.max_buffer = max_buffer  # 单个观众待发送数据的上限，超过后暂停取帧
+        self.batch = batch  # 每次最多取出的帧数
+        self.viewers = []
+        self.sock = None
+        if port is not None:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((host, port))
+            self.sock.listen()
+            self.sock.setblocking(False)
+
+        # 统计
+        self.bytes_sent = 0
+        self.dropped = 0
+
+    @property
+    def address(self):
+        return self.sock.getsockname() if self.sock is not None else None
+
+    def add_viewer(self, sock, addr=None):
+        """加入一个已连接的观众套接字"""
+        sock.setblocking(False)
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        viewer = RemoteViewer(sock, addr, self.hub.subscribe())
+        self.viewers.append(viewer)
+        return viewer
+
+    def _accept(self):
+        while True:
+            try:
+                sock, addr = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            self.add_viewer(sock, addr)
+
+    def _drop(self, viewer):
+        self.viewers.remove(viewer)
+        self.dropped += 1
+        viewer.sock.close()
+
+    def pump(self):
+        """接受新连接，并尽量把各观众尚未读取的帧写入套接字"""
+        if self.sock is not None:
+            self._accept()
+        max_buffer = self.max_buffer
+        batch = self.batch
+        for viewer in list(self.viewers):
+            buffer = viewer.buffer
+            if len(buffer) < max_buffer:
+                frames = viewer.subscriber.poll(batch)
+                if frames:
+                    buffer += b"".join(frames)
+            if not buffer:
+                continue
+            try:
+                sent = viewer.sock.send(buffer)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                self._drop(viewer)
+                continue
+            del buffer[:sent]
+            self.bytes_sent += sent
+
+    def close(self):
+        for viewer in self.viewers:
+            viewer.sock.close()
+        self.viewers.clear()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class BroadcastView:
+    """观众端：按收到的广播帧重建游戏板、方块和分数"""
+
+    def __init__(self):
+        self.board = None  # 收到第一个关键帧后创建
+        self.current_block = None
+        self.next_block = None
+        self.score = 0
+        self.game_over = False
+        self.tick = 0
+        self.synced = False  # 为False时忽略增量帧，等待下一个关键帧
+        self._buffer = bytearray()
+
+        # 统计
+        self.frames = 0
+        self.skipped = 0
+
+    def feed(self, data):
+        """处理从数据流中收到的字节，应用其中所有完整的帧，返回应用的帧数"""
+        buffer = self._buffer
+        buffer += data
+        offset = 0
+        applied = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length = FRAME_HEADER.unpack_from(buffer, offset)[0]
+            if len(buffer) - offset < length:
+                break
+            applied += self.apply(bytes(buffer[offset:offset + length]))
+            offset += length
+        del buffer[:offset]
+        return applied
+
+    def apply(self, frame):
+        """应用一个广播帧，返回是否成功"""
+        _, kind, _, tick = FRAME_HEADER.unpack_from(frame)
+        if kind != FRAME_KEYFRAME and not self.synced:
+            self.skipped += 1
+            return False
+
+        offset = FRAME_HEADER.size
+        (flags, shape, block_type, color, x, y, rotation,
+         next_shape, next_type, next_color, score, _) = protocol.PLAYER_STATUS.unpack_from(frame, offset)
+        offset += protocol.PLAYER_STATUS.size
+
+        if kind == FRAME_KEYFRAME:
+            width, height, _ = board_codec.SNAPSHOT_HEADER.unpack_from(frame, offset + protocol.BOARD_CHUNK.size)
+            if self.board is None or (self.board.width, self.board.height) != (width, height):
+                self.board = Board(width, height)
+        _, self.synced = protocol.apply_board_chunk(self.board, frame, offset)
+        if not self.synced:
+            self.skipped += 1
+            return False
+
+        block = protocol.decode_piece(self.current_block, shape, block_type, color)
+        if block is not None:
+            block.x = x
+            block.y = y
+            block.rotation = rotation
+        self.current_block = block
+        self.next_block = protocol.decode_piece(self.next_block, next_shape, next_type, next_color)
+        self.score = score
+        self.game_over = bool(flags & protocol.FLAG_GAME_OVER)
+        self.tick = tick
+        self.frames += 1
+        return True
+
+
+def _watch(args):
+    """图形界面观众：连接广播服务器并渲染收到的游戏状态"""
+    import pygame
+    from blocks.base_block import Block
+    from physics.engine import PhysicsEngine
+    from ui.renderer import GameRenderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 680), pygame.RESIZABLE)
+    pygame.display.set_caption("tetris - 观战")
+    renderer = GameRenderer(screen)
+    physics = PhysicsEngine()
+    clock = pygame.time.Clock()
+
+    print(f"正在连接 {args.host}:{args.port} ...")
+    sock = socket.create_connection((args.host, args.port))
+    sock.setblocking(False)
+    view = BroadcastView()
+    player = {"name": "直播", "pending_garbage": 0}
+    ghost = Block(0, 0, [[1]], 0)
+
+    try:
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                    running = False
+            while True:
+                try:
+                    data = sock.recv(1 << 16)
+                except (BlockingIOError, InterruptedError):
+                    break
+                if not data:
+                    print("广播已结束")
+                    running = False
+                    break
+                view.feed(data)
+
+            if view.board is not None:
+                block = view.current_block
+                player["board"] = view.board
+                player["current_block"] = block
+                player["next_block"] = view.next_block
+                player["ghost_block"] = None
+                if block is not None:
+                    ghost.copy_from(block)
+                    ghost.move(0, physics.drop_distance(ghost, view.board))
+                    player["ghost_block"] = ghost
+                player["score"] = view.score
+                player["game_over"] = view.game_over
+                renderer.render_versus([player], controls="Q: 退出")
+                pygame.display.flip()
+            clock.tick(60)
+    finally:
+        sock.close()
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="俄罗斯方块观战客户端")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9998)
+    args = parser.parse_args(argv)
+    _watch(args)
+
+
+if __name__ == "__main__":
+    main()
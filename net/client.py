@@ -0,0 +1,223 @@
+"""联机对战客户端：发送本地输入，按服务器发来的状态和变更重建所有玩家的游戏板
+
+运行方式：python -m net.client --host 127.0.0.1 --port 9999
+"""
+import argparse
+import asyncio
+import struct
+from collections import deque
+
+from core.board import Board
+from net import protocol
+
+
+class TetrisClient(asyncio.DatagramProtocol):
+    """联机对战客户端（UDP）"""
+
+    def __init__(self, input_batch=2, redundancy=8, join_retry_ms=250, impairment=None):
+        self.input_batch = input_batch  # 每攒够几帧输入发送一次
+        self.redundancy = redundancy  # 每个INPUT消息携带的最近输入个数（包括之前已发送过的）
+        self.join_retry = join_retry_ms / 1000
+        self.impairment = impairment
+
+        self.transport = None
+        self.match_id = None
+        self.player_index = None
+        self.boards = []
+        self.current_blocks = []
+        self.next_blocks = []
+        self.scores = []
+        self.pending_garbage = []
+        self.game_over = []
+        self.winner = protocol.WINNER_NONE
+        self.applied_tick = 0  # 已应用的服务器帧号，用于丢弃乱序到达的旧状态
+        self.welcomed = asyncio.Event()
+
+        self._join_task = None
+        self._seq = 0
+        self._recent_inputs = deque(maxlen=redundancy)
+
+        # 统计
+        self.packets_in = 0
+        self.bytes_in = 0
+        self.snapshots = 0
+        self.stale = 0  # 乱序到达、已过时的状态消息
+        self.malformed = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # 保存任务引用，避免任务在运行中被垃圾回收
+        self._join_task = asyncio.get_running_loop().create_task(self._join())
+
+    async def _join(self):
+        """收到WELCOME前定期重发JOIN"""
+        while not self.welcomed.is_set() and not self.transport.is_closing():
+            self.send(protocol.encode_join())
+            try:
+                await asyncio.wait_for(self.welcomed.wait(), self.join_retry)
+            except asyncio.TimeoutError:
+                pass
+
+    def _sendto(self, data, addr=None):
+        if not self.transport.is_closing():
+            self.transport.sendto(data)
+
+    def send(self, data):
+        if self.impairment is not None:
+            self.impairment.send(self._sendto, data, None)
+        else:
+            self._sendto(data)
+
+    def send_input(self, mask):
+        """记录本帧输入；每input_batch帧发送一次，同时重复最近几帧的输入以抵抗丢包"""
+        if self.match_id is None:
+            return
+        self._recent_inputs.append(mask)
+        self._seq += 1
+        if self._seq % self.input_batch == 0:
+            first_seq = self._seq - len(self._recent_inputs)
+            versions = [board.version for board in self.boards]
+            self.send(protocol.encode_input(self.match_id, versions, first_seq, self._recent_inputs))
+
+    def leave(self):
+        if self.match_id is not None:
+            self.send(protocol.encode_leave(self.match_id))
+
+    def datagram_received(self, data, addr):
+        self.packets_in += 1
+        self.bytes_in += len(data)
+        try:
+            kind = data[0]
+            if kind == protocol.MSG_STATE:
+                self._handle_state(data)
+            elif kind == protocol.MSG_WELCOME:
+                self._handle_welcome(data)
+            else:
+                self.malformed += 1
+        except (IndexError, ValueError, struct.error):
+            self.malformed += 1
+
+    def _handle_welcome(self, data):
+        if self.welcomed.is_set():
+            return
+        _, match_id, player, players, width, height = protocol.WELCOME.unpack(data)
+        self.match_id = match_id
+        self.player_index = player
+        self.boards = [Board(width, height) for _ in range(players)]
+        self.current_blocks = [None] * players
+        self.next_blocks = [None] * players
+        self.scores = [0] * players
+        self.pending_garbage = [0] * players
+        self.game_over = [False] * players
+        self.welcomed.set()
+
+    def _handle_state(self, data):
+        _, match_id, tick, players, winner = protocol.STATE_HEADER.unpack_from(data)
+        if match_id != self.match_id or tick <= self.applied_tick:
+            self.stale += 1
+            return
+
+        offset = protocol.STATE_HEADER.size
+        for index in range(players):
+            (flags, shape, block_type, color, x, y, rotation,
+             next_shape, next_type, next_color, score, pending) = protocol.PLAYER_STATUS.unpack_from(data, offset)
+            offset += protocol.PLAYER_STATUS.size
+            block = protocol.decode_piece(self.current_blocks[index], shape, block_type, color)
+            if block is not None:
+                block.x = x
+                block.y = y
+                block.rotation = rotation
+            self.current_blocks[index] = block
+            self.next_blocks[index] = protocol.decode_piece(self.next_blocks[index], next_shape, next_type, next_color)
+            self.scores[index] = score
+            self.pending_garbage[index] = pending
+            self.game_over[index] = bool(flags & protocol.FLAG_GAME_OVER)
+
+        for board in self.boards:
+            kind = data[offset]
+            offset, applied = protocol.apply_board_chunk(board, data, offset)
+            self.snapshots += kind == protocol.CHUNK_SNAPSHOT
+            self.stale += not applied
+        self.winner = winner
+        self.applied_tick = tick
+
+
+async def connect(host, port, **options):
+    """连接服务器并等待加入对战，返回(transport, client)"""
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        lambda: TetrisClient(**options), remote_addr=(host, port))
+    await client.welcomed.wait()
+    return transport, client
+
+
+async def _play(args):
+    """图形界面客户端：使用单人模式的按键，渲染服务器同步过来的所有游戏板"""
+    import pygame
+    from blocks.base_block import Block
+    from core.game import DEFAULT_KEY_BINDINGS
+    from physics.engine import PhysicsEngine
+    from ui.renderer import GameRenderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 680), pygame.RESIZABLE)
+    pygame.display.set_caption("tetris - 联机对战")
+    renderer = GameRenderer(screen)
+    physics = PhysicsEngine()
+
+    print(f"正在连接 {args.host}:{args.port} ...")
+    transport, client = await connect(args.host, args.port)
+    players = len(client.boards)
+    views = [{"name": f"玩家{i + 1}" + (" (你)" if i == client.player_index else "")}
+             for i in range(players)]
+    ghosts = [Block(0, 0, [[1]], 0) for _ in range(players)]
+    controls = "方向键 移动/旋转, 空格 硬降    Q: 退出"
+
+    try:
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                    running = False
+            client.send_input(protocol.input_mask(pygame.key.get_pressed(), DEFAULT_KEY_BINDINGS))
+
+            for i, view in enumerate(views):
+                board = client.boards[i]
+                block = client.current_blocks[i]
+                ghost = None
+                if block is not None:
+                    # 幽灵方块在本地根据同步过来的游戏板计算
+                    ghost = ghosts[i].copy_from(block)
+                    ghost.move(0, physics.drop_distance(ghost, board))
+                view["board"] = board
+                view["current_block"] = block
+                view["next_block"] = client.next_blocks[i]
+                view["ghost_block"] = ghost
+                view["score"] = client.scores[i]
+                view["pending_garbage"] = client.pending_garbage[i]
+                view["game_over"] = client.game_over[i]
+
+            winner = None
+            if client.winner == protocol.WINNER_DRAW:
+                winner = "平局"
+            elif client.winner:
+                winner = views[client.winner - 1]["name"]
+            renderer.render_versus(views, winner=winner, controls=controls)
+            pygame.display.flip()
+            await asyncio.sleep(1 / 60)
+    finally:
+        client.leave()
+        transport.close()
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="俄罗斯方块联机对战客户端")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    args = parser.parse_args(argv)
+    asyncio.run(_play(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""本机回环测试：在一个进程内启动服务器和大量机器人客户端，模拟延迟、抖动和丢包
+
+运行结束后停止模拟，等待状态同步完成，再逐块比对每个客户端重建的游戏板与服务器是否一致。
+
+运行方式：python -m net.loopback --matches 200 --seconds 10 --latency 40 --jitter 20 --loss 0.05
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from net.client import TetrisClient
+from net.server import start_server
+
+
+class Impairment:
+    """模拟网络条件：固定延迟加随机抖动（会导致乱序），并按概率丢包"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, sendto, data, addr):
+        """代替直接调用sendto(data, addr)：按概率丢弃，或延迟一段时间后再发送"""
+        self.sent += 1
+        if self.random.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.random.random() * self.jitter
+        if delay <= 0:
+            sendto(data, addr)
+        else:
+            asyncio.get_running_loop().call_later(delay, sendto, data, addr)
+
+
+async def run_loopback(matches=50, seconds=5.0, latency_ms=30, jitter_ms=10, loss=0.02,
+                       players=2, seed=0, settle_seconds=2.0):
+    """运行一次回环测试，返回统计结果"""
+    rng = random.Random(seed)
+    impairment = Impairment(latency_ms, jitter_ms, loss, seed)
+    server, server_task = await start_server(
+        "127.0.0.1", 0, players_per_match=players, impairment=impairment)
+    host, port = server.sock.getsockname()[:2]
+
+    loop = asyncio.get_running_loop()
+    endpoints = []
+    clients = []
+    active = False
+
+    # 所有机器人由同一个任务驱动：加入对战后立即开始发送输入（同时作为心跳），
+    # 测试阶段随机按键，其余时间不按键
+    async def drive():
+        masks = []
+        while True:
+            masks.extend([0] * (len(clients) - len(masks)))
+            for i, client in enumerate(clients):
+                if active and rng.random() < 0.2:
+                    masks[i] = rng.choice((0, 1, 2, 4, 8, 16, 0))
+                client.send_input(masks[i] if active else 0)
+            await asyncio.sleep(server.tick_ms / 1000)
+
+    driver = asyncio.create_task(drive())
+    for _ in range(matches * players):
+        endpoint = await loop.create_datagram_endpoint(
+            lambda: TetrisClient(impairment=impairment), remote_addr=(host, port))
+        endpoints.append(endpoint)
+        clients.append(endpoint[1])
+    await asyncio.wait_for(asyncio.gather(*(client.welcomed.wait() for client in clients)), 30)
+
+    active = True
+    await asyncio.sleep(seconds)
+    active = False
+    stale = sum(client.stale for client in clients)
+    server.simulating = False  # 冻结模拟，只继续发送状态，等待客户端追上
+    await asyncio.sleep(settle_seconds)
+    driver.cancel()
+
+    mismatches = 0
+    for client in clients:
+        match, _ = server.clients[client.transport.get_extra_info("sockname")[:2]]
+        for index, game in enumerate(match.versus.games):
+            board = client.boards[index]
+            if (board.grid != game.board.grid or board.version != game.board.version
+                    or client.scores[index] != game.score):
+                mismatches += 1
+
+    result = {
+        "matches": len(server.matches),
+        "clients": len(clients),
+        "ticks": server.steps,
+        "step_ms_avg": server.step_time_total / max(server.steps, 1) * 1000,
+        "step_ms_max": server.step_time_max * 1000,
+        "server_bytes_out": server.bytes_out,
+        "server_packets_out": server.packets_out,
+        "snapshots": server.snapshots,
+        "dropped": impairment.dropped,
+        "sent": impairment.sent,
+        "stale": stale,
+        "mismatches": mismatches,
+        "seconds": seconds + settle_seconds
+    }
+
+    for transport, client in endpoints:
+        client.leave()
+        transport.close()
+    server_task.cancel()
+    server.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="联机对战本机回环测试")
+    parser.add_argument("--matches", type=int, default=50, help="同时进行的对战数")
+    parser.add_argument("--players", type=int, default=2, help="每局对战的人数")
+    parser.add_argument("--seconds", type=float, default=5.0, help="机器人游戏的时长(秒)")
+    parser.add_argument("--latency", type=float, default=30, help="单向延迟(毫秒)")
+    parser.add_argument("--jitter", type=float, default=10, help="随机抖动(毫秒)")
+    parser.add_argument("--loss", type=float, default=0.02, help="丢包率")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_loopback(args.matches, args.seconds, args.latency, args.jitter,
+                                      args.loss, args.players, args.seed))
+    per_client = result["server_bytes_out"] / result["clients"] / result["seconds"]
+    print(f"对战 {result['matches']}  客户端 {result['clients']}  服务器帧数 {result['ticks']}")
+    print(f"服务器每帧耗时: 平均 {result['step_ms_avg']:.3f} ms  最长 {result['step_ms_max']:.3f} ms")
+    print(f"下行: {result['server_packets_out']} 包  每客户端 {per_client / 1024:.2f} KiB/s  "
+          f"快照 {result['snapshots']}")
+    print(f"丢包 {result['dropped']}/{result['sent']}  过时状态 {result['stale']}")
+    if result["mismatches"]:
+        print(f"失败: {result['mismatches']} 块游戏板与服务器不一致")
+        return 1
+    print("所有客户端的游戏板与服务器一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
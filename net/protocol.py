@@ -0,0 +1,177 @@
+"""联机对战的二进制协议
+
+每条消息是一个UDP数据报，第一个字节是消息类型，整数一律使用网络字节序。
+
+JOIN     客户端 -> 服务器  请求加入对战（收到WELCOME前定期重发）
+WELCOME  服务器 -> 客户端  对战编号、玩家序号、人数和游戏板尺寸
+INPUT    客户端 -> 服务器  各游戏板已应用的版本号 + 最近若干帧的输入位掩码（冗余发送，丢包时不丢输入）
+STATE    服务器 -> 客户端  各玩家的方块和分数 + 每块游戏板自客户端确认的版本之后的增量（或快照）
+LEAVE    客户端 -> 服务器  离开对战
+
+游戏板的增量和快照编码见 core/board_codec.py。增量应用时会跳过客户端已经拥有的版本，
+因此服务器只需从客户端确认的版本开始重发，丢包后不需要逐包确认。
+"""
+import struct
+
+from blocks.base_block import Block, SPECIAL_CODES, get_shape_data
+from blocks.block_factory import BlockFactory
+from core import board_codec
+
+MSG_JOIN = 1
+MSG_WELCOME = 2
+MSG_INPUT = 3
+MSG_STATE = 4
+MSG_LEAVE = 5
+
+# 消息头
+WELCOME = struct.Struct("!BIBBBB")  # 类型, 对战编号, 玩家序号, 人数, 宽, 高
+INPUT_HEADER = struct.Struct("!BIIBB")  # 类型, 对战编号, 第一个输入序号, 输入个数, 游戏板数；后跟各游戏板版本号和输入
+STATE_HEADER = struct.Struct("!BIIBB")  # 类型, 对战编号, 帧号, 人数, 获胜者
+LEAVE = struct.Struct("!BI")  # 类型, 对战编号
+VERSION = struct.Struct("!I")
+
+# 每个玩家的状态：标志, 当前方块(形状, 类型, 颜色, x, y, 旋转), 下一个方块(形状, 类型, 颜色), 分数, 待收垃圾行
+PLAYER_STATUS = struct.Struct("!BBBBhhBBBBIB")
+FLAG_GAME_OVER = 1
+
+# 每块游戏板的同步数据：类型, 长度，后跟数据
+BOARD_CHUNK = struct.Struct("!BH")
+CHUNK_NONE = 0  # 客户端已是最新版本
+CHUNK_DELTA = 1
+CHUNK_SNAPSHOT = 2
+
+# 获胜者字段：0表示比赛未结束，255表示平局，其余为获胜玩家序号+1
+WINNER_NONE = 0
+WINNER_DRAW = 255
+
+# 输入位掩码：每个动作占一位
+INPUT_ACTIONS = ("left", "right", "soft_drop", "rotate", "hard_drop")
+
+# 服务器端游戏使用的按键绑定：把位序号当作"按键码"，输入状态就是按位展开的元组
+NET_KEY_BINDINGS = {action: bit for bit, action in enumerate(INPUT_ACTIONS)}
+NET_KEY_BINDINGS["pause"] = None
+NET_KEY_BINDINGS["return"] = None
+
+# 输入位掩码的有效位（客户端发来的其余位忽略）
+INPUT_MASK = (1 << len(INPUT_ACTIONS)) - 1
+
+# 所有位掩码对应的输入状态，预先生成避免每帧分配
+INPUT_STATES = tuple(
+    tuple(bool(mask >> bit & 1) for bit in range(len(INPUT_ACTIONS)))
+    for mask in range(1 << len(INPUT_ACTIONS))
+)
+
+# 方块形状和类型编号（0表示没有方块）
+_factory = BlockFactory()
+PIECE_SHAPES = (None,) + tuple(get_shape_data(shape) for shape in _factory.shapes.values()) \
+    + tuple(get_shape_data(shape) for shape in _factory.special_shapes.values())
+_SHAPE_INDEX = {shape: index for index, shape in enumerate(PIECE_SHAPES) if shape is not None}
+BLOCK_TYPES = ("normal",) + tuple(SPECIAL_CODES)
+_TYPE_INDEX = {block_type: index for index, block_type in enumerate(BLOCK_TYPES)}
+
+
+def input_mask(keys, bindings):
+    """根据本地按键状态和按键绑定计算输入位掩码"""
+    mask = 0
+    for bit, action in enumerate(INPUT_ACTIONS):
+        key = bindings.get(action)
+        if key is not None and keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def encode_join():
+    return bytes((MSG_JOIN,))
+
+
+def encode_welcome(match_id, player, players, width, height):
+    return WELCOME.pack(MSG_WELCOME, match_id, player, players, width, height)
+
+
+def encode_input(match_id, versions, first_seq, masks):
+    """INPUT消息：versions为客户端各游戏板的版本号（作为确认），masks为从first_seq开始的输入"""
+    return (INPUT_HEADER.pack(MSG_INPUT, match_id, first_seq, len(masks), len(versions))
+            + b"".join(VERSION.pack(version) for version in versions) + bytes(masks))
+
+
+def decode_input(data):
+    """解码INPUT消息，返回(对战编号, 各游戏板版本号, 第一个输入序号, 输入)"""
+    _, match_id, first_seq, count, boards = INPUT_HEADER.unpack_from(data)
+    offset = INPUT_HEADER.size
+    versions = [VERSION.unpack_from(data, offset + i * VERSION.size)[0] for i in range(boards)]
+    offset += boards * VERSION.size
+    return match_id, versions, first_seq, data[offset:offset + count]
+
+
+def encode_leave(match_id):
+    return LEAVE.pack(MSG_LEAVE, match_id)
+
+
+def encode_state(match_id, tick, winner, statuses, chunks):
+    """STATE消息：statuses为所有玩家状态拼接的字节串，chunks为每块游戏板的同步数据"""
+    players = len(statuses) // PLAYER_STATUS.size
+    return STATE_HEADER.pack(MSG_STATE, match_id, tick, players, winner) + statuses + b"".join(chunks)
+
+
+def encode_board_chunk(board, version, max_delta_bytes):
+    """为版本号为version的客户端编码一块游戏板的同步数据，返回(数据, 是否快照)
+
+    变更日志中已没有该版本，或增量比上限还大时改发快照。
+    """
+    if version == board.version:
+        return BOARD_CHUNK.pack(CHUNK_NONE, 0), False
+    delta = board_codec.encode_delta(board, version)
+    if delta is not None and len(delta) <= max_delta_bytes:
+        return BOARD_CHUNK.pack(CHUNK_DELTA, len(delta)) + delta, False
+    return encode_snapshot_chunk(board), True
+
+
+def encode_snapshot_chunk(board):
+    """把游戏板的快照编码为一块同步数据"""
+    snapshot = board_codec.encode_snapshot(board)
+    return BOARD_CHUNK.pack(CHUNK_SNAPSHOT, len(snapshot)) + snapshot
+
+
+def apply_board_chunk(board, data, offset):
+    """应用一块游戏板的同步数据，返回(新的偏移, 是否应用成功)"""
+    kind, length = BOARD_CHUNK.unpack_from(data, offset)
+    offset += BOARD_CHUNK.size
+    end = offset + length
+    if kind == CHUNK_DELTA:
+        try:
+            board_codec.apply_delta(board, data[offset:end])
+        except ValueError:
+            # 缺少增量起始版本之前的变更（乱序到达），等待下一次同步
+            return end, False
+    elif kind == CHUNK_SNAPSHOT:
+        board_codec.restore_snapshot(board, data[offset:end])
+    return end, True
+
+
+def _piece_fields(block):
+    if block is None:
+        return 0, 0, 0
+    return _SHAPE_INDEX.get(block.shape_data, 0), _TYPE_INDEX.get(block.type, 0), block.color
+
+
+def encode_status(game, pending_garbage):
+    """编码一个玩家的方块、分数和待收垃圾行"""
+    current = None if game.game_over else game.current_block
+    shape, block_type, color = _piece_fields(current)
+    next_shape, next_type, next_color = _piece_fields(game.next_block)
+    return PLAYER_STATUS.pack(
+        FLAG_GAME_OVER if game.game_over else 0,
+        shape, block_type, color,
+        current.x if current else 0, current.y if current else 0, current.rotation if current else 0,
+        next_shape, next_type, next_color,
+        game.score, min(pending_garbage, 255)
+    )
+
+
+def decode_piece(block, shape, block_type, color):
+    """把编号还原为方块（复用传入的实例），形状编号为0时返回None"""
+    if not shape:
+        return None
+    if block is None:
+        return Block(0, 0, PIECE_SHAPES[shape], color, BLOCK_TYPES[block_type])
+    return block.reset(0, 0, PIECE_SHAPES[shape], color, BLOCK_TYPES[block_type])
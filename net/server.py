@@ -0,0 +1,402 @@
+"""联机对战服务器：客户端只发送输入，服务器运行权威的游戏模拟
+
+所有对战在同一个事件循环中、由同一个定时任务按固定步长推进，不为每局对战创建任务；
+状态按 send_interval 帧批量发送一次。所有客户端共用一个非阻塞UDP套接字，每次可读时
+一次读完缓冲区中的数据报（asyncio的数据报传输每次只读一个，客户端多时会让内核丢包）。
+
+运行方式：python -m net.server --port 9999
+"""
+import argparse
+import asyncio
+import socket
+import struct
+import time
+
+from core.game import DEFAULT_BOARD_WIDTH, DEFAULT_BOARD_HEIGHT
+from core.versus import VersusMatch
+from net import protocol
+
+
+class RemotePlayer:
+    """服务器上的一个客户端连接"""
+    __slots__ = ("addr", "index", "acks", "next_seq", "pending", "mask", "last_seen", "connected")
+
+    # 缓存的未来输入超过该数量时丢弃最旧的，避免客户端时钟偏快导致延迟越积越大
+    INPUT_BACKLOG = 8
+
+    def __init__(self, addr, index, tick, boards):
+        self.addr = addr
+        self.index = index
+        self.acks = [0] * boards  # 客户端各游戏板已应用的版本号
+        self.next_seq = 0  # 下一个要使用的输入序号
+        self.pending = {}  # 已收到但尚未使用的输入：序号 -> 位掩码
+        self.mask = 0  # 当前使用的输入，没有新输入时保持不变
+        self.last_seen = tick
+        self.connected = True
+
+    def receive_inputs(self, first_seq, masks):
+        """记录一批输入（包含重复发送的旧输入）；只保留有效位，保证能直接查 INPUT_STATES"""
+        next_seq = self.next_seq
+        pending = self.pending
+        for offset, mask in enumerate(masks):
+            seq = first_seq + offset
+            if seq >= next_seq:
+                pending[seq] = mask & protocol.INPUT_MASK
+        if len(pending) > self.INPUT_BACKLOG:
+            for seq in sorted(pending)[:len(pending) - self.INPUT_BACKLOG]:
+                del pending[seq]
+
+    def take_input(self):
+        """取出本帧使用的输入"""
+        mask = self.pending.pop(self.next_seq, None)
+        if mask is None and self.pending and len(self.pending) >= self.INPUT_BACKLOG // 2:
+            # 中间的输入已经无法补齐（超出冗余范围的连续丢包），跳到最早的可用输入
+            self.next_seq = min(self.pending)
+            mask = self.pending.pop(self.next_seq)
+        if mask is not None:
+            self.mask = mask
+            self.next_seq += 1
+        return self.mask
+
+
+class NetMatch:
+    """服务器上的一局对战：包装无界面的VersusMatch，并记录游戏板变更日志"""
+
+    def __init__(self, match_id, players, board_width, board_height):
+        self.match_id = match_id
+        self.versus = VersusMatch(None, players, board_width, board_height,
+                                  key_bindings=[protocol.NET_KEY_BINDINGS])
+        for game in self.versus.games:
+            game.show_ghost = False  # 服务器不需要幽灵方块
+        self.players = [None] * players
+        self.started = False
+        self.tick = 0
+
+    def add_player(self, addr, tick):
+        """加入一名玩家，返回其序号；已满时返回None"""
+        for index, slot in enumerate(self.players):
+            if slot is None:
+                self.players[index] = RemotePlayer(addr, index, tick, len(self.players))
+                return index
+        return None
+
+    def remove_player(self, player):
+        """开始前离开或超时的玩家：空出位置，留给下一个加入的玩家"""
+        self.players[player.index] = None
+
+    @property
+    def full(self):
+        return all(slot is not None for slot in self.players)
+
+    def start(self):
+        self.versus.start()
+        self.started = True
+
+    def disconnect(self, player):
+        """玩家离开或超时：判负，对手继续直到分出胜负"""
+        player.connected = False
+        self.versus.games[player.index].game_over = True
+
+    def step(self):
+        """推进一帧"""
+        if self.versus.winner is None:
+            inputs = [protocol.INPUT_STATES[slot.take_input()] for slot in self.players]
+            self.versus.step(inputs)
+        self.tick += 1
+
+    def winner_code(self):
+        if self.versus.winner is None:
+            return protocol.WINNER_NONE
+        for index, game in enumerate(self.versus.games):
+            if not game.game_over:
+                return index + 1
+        return protocol.WINNER_DRAW
+
+    def build_statuses(self):
+        return b"".join(protocol.encode_status(game, pending) for game, pending
+                        in zip(self.versus.games, self.versus.pending_garbage))
+
+    def build_packet(self, player, statuses, winner, chunk_cache, max_delta_bytes):
+        """为一名玩家构建STATE消息，返回(数据, 其中的快照数)
+
+        同一局中确认版本相同的客户端收到的游戏板数据相同，chunk_cache在一次发送中共享编码结果。
+        """
+        chunks = []
+        snapshots = 0
+        for index, version in enumerate(player.acks):
+            key = (index, version)
+            entry = chunk_cache.get(key)
+            if entry is None:
+                entry = protocol.encode_board_chunk(self.versus.games[index].board, version, max_delta_bytes)
+                chunk_cache[key] = entry
+            chunks.append(entry[0])
+            snapshots += entry[1]
+        return protocol.encode_state(self.match_id, self.tick, winner, statuses, chunks), snapshots
+
+
+class TetrisServer:
+    """联机对战服务器（UDP）"""
+
+    MAX_DATAGRAM = 2048
+    READ_BATCH = 256  # 每次可读时最多处理的数据报数，避免长时间占用事件循环
+
+    def __init__(self, players_per_match=2, board_width=DEFAULT_BOARD_WIDTH,
+                 board_height=DEFAULT_BOARD_HEIGHT, tick_ms=16, send_interval=3,
+                 timeout_ms=10000, max_delta_bytes=512, impairment=None):
+        self.players_per_match = players_per_match
+        self.board_width = board_width
+        self.board_height = board_height
+        self.tick_ms = tick_ms
+        self.send_interval = send_interval  # 每隔几帧发送一次状态
+        self.timeout_ticks = timeout_ms // tick_ms
+        self.max_delta_bytes = max_delta_bytes  # 增量超过该大小时改发快照
+        self.impairment = impairment  # 模拟延迟和丢包（只在本地测试中使用）
+
+        self.sock = None
+        self.matches = {}
+        self.clients = {}  # 地址 -> (对战, 玩家)
+        self.waiting = None  # 等待玩家加入的对战
+        self.next_match_id = 1
+        self.tick = 0
+        self.simulating = True  # 为False时只发送状态不推进模拟（测试中用于比对最终状态）
+
+        # 统计
+        self.packets_in = 0
+        self.packets_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.snapshots = 0
+        self.malformed = 0
+        self.send_failures = 0
+        self.match_errors = 0  # 因为异常而关闭的对战数
+        self.step_time_total = 0.0
+        self.step_time_max = 0.0
+        self.steps = 0
+
+    def attach(self, sock):
+        """开始在非阻塞套接字上收发数据"""
+        sock.setblocking(False)
+        self.sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._read_ready)
+
+    def close(self):
+        if self.sock is not None:
+            asyncio.get_running_loop().remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+
+    def _read_ready(self):
+        recvfrom = self.sock.recvfrom
+        for _ in range(self.READ_BATCH):
+            try:
+                data, addr = recvfrom(self.MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 例如ICMP端口不可达导致的错误，忽略后继续读取
+                continue
+            self.datagram_received(data, addr)
+
+    def _sendto(self, data, addr):
+        if self.sock is None:
+            return
+        try:
+            self.sock.sendto(data, addr)
+        except OSError:
+            # 发送缓冲区已满等情况直接丢弃：状态会在下一次发送时重发
+            self.send_failures += 1
+
+    def send(self, data, addr):
+        self.packets_out += 1
+        self.bytes_out += len(data)
+        if self.impairment is not None:
+            self.impairment.send(self._sendto, data, addr)
+        else:
+            self._sendto(data, addr)
+
+    def datagram_received(self, data, addr):
+        self.packets_in += 1
+        self.bytes_in += len(data)
+        try:
+            kind = data[0]
+            if kind == protocol.MSG_INPUT:
+                self._handle_input(data, addr)
+            elif kind == protocol.MSG_JOIN:
+                self._handle_join(addr)
+            elif kind == protocol.MSG_LEAVE:
+                self._handle_leave(addr)
+            else:
+                self.malformed += 1
+        except (IndexError, struct.error):
+            self.malformed += 1
+
+    def _handle_join(self, addr):
+        entry = self.clients.get(addr)
+        if entry is None:
+            match = self.waiting
+            if match is None:
+                match = NetMatch(self.next_match_id, self.players_per_match,
+                                 self.board_width, self.board_height)
+                self.matches[match.match_id] = match
+                self.next_match_id += 1
+                self.waiting = match
+            index = match.add_player(addr, self.tick)
+            entry = (match, match.players[index])
+            self.clients[addr] = entry
+            if match.full:
+                match.start()
+                self.waiting = None
+        # 重复的JOIN（WELCOME丢失）同样回复
+        match, player = entry
+        player.last_seen = self.tick
+        self.send(protocol.encode_welcome(match.match_id, player.index, self.players_per_match,
+                                          self.board_width, self.board_height), addr)
+
+    def _handle_input(self, data, addr):
+        entry = self.clients.get(addr)
+        if entry is None:
+            return
+        match_id, versions, first_seq, masks = protocol.decode_input(data)
+        match, player = entry
+        if match_id != match.match_id or len(versions) != len(player.acks):
+            return
+        player.last_seen = self.tick
+        games = match.versus.games
+        for index, version in enumerate(versions):
+            # 只接受比已知确认更新、且不超过服务器当前版本的确认（乱序到达的旧确认忽略）
+            if player.acks[index] < version <= games[index].board.version:
+                player.acks[index] = version
+        player.receive_inputs(first_seq, masks)
+
+    def _handle_leave(self, addr):
+        entry = self.clients.pop(addr, None)
+        if entry is not None:
+            match, player = entry
+            if match.started:
+                match.disconnect(player)
+            else:
+                match.remove_player(player)
+            self._drop_if_empty(match)
+
+    def _drop_if_empty(self, match):
+        if not any(slot is not None and slot.connected for slot in match.players):
+            self.matches.pop(match.match_id, None)
+            if self.waiting is match:
+                self.waiting = None
+
+    def _expire_waiting(self, match):
+        """移除等待中的对战里超时未发消息的玩家，避免之后加入的玩家与已经离开的客户端配对"""
+        for player in match.players:
+            if player is not None and self.tick - player.last_seen > self.timeout_ticks:
+                self.clients.pop(player.addr, None)
+                match.remove_player(player)
+        self._drop_if_empty(match)
+
+    def _close_match(self, match):
+        """关闭一局对战并移除其中的客户端"""
+        self.matches.pop(match.match_id, None)
+        if self.waiting is match:
+            self.waiting = None
+        for player in match.players:
+            if player is not None and self.clients.get(player.addr, (None,))[0] is match:
+                del self.clients[player.addr]
+
+    def step(self):
+        """推进所有对战一帧，并按发送间隔批量发送状态"""
+        start = time.perf_counter()
+        self.tick += 1
+        send = self.tick % self.send_interval == 0
+        if self.waiting is not None:
+            self._expire_waiting(self.waiting)
+        for match in list(self.matches.values()):
+            if not match.started:
+                continue
+            try:
+                if self.simulating:
+                    match.step()
+                if send:
+                    self._send_state(match)
+            except Exception as error:
+                # 一局对战出错只关闭这一局，不影响其他对战
+                self.match_errors += 1
+                print(f"对战 {match.match_id} 出错，已关闭: {error!r}")
+                self._close_match(match)
+        elapsed = time.perf_counter() - start
+        self.steps += 1
+        self.step_time_total += elapsed
+        self.step_time_max = max(self.step_time_max, elapsed)
+
+    def _send_state(self, match):
+        statuses = match.build_statuses()
+        winner = match.winner_code()
+        chunk_cache = {}
+        for player in match.players:
+            if not player.connected:
+                continue
+            if self.tick - player.last_seen > self.timeout_ticks:
+                self.clients.pop(player.addr, None)
+                match.disconnect(player)
+                continue
+            data, snapshots = match.build_packet(player, statuses, winner, chunk_cache, self.max_delta_bytes)
+            self.snapshots += snapshots
+            self.send(data, player.addr)
+        self._drop_if_empty(match)
+
+    async def run(self):
+        """按固定步长运行，落后时追赶但单次最多追赶5帧"""
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000
+        next_time = loop.time()
+        while True:
+            now = loop.time()
+            steps = 0
+            while next_time <= now and steps < 5:
+                self.step()
+                next_time += interval
+                steps += 1
+            if next_time <= now:
+                next_time = now + interval
+            await asyncio.sleep(next_time - loop.time())
+
+
+async def start_server(host="0.0.0.0", port=9999, receive_buffer=4 << 20, **options):
+    """启动服务器，返回(server, 运行任务)，实际监听的地址为 server.sock.getsockname()
+
+    加大接收缓冲区，避免事件循环繁忙时内核丢弃输入包。
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.bind((host, port))
+    server = TetrisServer(**options)
+    server.attach(sock)
+    return server, asyncio.create_task(server.run())
+
+
+async def _serve(args):
+    server, task = await start_server(args.host, args.port, players_per_match=args.players)
+    print(f"服务器已启动: {args.host}:{args.port}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            average = server.step_time_total / max(server.steps, 1) * 1000
+            print(f"对战 {len(server.matches)}  客户端 {len(server.clients)}  "
+                  f"每帧平均 {average:.2f} ms  最长 {server.step_time_max * 1000:.2f} ms")
+    finally:
+        task.cancel()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="俄罗斯方块联机对战服务器")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--players", type=int, default=2, help="每局对战的人数")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -20,15 +20,44 @@ class PhysicsEngine:
     
     def is_valid_position(self, block, board):
         """检查方块当前位置是否有效"""
+        grid = board.grid
+        width = board.width
+        height = board.height
         for x, y in block.get_occupied_cells():
             # 检查是否超出边界
-            if not (0 <= x < board.width) or not (0 <= y < board.height):
+            if not (0 <= x < width) or not (0 <= y < height):
                 return False
             # 检查是否与已有方块重叠
-            if y >= 0 and not board.is_cell_empty(x, y):
+            if grid[y][x] != 0:
                 return False
         return True
     
+    def drop_distance(self, block, board):
+        """计算方块从当前位置能直接下落的格数（当前位置无效时返回0）
+        
+        只从下方不是方块自身的单元格向下扫描，开销与下落距离成正比，
+        而不是像逐格调用can_move那样每一步都重新检查整个方块。
+        """
+        if not self.is_valid_position(block, board):
+            return 0
+        
+        cells = block.get_occupied_cells()
+        occupied = set(cells)
+        
+        grid = board.grid
+        distance = board.height
+        for x, y in cells:
+            if (x, y + 1) in occupied:
+                continue
+            limit = min(board.height, y + 1 + distance)
+            below = y + 1
+            while below < limit and grid[below][x] == 0:
+                below += 1
+            distance = below - 1 - y
+            if distance == 0:
+                break
+        return distance
+    
     def apply_gravity(self, block, delta_time):
         """应用重力效果，加速下落"""
         # 计算重力引起的下落距离
@@ -36,7 +65,7 @@ class PhysicsEngine:
         
         # 将连续的重力转换为离散的网格移动
         # 当积累的重力效果足够移动一个格子时才移动
-        block.gravity_accumulator = getattr(block, 'gravity_accumulator', 0) + gravity_movement
+        block.gravity_accumulator += gravity_movement
         
         # 如果累积的重力效果超过1，则下移方块
         grid_movement = int(block.gravity_accumulator)
@@ -1,5 +1,53 @@
 import pygame
 import os
+from core import events
+from utils.asset_bundle import open_bundle
+from utils.assets import assets
+from utils.settings import settings_store
+
+# 音效清单：名称 -> 文件名（位于资源目录的sounds下）
+SOUND_FILES = {
+    "block_placed": "block_placed.ogg",
+    "line_clear": "line_clear.mp3",
+    "game_over": "game_over.mp3",
+    "level_up": "level_up.wav",
+    "menu_select": "menu_select.ogg",
+    "special_block": "special_block.wav",
+    "combo_special": "combo_special.wav",  # 添加连消特殊音效
+    "perfect": "perfect.mp3"  # 完美消行音效
+}
+
+# 游戏事件对应的音效（消行另外根据连消数选择）
+EVENT_SOUNDS = {
+    events.PIECE_LOCKED: "block_placed",
+    events.SPECIAL_TRIGGERED: "special_block",
+    events.HARD_DROP: "special_block",
+    events.LEVEL_UP: "level_up",
+    events.GAME_OVER: "game_over",
+}
+
+
+def _silent_sound():
+    return pygame.mixer.Sound(buffer=bytes([0] * 44))
+
+
+def _load_bundled_sound(bundle, name):
+    """从资源包创建音效（在资源加载线程中运行），构建资源包时就缺失的音效静默地使用占位"""
+    sound = bundle.sound(name)
+    return sound if sound is not None else _silent_sound()
+
+
+def _load_sound(path):
+    """解码一个音效文件（在资源加载线程中运行），文件不存在或无法解码时返回静音占位"""
+    if os.path.exists(path):
+        try:
+            return pygame.mixer.Sound(path)
+        except (pygame.error, OSError):
+            print(f"无法加载音效: {path}")
+    else:
+        print(f"音效文件不存在: {path}")
+    return _silent_sound()
+
 
 class AudioManager:
     def __init__(self):
@@ -7,91 +55,126 @@ class AudioManager:
         if not pygame.mixer.get_init():
             pygame.mixer.init()
         
-        # 音效和音乐目录
-        self.sound_dir = os.path.join("d:\\Github Doc\\tetris-common", "assets", "sounds")
-        self.music_dir = os.path.join("d:\\Github Doc\\tetris-common", "assets", "music")
+        settings = settings_store.current
         
-        # 创建目录（如果不存在）
-        os.makedirs(self.sound_dir, exist_ok=True)
-        os.makedirs(self.music_dir, exist_ok=True)
+        # 音量设置
+        self.sound_volume = settings.sound_volume
+        self.music_volume = settings.music_volume
+        
+        # 音效和音乐目录；有资源包时音效从资源包中取用（见utils/asset_bundle.py）
+        self.sound_dir = os.path.join(settings.assets_dir, "sounds")
+        self.music_dir = os.path.join(settings.assets_dir, "music")
+        self.bundle = open_bundle(settings.assets_dir)
         
-        # 加载声音效果（如果文件存在）
-        self.sounds = {}
+        # 音效在后台解码，第一次播放时才取用（还没解码好时当场加载）
+        self.sounds = {}  # 已取用的音效
         self._load_default_sounds()
         
-        # 音乐曲目
+        # 音乐曲目：由pygame.mixer.music边播放边从磁盘读取，不整体解码到内存
         self.music_tracks = {
             "classic_theme": os.path.join(self.music_dir, "classic_theme.wav"),
             "timed_theme": os.path.join(self.music_dir, "timed_theme.mp3"),
-            "challenge_theme": os.path.join(self.music_dir, "challenge_theme.mp3")
+            "challenge_theme": os.path.join(self.music_dir, "challenge_theme.mp3"),
+            "versus_theme": os.path.join(self.music_dir, "classic_theme.wav")  # 对战模式沿用经典模式音乐
         }
-        
-        # 音量设置
-        self.sound_volume = 0.7
-        self.music_volume = 0.5
+        self.current_track = None  # 正在播放的曲目文件
         
         # 应用音量设置
         pygame.mixer.music.set_volume(self.music_volume)
     
     def _load_default_sounds(self):
-        """加载默认音效或创建占位音效文件"""
-        sound_files = {
-            "block_placed": "block_placed.ogg",
-            "line_clear": "line_clear.mp3",
-            "game_over": "game_over.mp3",
-            "level_up": "level_up.wav",
-            "menu_select": "menu_select.ogg",
-            "special_block": "special_block.wav",
-            "combo_special": "combo_special.wav",  # 添加连消特殊音效
-            "perfect": "perfect.mp3"  # 完美消行音效
-        }
-        
-        for key, filename in sound_files.items():
+        """把清单中的音效交给后台资源加载器"""
+        self.sound_assets = {}
+        for key, filename in SOUND_FILES.items():
             full_path = os.path.join(self.sound_dir, filename)
-            
-            # 检查文件是否存在
-            if os.path.exists(full_path):
-                try:
-                    self.sounds[key] = pygame.mixer.Sound(full_path)
-                    self.sounds[key].set_volume(self.sound_volume)
-                except:
-                    print(f"无法加载音效: {filename}")
+            self.sound_assets[key] = "sound:" + full_path
+            if self.bundle is not None:
+                assets.submit(self.sound_assets[key], _load_bundled_sound, self.bundle, f"sounds/{filename}")
             else:
-                # 如果文件不存在，创建一个提示
-                print(f"音效文件不存在: {full_path}")
-                # 创建一个静音的音效作为占位符
-                empty_sound = pygame.mixer.Sound(buffer=bytes([0] * 44))
-                self.sounds[key] = empty_sound
+                assets.submit(self.sound_assets[key], _load_sound, full_path)
+    
+    def _sound(self, sound_name):
+        """取得音效，第一次使用时从资源加载器取出并设置音量"""
+        sound = self.sounds.get(sound_name)
+        if sound is None and sound_name in self.sound_assets:
+            sound = self.sounds[sound_name] = assets.get(self.sound_assets[sound_name])
+            sound.set_volume(self.sound_volume)
+        return sound
     
     def play_sound(self, sound_name):
         """播放指定的音效"""
-        if sound_name in self.sounds:
-            self.sounds[sound_name].play()
+        sound = self._sound(sound_name)
+        if sound is not None:
+            sound.play()
+    
+    def handle_event(self, kind, tick, a, b, c):
+        """游戏事件的订阅者：播放事件对应的音效"""
+        if kind == events.LINES_CLEARED:
+            self.play_sound("combo_special" if b >= 3 else "line_clear")
+        else:
+            sound_name = EVENT_SOUNDS.get(kind)
+            if sound_name is not None:
+                self.play_sound(sound_name)
     
     def play_music(self, track_name):
-        """播放指定的背景音乐"""
-        if track_name in self.music_tracks and os.path.exists(self.music_tracks[track_name]):
+        """播放指定的背景音乐（流式读取；同一首曲目正在播放时不重新加载）"""
+        path = self.music_tracks.get(track_name)
+        if path is not None and os.path.exists(path):
+            if path == self.current_track and pygame.mixer.music.get_busy():
+                return
             try:
-                pygame.mixer.music.load(self.music_tracks[track_name])
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.set_volume(self.music_volume)  # 载入新曲目后重新应用设置中的音量
                 pygame.mixer.music.play(-1)  # 循环播放
-            except:
+                self.current_track = path
+            except pygame.error:
+                self.current_track = None
                 print(f"无法播放音乐: {track_name}")
         else:
             # 尝试停止正在播放的音乐
-            pygame.mixer.music.stop()
+            self.stop_music()
             print(f"音乐文件不存在: {track_name}")
     
     def set_sound_volume(self, volume):
-        """设置音效音量"""
+        """设置音效音量（保存到设置文件）"""
         self.sound_volume = max(0.0, min(1.0, volume))
         for sound in self.sounds.values():
             sound.set_volume(self.sound_volume)
+        settings_store.update(sound_volume=self.sound_volume)
     
     def set_music_volume(self, volume):
-        """设置音乐音量"""
+        """设置音乐音量（保存到设置文件）"""
         self.music_volume = max(0.0, min(1.0, volume))
         pygame.mixer.music.set_volume(self.music_volume)
+        settings_store.update(music_volume=self.music_volume)
     
     def stop_music(self):
         """停止背景音乐"""
         pygame.mixer.music.stop()
+        self.current_track = None
+
+
+class SilentAudio:
+    """无声音频管理器：接口与AudioManager相同，用于无界面模式（服务器、模拟、视频导出）"""
+    
+    def __init__(self):
+        self.sound_volume = 0.0
+        self.music_volume = 0.0
+    
+    def play_sound(self, sound_name):
+        pass
+    
+    def handle_event(self, kind, tick, a, b, c):
+        pass
+    
+    def play_music(self, track_name):
+        pass
+    
+    def set_sound_volume(self, volume):
+        pass
+    
+    def set_music_volume(self, volume):
+        pass
+    
+    def stop_music(self):
+        pass
@@ -0,0 +1,90 @@
+import pygame
+from ui.tile_atlas import STYLE_BOARD
+
+
+class BoardLayer:
+    """已固定方块的离屏缓存层：只重绘游戏板通知发生变化的单元格或行"""
+
+    def __init__(self, background_color):
+        self.background_color = background_color
+        self.board = None
+        self.surface = None
+        self._tiles_version = None
+        self._full_redraw = True
+        self._dirty_rows = set()
+        self._dirty_cells = set()
+
+    def bind(self, board):
+        """绑定到指定游戏板并注册变更监听"""
+        if board is self.board:
+            return
+        if self.board is not None:
+            self.board.remove_listener(self._on_board_change)
+        self.board = board
+        board.add_listener(self._on_board_change)
+        self._full_redraw = True
+
+    def invalidate(self):
+        """标记整个缓存层需要重绘"""
+        self._full_redraw = True
+
+    def _on_board_change(self, kind, data):
+        """游戏板变更回调"""
+        if kind == "cells":
+            self._dirty_cells.update(data)
+        elif kind == "rows":
+            self._dirty_rows.update(data)
+        else:
+            self._full_redraw = True
+
+    def render(self, board, tiles):
+        """刷新缓存层中发生变化的部分并返回缓存Surface"""
+        self.bind(board)
+        size = tiles.block_size
+        width = board.width * size
+        height = board.height * size
+
+        # 图集重建或游戏板尺寸变化时重新创建缓存层
+        if (self.surface is None or self._tiles_version != tiles.version
+                or self.surface.get_size() != (width, height)):
+            self.surface = pygame.Surface((width, height))
+            if pygame.display.get_surface() is not None:
+                self.surface = self.surface.convert()
+            self._tiles_version = tiles.version
+            self._full_redraw = True
+
+        if self._full_redraw:
+            self._dirty_rows = range(board.height)
+            self._dirty_cells.clear()
+        elif not self._dirty_rows and not self._dirty_cells:
+            return self.surface
+
+        surface = self.surface
+        atlas = tiles.surface
+        areas = tiles.areas[STYLE_BOARD]
+        grid = board.grid
+        background = self.background_color
+        blits = []
+
+        for y in self._dirty_rows:
+            top = y * size
+            surface.fill(background, (0, top, width, size))
+            for x, cell_value in enumerate(grid[y]):
+                if cell_value != 0:
+                    blits.append((atlas, (x * size, top), areas[cell_value]))
+
+        for x, y in self._dirty_cells:
+            if y in self._dirty_rows or not (0 <= x < board.width and 0 <= y < board.height):
+                continue
+            position = (x * size, y * size)
+            surface.fill(background, (position[0], position[1], size, size))
+            cell_value = grid[y][x]
+            if cell_value != 0:
+                blits.append((atlas, position, areas[cell_value]))
+
+        surface.blits(blits, doreturn=False)
+
+        self._full_redraw = False
+        self._dirty_rows = set()
+        self._dirty_cells.clear()
+        return surface
@@ -0,0 +1,51 @@
+import pygame
+from ui.layout import layout_for
+from utils.font_manager import FontManager
+
+
+class DebugOverlay:
+    """屏幕左上角的帧耗时调试信息（按F3切换）"""
+
+    def __init__(self, profiler, refresh_interval=500, scheduler=None):
+        self.profiler = profiler
+        self.scheduler = scheduler  # 帧调度（可选），显示其帧耗时统计和当前画质
+        self.refresh_interval = refresh_interval  # 统计信息刷新间隔(毫秒)
+        self.font_manager = FontManager()
+        self.surface = None
+        self.font_size = 16
+        self.last_refresh = 0
+
+    def draw(self, screen):
+        """绘制调试信息，统计内容按刷新间隔重新生成"""
+        if not self.profiler.overlay_visible:
+            return
+        current_time = pygame.time.get_ticks()
+        font_size = layout_for(screen.get_size()).font_size(16)
+        if (self.surface is None or font_size != self.font_size
+                or current_time - self.last_refresh > self.refresh_interval):
+            self.font_size = font_size
+            self.surface = self._compose()
+            self.last_refresh = current_time
+        screen.blit(self.surface, (5, 5))
+
+    def _compose(self):
+        """合成调试信息面板"""
+        stats = self.profiler.stats()
+        lines = [f"{'阶段':<14}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, values in stats.items():
+            lines.append(f"{name:<14}{values['p50']:>7.2f}{values['p95']:>7.2f}{values['p99']:>7.2f}")
+        if self.scheduler is not None:
+            frame = self.scheduler.stats()
+            lines.append(f"{'帧调度':<14}{frame['p50']:>7.2f}{frame['p95']:>7.2f}{frame['p99']:>7.2f}")
+            lines.append(f"预算 {frame['budget']:.1f}ms  超时 {frame['overruns']}帧  画质 {frame['quality']}")
+
+        # 调试文本变化频繁，直接用字体渲染而不进入文本缓存
+        font = self.font_manager.get_font(self.font_size)
+        line_height = font.get_linesize()
+        rendered = [font.render(line, True, (0, 255, 0)) for line in lines]
+        width = max(text.get_width() for text in rendered) + 10
+        surface = pygame.Surface((width, line_height * len(rendered) + 10), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        for i, text in enumerate(rendered):
+            surface.blit(text, (5, 5 + i * line_height))
+        return surface
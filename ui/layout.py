@@ -0,0 +1,88 @@
+"""分辨率无关的布局：界面按 800x680 的逻辑分辨率设计，按窗口大小换算为实际像素
+
+两种缩放方式（设置项 render_scaling）：
+    native  各界面按Layout换算坐标、方块大小和字号，在窗口分辨率下直接绘制；图集和文本
+            按目标大小重新栅格化（按尺寸缓存），窗口大小不变时没有额外开销
+    smooth  界面画在逻辑分辨率的缓冲区上，每帧用一次 pygame.transform.smoothscale 放大到窗口
+            （不需要GPU，画面略模糊，窗口很大时每帧多几毫秒）
+"""
+import pygame
+
+LOGICAL_SIZE = (800, 680)
+SCALING_MODES = ("native", "smooth")
+
+
+class Layout:
+    """一种窗口大小下的布局：等比缩放逻辑坐标，内容在窗口中居中（多余的部分留空）"""
+
+    def __init__(self, size, logical_size=LOGICAL_SIZE):
+        self.size = tuple(size)
+        self.logical_size = logical_size
+        width, height = self.size
+        logical_width, logical_height = logical_size
+        self.scale = min(width / logical_width, height / logical_height)
+        # 缩放后的内容区域（窗口坐标）
+        self.width = round(logical_width * self.scale)
+        self.height = round(logical_height * self.scale)
+        self.left = (width - self.width) // 2
+        self.top = (height - self.height) // 2
+        self.right = self.left + self.width
+        self.bottom = self.top + self.height
+
+    def px(self, value):
+        """逻辑长度 -> 窗口像素"""
+        return round(value * self.scale)
+
+    def line(self, value):
+        """线宽：至少1像素"""
+        return max(1, self.px(value))
+
+    def x(self, value):
+        """逻辑横坐标 -> 窗口横坐标"""
+        return self.left + self.px(value)
+
+    def y(self, value):
+        """逻辑纵坐标 -> 窗口纵坐标"""
+        return self.top + self.px(value)
+
+    def font_size(self, size):
+        """逻辑字号 -> 实际字号（文本按实际字号栅格化，不做位图缩放）"""
+        return max(8, self.px(size))
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.left, self.top, self.width, self.height)
+
+
+_layouts = {}
+
+
+def layout_for(size):
+    """返回窗口大小对应的布局（按大小缓存）"""
+    layout = _layouts.get(size)
+    if layout is None:
+        layout = _layouts[size] = Layout(size)
+    return layout
+
+
+class ScaledDisplay:
+    """平滑缩放回退：各界面画在逻辑分辨率的surface上，present()一次smoothscale到窗口"""
+
+    def __init__(self, window, logical_size=LOGICAL_SIZE):
+        self.window = window
+        self.surface = pygame.Surface(logical_size).convert()
+        self._target_size = None
+        self._target = None  # 窗口中内容区域的子Surface，窗口大小变化时重建
+
+    def present(self):
+        """把逻辑缓冲区缩放到窗口（在 pygame.display.flip() 之前调用）"""
+        size = self.window.get_size()
+        if size == self.surface.get_size():
+            self.window.blit(self.surface, (0, 0))
+            return
+        if size != self._target_size:
+            self._target_size = size
+            # 留空的边缘只需在窗口大小变化时填充一次
+            self.window.fill((0, 0, 0))
+            self._target = self.window.subsurface(layout_for(size).rect)
+        pygame.transform.smoothscale(self.surface, self._target.get_size(), self._target)
@@ -1,11 +1,15 @@
 import pygame
+from utils.assets import assets
+from ui.layout import layout_for
 from utils.font_manager import FontManager
+from utils.settings import settings_store
 
 class MainMenu:
     def __init__(self, screen):
         self.screen = screen
         self.width = screen.get_width()
         self.height = screen.get_height()
+        self.layout = layout_for(screen.get_size())  # 按800x680设计，随窗口大小换算
         
         # 使用字体管理器
         self.font_manager = FontManager()
@@ -14,20 +18,26 @@ class MainMenu:
         self.mode_descriptions = {
             "start_classic": "经典模式：传统俄罗斯方块玩法，随着等级提升，方块下落速度加快。",
             "start_timed": "限时模式：在规定时间内消除尽可能多的行，有更多特殊方块出现。",
-            "start_challenge": "挑战模式：随机出现的特殊方块和递增的下落速度，看你能坚持多久！"
+            "start_challenge": "挑战模式：随机出现的特殊方块和递增的下落速度，看你能坚持多久！",
+            "start_versus": "双人对战：一次消除多行会向对手发送垃圾行，坚持到最后获胜！"
         }
         
-        # 菜单选项
+        # 菜单选项（y为逻辑纵坐标）
         self.options = [
-            {"text": "经典模式", "action": "start_classic", "pos": (self.width // 2, 200)},
-            {"text": "限时模式", "action": "start_timed", "pos": (self.width // 2, 280)},
-            {"text": "挑战模式", "action": "start_challenge", "pos": (self.width // 2, 360)},
-            {"text": "退出游戏", "action": "quit", "pos": (self.width // 2, 440)}
+            {"text": "经典模式", "action": "start_classic", "y": 180},
+            {"text": "限时模式", "action": "start_timed", "y": 250},
+            {"text": "挑战模式", "action": "start_challenge", "y": 320},
+            {"text": "双人对战", "action": "start_versus", "y": 390},
+            {"text": "退出游戏", "action": "quit", "y": 460}
         ]
         
         self.selected_option = 0
         self.last_key_time = 0
-        self.key_delay = 200  # 按键延迟(毫秒)
+        self.key_delay = settings_store.current.key_repeat_ms  # 按键延迟(毫秒)
+        
+        # 整个菜单画面缓存为一个Surface，只在选中项或窗口大小变化时重新渲染
+        self.frame = None
+        self.frame_option = None
     
     def update(self):
         self._handle_input()
@@ -55,44 +65,76 @@ class MainMenu:
             self.last_key_time = current_time
     
     def _render(self):
-        """渲染菜单界面"""
+        """把缓存的菜单画面绘制到屏幕上，选中项或窗口大小变化后先重新渲染缓存"""
+        size = self.screen.get_size()
+        if size != self.layout.size:
+            self.width, self.height = size
+            self.layout = layout_for(size)
+            self.frame = None
+        if self.frame is None or self.frame_option != self.selected_option:
+            self._render_frame()
+        self.screen.blit(self.frame, (0, 0))
+        self._render_progress()
+    
+    def _render_progress(self):
+        """后台资源还在加载时，在屏幕底部显示加载进度（不进入画面缓存）"""
+        done, total = assets.progress()
+        if done >= total:
+            return
+        layout = self.layout
+        bar_width = layout.px(200)
+        bar_height = layout.line(6)
+        left = (self.width - bar_width) // 2
+        top = layout.bottom - layout.px(40)
+        pygame.draw.rect(self.screen, (80, 80, 80), (left, top, bar_width, bar_height))
+        pygame.draw.rect(self.screen, (255, 165, 0), (left, top, bar_width * done // total, bar_height))
+        text = self.font_manager.render_text(f"正在加载资源 {done}/{total}", layout.font_size(18), (150, 150, 150))
+        self.screen.blit(text, text.get_rect(center=(self.width // 2, top + layout.px(20))))
+    
+    def _render_frame(self):
+        """渲染菜单界面到缓存Surface"""
+        if self.frame is None:
+            self.frame = pygame.Surface((self.width, self.height)).convert()
+        self.frame_option = self.selected_option
+        screen = self.frame
+        layout = self.layout
+        
         # 背景
-        self.screen.fill((0, 0, 0))
+        screen.fill((0, 0, 0))
         
         # 标题
-        title_surface = self.font_manager.render_text("tetris", 72, (255, 255, 255))
-        title_rect = title_surface.get_rect(center=(self.width // 2, 100))
-        self.screen.blit(title_surface, title_rect)
+        title_surface = self.font_manager.render_text("tetris", layout.font_size(72), (255, 255, 255))
+        title_rect = title_surface.get_rect(center=(self.width // 2, layout.y(100)))
+        screen.blit(title_surface, title_rect)
         
         # 菜单选项
         for i, option in enumerate(self.options):
             # 选中项用不同颜色
             color = (255, 255, 0) if i == self.selected_option else (200, 200, 200)
-            text_surface = self.font_manager.render_text(option["text"], 48, color)
-            rect = text_surface.get_rect(center=option["pos"])
-            self.screen.blit(text_surface, rect)
+            text_surface = self.font_manager.render_text(option["text"], layout.font_size(48), color)
+            rect = text_surface.get_rect(center=(self.width // 2, layout.y(option["y"])))
+            screen.blit(text_surface, rect)
         
         # 显示当前选中模式的描述（只对游戏模式显示描述）
-        if self.selected_option < 3:  # 前三个选项是游戏模式
-            selected_action = self.options[self.selected_option]["action"]
-            if selected_action in self.mode_descriptions:
-                description = self.mode_descriptions[selected_action]
-                
-                # 将描述文本拆分成多行，每行最多40个字符
-                wrapped_text = self._wrap_text(description, 40)
-                
-                # 渲染每一行
-                description_y = 500
-                for line in wrapped_text:
-                    desc_surface = self.font_manager.render_text(line, 24, (180, 180, 180))
-                    desc_rect = desc_surface.get_rect(center=(self.width // 2, description_y))
-                    self.screen.blit(desc_surface, desc_rect)
-                    description_y += 30
+        selected_action = self.options[self.selected_option]["action"]
+        if selected_action in self.mode_descriptions:
+            description = self.mode_descriptions[selected_action]
+            
+            # 将描述文本拆分成多行，每行最多40个字符
+            wrapped_text = self._wrap_text(description, 40)
+            
+            # 渲染每一行
+            description_y = layout.y(520)
+            for line in wrapped_text:
+                desc_surface = self.font_manager.render_text(line, layout.font_size(24), (180, 180, 180))
+                desc_rect = desc_surface.get_rect(center=(self.width // 2, description_y))
+                screen.blit(desc_surface, desc_rect)
+                description_y += layout.px(30)
         
         # 添加回车键选择的提示
-        enter_tip = self.font_manager.render_text("按回车键选择", 32, (255, 165, 0))  # 使用橙色使其醒目
-        enter_tip_rect = enter_tip.get_rect(center=(self.width // 2, self.height - 100))
-        self.screen.blit(enter_tip, enter_tip_rect)
+        enter_tip = self.font_manager.render_text("按回车键选择", layout.font_size(32), (255, 165, 0))  # 使用橙色使其醒目
+        enter_tip_rect = enter_tip.get_rect(center=(self.width // 2, layout.bottom - layout.px(100)))
+        screen.blit(enter_tip, enter_tip_rect)
     
     def _wrap_text(self, text, max_chars_per_line):
         """将文本按最大字符数换行"""
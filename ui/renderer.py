@@ -1,10 +1,23 @@
 import pygame
 from utils.font_manager import FontManager
+from ui.tile_atlas import TileAtlas, STYLE_ACTIVE, STYLE_GHOST, STYLE_GHOST_PLAIN
+from ui.board_layer import BoardLayer
+from ui.layout import layout_for
+from utils.profiler import profiler
+
+# 画质等级：帧耗时持续超出预算时由帧调度（utils/frame_scheduler.py）逐级降低
+QUALITY_MINIMAL = 0  # 幽灵方块改为单线轮廓（不画十字线）
+QUALITY_REDUCED = 1  # 连消横幅不画边框和四角星
+QUALITY_FULL = 2
 
 class GameRenderer:
     def __init__(self, screen):
         self.screen = screen
-        self.block_size = 30  # 方块大小，单位：像素
+        # 以下尺寸和位置都是按屏幕大小（ui/layout.py）换算后的像素，见 _apply_layout()
+        self.layout = None
+        self.block_size = 30  # 方块大小，单位：像素（大尺寸游戏板会自动缩小以适应屏幕）
+        self.max_block_size = 30
+        self.preview_block_size = 30  # 下一个方块预览的方块大小，不随游戏板缩放
         
         # 游戏区域位置和大小 - 将左侧边距从200减小到150
         self.board_left = 150  # 从200减小到150，使游戏区域向左移动
@@ -13,6 +26,18 @@ class GameRenderer:
         # 边框宽度
         self.border_width = 2
         
+        # 游戏板右侧信息面板占用的宽度和底部留白
+        self.info_panel_width = 250
+        self.board_bottom_margin = 30
+        self._fitted_for = None
+        self.board_pixel_width = 10 * self.block_size
+        
+        # 背景颜色
+        self.background_color = (40, 44, 52)
+        
+        # 画质等级，降低时省略可选的装饰效果
+        self.quality = QUALITY_FULL
+        
         # 颜色定义
         self.colors = [
             (0, 0, 0),       # 0: 空白
@@ -25,47 +50,232 @@ class GameRenderer:
             (240, 0, 0),     # 7: Z方块 - 红色
             (255, 64, 64),   # 8: 爆炸方块 - 亮红色
             (64, 64, 255),   # 9: 冰冻方块 - 亮蓝色
-            (255, 255, 64)   # 10: 彩虹方块 - 亮黄色
+            (255, 255, 64),  # 10: 彩虹方块 - 亮黄色
+            (128, 128, 128)  # 11: 垃圾行 - 灰色
         ]
         
         # 使用字体管理器
         self.font_manager = FontManager()
+        
+        # 预渲染的单元格图集（方块大小或调色板变化时才重建）
+        self.tiles = TileAtlas()
+        self.preview_tiles = TileAtlas()
+        
+        # 已固定方块的离屏缓存层（只在游戏板通知变化时局部重绘）
+        self.board_layer = BoardLayer(self.background_color)
+        
+        # 预先合成的覆盖消息和连消横幅缓存
+        self._overlay_cache = {}
+        self._combo_cache = {}
+        self.surface_cache_limit = 16
+        
+        # 对战模式：每块游戏板一个缓存层，所有游戏板共享同一份图集和文本缓存
+        self.versus_layers = []
+        self.versus_preview_size = 16  # 对战模式中下一个方块预览的方块大小
+        self.versus_side_width = 80  # 每块游戏板右侧预览区的宽度
+        self.versus_board_top = 90
+        self._versus_fitted_for = None
+        self._dim_cache = {}
+    
+    def _apply_layout(self):
+        """屏幕大小变化时按新的布局换算尺寸和位置（逻辑值按800x680设计）
+
+        图集在方块大小变化时按新的大小重新绘制，文本按换算后的字号渲染（都按大小缓存），
+        不需要每帧缩放整个画面。
+        """
+        size = self.screen.get_size()
+        if self.layout is not None and self.layout.size == size:
+            return
+        layout = self.layout = layout_for(size)
+        self.max_block_size = layout.px(30)
+        self.preview_block_size = layout.px(30)
+        self.board_left = layout.x(150)
+        self.board_top = layout.y(50)
+        self.border_width = layout.line(2)
+        self.info_panel_width = layout.px(250)
+        self.board_bottom_margin = layout.px(30)
+        self.versus_preview_size = layout.px(16)
+        self.versus_side_width = layout.px(80)
+        self.versus_board_top = layout.y(90)
+        self._fitted_for = None
+        self._versus_fitted_for = None
+        self._combo_cache.clear()
+    
+    def _text(self, text, size, color):
+        """按布局换算字号后渲染文本（使用字体管理器的文本缓存）"""
+        return self.font_manager.render_text(text, self.layout.font_size(size), color)
     
     def render_game(self, board, current_block, next_block, score, level, mode, 
                    ghost_block=None, time_remaining=None, paused=False, 
                    return_confirm=False, game_over=False, combo_info=None, highest_score=0):
         """渲染整个游戏界面"""
         # 清空屏幕
-        self.screen.fill((40, 44, 52))
+        self.screen.fill(self.background_color)
+        
+        # 根据屏幕和游戏板尺寸确定方块大小，并确保图集与方块大小和调色板一致
+        self._apply_layout()
+        self._fit_board(board)
+        self.tiles.ensure(self.block_size, self.colors)
+        self.preview_tiles.ensure(self.preview_block_size, self.colors)
+        
+        # 绘制游戏区域、幽灵方块和当前方块
+        self._render_playfield(board, current_block, ghost_block, self.board_layer,
+                               self.board_left, self.board_top, paused)
         
+        # 绘制信息面板
+        with profiler.section("render.panel"):
+            self._render_info_panel(next_block, score, level, mode, time_remaining, highest_score)
+        
+        with profiler.section("render.overlay"):
+            self._render_overlays(score, paused, return_confirm, game_over, combo_info, highest_score)
+    
+    def _render_playfield(self, board, current_block, ghost_block, layer, left, top, paused=False):
+        """在指定位置绘制一块游戏区域：边框、已固定的方块、幽灵方块和当前方块"""
         # 绘制游戏区域边框
         border_rect = pygame.Rect(
-            self.board_left - self.border_width, 
-            self.board_top - self.border_width,
+            left - self.border_width, 
+            top - self.border_width,
             board.width * self.block_size + self.border_width * 2,
             board.height * self.block_size + self.border_width * 2
         )
         pygame.draw.rect(self.screen, (200, 200, 200), border_rect, self.border_width)
         
         # 绘制游戏板
-        self._render_board(board)
-        
-        # 绘制幽灵方块（如果存在）- 先绘制幽灵方块，再绘制当前方块，这样当前方块会在上层
-        if ghost_block and not paused:
-            self._render_ghost_block(ghost_block)
-        
-        # 绘制当前方块
-        self._render_block(current_block)
-        
-        # 绘制信息面板
-        self._render_info_panel(next_block, score, level, mode, time_remaining, highest_score)
+        with profiler.section("render.board"):
+            self._render_board(board, layer, left, top)
+        
+        with profiler.section("render.pieces"):
+            # 绘制幽灵方块（如果存在）- 先绘制幽灵方块，再绘制当前方块，这样当前方块会在上层
+            # 幽灵方块是操作辅助，任何画质下都绘制，只在最低画质下省略装饰
+            if ghost_block and not paused:
+                style = STYLE_GHOST if self.quality > QUALITY_MINIMAL else STYLE_GHOST_PLAIN
+                self._render_ghost_block(ghost_block, left, top, style)
+            
+            # 绘制当前方块
+            self._render_block(current_block, left, top)
+    
+    def render_versus(self, players, paused=False, winner=None, controls=None):
+        """并排渲染对战模式中的所有游戏板
+
+        players为列表，每项是包含 name、board、current_block、next_block、ghost_block、
+        score、pending_garbage、game_over 的字典；winner为获胜玩家名称（比赛结束时）。
+        """
+        self.screen.fill(self.background_color)
+        count = len(players)
+        if not count:
+            return
         
+        # 所有游戏板使用同一方块大小，图集只需一份
+        self._apply_layout()
+        self._fit_versus(players[0]["board"], count)
+        self.tiles.ensure(self.block_size, self.colors)
+        self.preview_tiles.ensure(self.versus_preview_size, self.colors)
+        while len(self.versus_layers) < count:
+            self.versus_layers.append(BoardLayer(self.background_color))
+        
+        slot_width = self.screen.get_width() // count
+        top = self.versus_board_top
+        for i, player in enumerate(players):
+            board = player["board"]
+            board_width = board.width * self.block_size
+            left = i * slot_width + (slot_width - board_width - self.versus_side_width) // 2
+            
+            self._render_playfield(board, player["current_block"], player["ghost_block"],
+                                   self.versus_layers[i], left, top, paused)
+            
+            with profiler.section("render.panel"):
+                # 玩家名称和分数
+                name_text = self._text(player["name"], 28, (255, 215, 0))
+                self.screen.blit(name_text, (left, top - self.layout.px(75)))
+                score_text = self._text(f"分数: {player['score']}", 24, (255, 255, 255))
+                self.screen.blit(score_text, (left, top - self.layout.px(40)))
+                
+                # 即将收到的垃圾行：游戏板左侧的红色进度条
+                pending = min(player["pending_garbage"], board.height)
+                if pending:
+                    bar_height = pending * self.block_size
+                    pygame.draw.rect(self.screen, (255, 60, 60),
+                                     (left - self.border_width - self.layout.px(6),
+                                      top + board.height * self.block_size - bar_height,
+                                      self.layout.line(4), bar_height))
+                
+                # 下一个方块预览
+                next_block = player["next_block"]
+                if next_block and not player["game_over"]:
+                    color_index = abs(next_block.get_cell_value())
+                    cells = [(x, y, color_index)
+                             for y, row in enumerate(next_block.shape)
+                             for x, cell in enumerate(row) if cell]
+                    self.screen.blits(self.preview_tiles.blit_sequence(
+                        STYLE_ACTIVE, cells, left + board_width + self.layout.px(15), top), doreturn=False)
+            
+            # 已出局的玩家：游戏板变暗
+            if player["game_over"]:
+                with profiler.section("render.overlay"):
+                    self.screen.blit(self._dim_surface(board_width, board.height * self.block_size), (left, top))
+                    out_text = self._text("出局", 48, (255, 100, 100))
+                    self.screen.blit(out_text, out_text.get_rect(
+                        center=(left + board_width // 2, top + board.height * self.block_size // 2)))
+        
+        # 操作说明
+        if controls:
+            controls_text = self._text(controls, 18, (200, 200, 200))
+            self.screen.blit(controls_text, controls_text.get_rect(
+                center=(self.screen.get_width() // 2, self.layout.bottom - self.layout.px(15))))
+        
+        with profiler.section("render.overlay"):
+            if paused:
+                self._render_overlay_message("游戏暂停", "按 P 键继续游戏", (255, 255, 255), show_q_tip=False)
+            if winner is not None:
+                self._render_overlay_message(f"{winner} 获胜！", "按 R 键再来一局", (255, 215, 0), show_q_tip=True)
+    
+    def _fit_versus(self, board, count):
+        """计算对战模式中每块游戏板的方块大小"""
+        key = (board.width, board.height, count, self.screen.get_size())
+        if key == self._versus_fitted_for:
+            return
+        self._versus_fitted_for = key
+        slot_width = key[3][0] // count
+        available_width = slot_width - self.versus_side_width - self.layout.px(30)
+        available_height = self.layout.bottom - self.versus_board_top - self.layout.px(40)
+        self.block_size = max(1, min(self.max_block_size,
+                                     available_width // board.width,
+                                     available_height // board.height))
+        self.board_pixel_width = board.width * self.block_size
+        self._fitted_for = None  # 切回单人模式时重新计算
+    
+    def _dim_surface(self, width, height):
+        """返回缓存的半透明遮罩"""
+        key = (width, height)
+        surface = self._dim_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface(key, pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 160))
+            self._cache_surface(self._dim_cache, key, surface)
+        return surface
+    
+    def _fit_board(self, board):
+        """根据游戏板行列数和屏幕大小计算方块大小，只在尺寸变化时重新计算"""
+        key = (board.width, board.height, self.screen.get_size())
+        if key == self._fitted_for:
+            return
+        self._fitted_for = key
+        available_width = self.layout.right - self.board_left - self.info_panel_width
+        available_height = self.layout.bottom - self.board_top - self.board_bottom_margin
+        self.block_size = max(1, min(self.max_block_size,
+                                     available_width // board.width,
+                                     available_height // board.height))
+        self.board_pixel_width = board.width * self.block_size
+    
+    def _render_overlays(self, score, paused, return_confirm, game_over, combo_info, highest_score):
+        """渲染连消特效和各种覆盖消息"""
         # 渲染连消信息 - 放在最后确保它在最上层
-        if combo_info and combo_info[1]:  # combo_info=(连消计数, 是否显示, 行数)
+        if combo_info and combo_info[1]:  # combo_info=(连消计数, 是否显示, 行数[, 透明度])
             combo_count = combo_info[0]
             lines_cleared = combo_info[2] if len(combo_info) > 2 else 0
+            combo_alpha = combo_info[3] if len(combo_info) > 3 else None
             if combo_count > 0:  # 只要有连消就显示
-                self._render_combo_effect(combo_count, lines_cleared)
+                self._render_combo_effect(combo_count, lines_cleared, combo_alpha)
         
         # 如果游戏暂停，显示暂停消息，不显示Q键提示
         if paused:
@@ -83,177 +293,87 @@ class GameRenderer:
             else:
                 self._render_overlay_message(f"游戏结束！得分: {score}", f"历史最高分: {highest_score}", (255, 100, 100), show_q_tip=True)
     
-    def _render_board(self, board):
-        """渲染游戏板"""
-        for y in range(board.height):
-            for x in range(board.width):
-                cell_value = board.grid[y][x]
-                if cell_value != 0:  # 不是空白格子
-                    # 确定颜色索引
-                    color_index = abs(cell_value)
-                    if color_index >= len(self.colors):
-                        color_index = 0
-                    
-                    # 绘制方块
-                    rect = pygame.Rect(
-                        self.board_left + x * self.block_size,
-                        self.board_top + y * self.block_size,
-                        self.block_size, self.block_size
-                    )
-                    pygame.draw.rect(self.screen, self.colors[color_index], rect)
-                    pygame.draw.rect(self.screen, (100, 100, 100), rect, 1)
-                    
-                    # 如果是特殊方块，绘制特殊标记
-                    if cell_value < 0:
-                        self._draw_special_marker(rect, cell_value)
+    def _render_board(self, board, layer, left, top):
+        """渲染游戏板 - 已固定的方块来自离屏缓存层，每帧只需一次blit"""
+        self.screen.blit(layer.render(board, self.tiles), (left, top))
     
-    def _render_block(self, block):
+    def _render_block(self, block, left, top):
         """渲染当前活动方块"""
         if not block:
             return
-            
-        color_index = abs(block.get_cell_value())
-        if color_index >= len(self.colors):
-            color_index = 0
-            
-        for x, y in block.get_occupied_cells():
-            # 只渲染在游戏板范围内的部分
-            if y >= 0:
-                rect = pygame.Rect(
-                    self.board_left + x * self.block_size,
-                    self.board_top + y * self.block_size,
-                    self.block_size, self.block_size
-                )
-                pygame.draw.rect(self.screen, self.colors[color_index], rect)
-                pygame.draw.rect(self.screen, (200, 200, 200), rect, 1)
-                
-                # 特殊方块标记
-                if block.is_special():
-                    self._draw_special_marker(rect, block.get_cell_value())
+        
+        value = block.get_cell_value()
+        # 只渲染在游戏板范围内的部分
+        cells = [(x, y, value) for x, y in block.get_occupied_cells() if y >= 0]
+        self.screen.blits(self.tiles.blit_sequence(STYLE_ACTIVE, cells, left, top), doreturn=False)
     
-    def _render_ghost_block(self, ghost_block):
-        """渲染幽灵方块 - 半透明提示块"""
+    def _render_ghost_block(self, ghost_block, left, top, style=STYLE_GHOST):
+        """渲染幽灵方块 - 轮廓提示块"""
         if not ghost_block:
             return
-            
-        # 获取颜色，但使用半透明效果
-        color_index = abs(ghost_block.get_cell_value())
-        if color_index >= len(self.colors):
-            color_index = 0
-        
-        # 生成半透明颜色 - 保留原色调但降低饱和度和透明度
-        base_color = self.colors[color_index]
-        ghost_color = (base_color[0], base_color[1], base_color[2], 75)  # 添加透明度
-        ghost_border = (200, 200, 200, 120)  # 边框颜色，半透明
-        
-        # 创建一个临时surface用于半透明渲染
-        for x, y in ghost_block.get_occupied_cells():
-            # 只渲染在游戏板范围内的部分
-            if y >= 0:
-                rect = pygame.Rect(
-                    self.board_left + x * self.block_size,
-                    self.board_top + y * self.block_size,
-                    self.block_size, self.block_size
-                )
-                
-                # 使用轮廓方式渲染幽灵方块，看起来更像"预览"
-                pygame.draw.rect(self.screen, ghost_color, rect, 1)  # 1像素宽的边框
-                smaller_rect = pygame.Rect(
-                    rect.left + 2, rect.top + 2,
-                    rect.width - 4, rect.height - 4
-                )
-                pygame.draw.rect(self.screen, ghost_color, smaller_rect, 1)
-                
-                # 还可以绘制十字线来增强可见性
-                pygame.draw.line(self.screen, ghost_color,
-                               (rect.left, rect.top), 
-                               (rect.right, rect.bottom), 1)
-                pygame.draw.line(self.screen, ghost_color,
-                               (rect.left, rect.bottom), 
-                               (rect.right, rect.top), 1)
-    
-    def _draw_special_marker(self, rect, value):
-        """在特殊方块上绘制标记"""
-        center_x = rect.x + rect.width // 2
-        center_y = rect.y + rect.height // 2
-        radius = min(rect.width, rect.height) // 4
-        
-        if value == -1:  # 爆炸方块
-            pygame.draw.circle(self.screen, (255, 255, 255), (center_x, center_y), radius)
-        elif value == -2:  # 彩虹方块
-            # 绘制彩虹图案
-            for i in range(3):
-                pygame.draw.circle(self.screen, (255, 255, 255), (center_x, center_y), radius - i * 2, 1)
-        elif value == -3:  # 冰冻方块
-            # 绘制雪花图案
-            pygame.draw.line(self.screen, (255, 255, 255), 
-                            (center_x - radius, center_y), (center_x + radius, center_y), 1)
-            pygame.draw.line(self.screen, (255, 255, 255), 
-                            (center_x, center_y - radius), (center_x, center_y + radius), 1)
+        
+        value = ghost_block.get_cell_value()
+        # 只渲染在游戏板范围内的部分
+        cells = [(x, y, value) for x, y in ghost_block.get_occupied_cells() if y >= 0]
+        self.screen.blits(self.tiles.blit_sequence(style, cells, left, top), doreturn=False)
     
     def _render_info_panel(self, next_block, score, level, mode, time_remaining=None, highest_score=0):
         """渲染游戏信息面板"""
         # 下一个方块区域 - 调整水平位置以保持与游戏板的间距
-        next_area_left = self.board_left + (self.block_size * 10) + 50
+        px = self.layout.px
+        next_area_left = self.board_left + self.board_pixel_width + px(50)
         next_area_top = self.board_top
-        next_area_width = 150
-        next_area_height = 100
+        next_area_width = px(150)
+        next_area_height = px(100)
         
         # 绘制下一个方块区域边框
         next_rect = pygame.Rect(next_area_left, next_area_top, next_area_width, next_area_height)
         pygame.draw.rect(self.screen, (200, 200, 200), next_rect, self.border_width)
         
         # 标题文本
-        next_text = self.font_manager.render_text("下一个:", 24, (255, 255, 255))
-        self.screen.blit(next_text, (next_area_left + 10, next_area_top + 10))
+        next_text = self._text("下一个:", 24, (255, 255, 255))
+        self.screen.blit(next_text, (next_area_left + px(10), next_area_top + px(10)))
         
         # 绘制下一个方块
         if next_block:
-            offset_x = next_area_left + next_area_width // 2 - len(next_block.shape[0]) * self.block_size // 2
-            offset_y = next_area_top + 40
+            offset_x = next_area_left + next_area_width // 2 - len(next_block.shape[0]) * self.preview_block_size // 2
+            offset_y = next_area_top + px(40)
             
+            # 预览只显示颜色，不显示特殊标记
             color_index = abs(next_block.get_cell_value())
-            if color_index >= len(self.colors):
-                color_index = 0
-                
-            for y, row in enumerate(next_block.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        rect = pygame.Rect(
-                            offset_x + x * self.block_size,
-                            offset_y + y * self.block_size,
-                            self.block_size, self.block_size
-                        )
-                        pygame.draw.rect(self.screen, self.colors[color_index], rect)
-                        pygame.draw.rect(self.screen, (200, 200, 200), rect, 1)
+            cells = [(x, y, color_index)
+                     for y, row in enumerate(next_block.shape)
+                     for x, cell in enumerate(row) if cell]
+            self.screen.blits(self.preview_tiles.blit_sequence(STYLE_ACTIVE, cells, offset_x, offset_y),
+                              doreturn=False)
         
         # 分数和等级信息
-        score_y = next_area_top + next_area_height + 30
-        score_text = self.font_manager.render_text(f"分数: {score}", 36, (255, 255, 255))
+        score_y = next_area_top + next_area_height + px(30)
+        score_text = self._text(f"分数: {score}", 36, (255, 255, 255))
         self.screen.blit(score_text, (next_area_left, score_y))
         
         # 添加最高分显示
-        high_score_y = score_y + 40
-        high_score_text = self.font_manager.render_text(f"最高分: {highest_score}", 36, (255, 215, 0))  # 用金色显示最高分
+        high_score_y = score_y + px(40)
+        high_score_text = self._text(f"最高分: {highest_score}", 36, (255, 215, 0))  # 用金色显示最高分
         self.screen.blit(high_score_text, (next_area_left, high_score_y))
         
-        level_y = high_score_y + 40  # 调整等级显示位置
-        level_text = self.font_manager.render_text(f"等级: {level}", 36, (255, 255, 255))
+        level_y = high_score_y + px(40)  # 调整等级显示位置
+        level_text = self._text(f"等级: {level}", 36, (255, 255, 255))
         self.screen.blit(level_text, (next_area_left, level_y))
         
         # 游戏模式
-        mode_y = level_y + 40
+        mode_y = level_y + px(40)
         mode_names = {
             "classic": "经典模式",
             "timed": "限时模式",
             "challenge": "挑战模式"
         }
-        mode_text = self.font_manager.render_text(f"模式: {mode_names.get(mode, mode)}", 36, (255, 255, 255))
+        mode_text = self._text(f"模式: {mode_names.get(mode, mode)}", 36, (255, 255, 255))
         self.screen.blit(mode_text, (next_area_left, mode_y))
         
         # 如果是限时模式，显示剩余时间
         if time_remaining is not None:
-            time_y = mode_y + 40
+            time_y = mode_y + px(40)
             minutes = int(time_remaining // 60)
             seconds = int(time_remaining % 60)
             
@@ -264,14 +384,14 @@ class GameRenderer:
             elif time_remaining < 60:  # 少于1分钟显示黄色
                 time_color = (255, 255, 50)
             
-            time_text = self.font_manager.render_text(f"剩余时间: {minutes:02d}:{seconds:02d}", 36, time_color)
+            time_text = self._text(f"剩余时间: {minutes:02d}:{seconds:02d}", 36, time_color)
             self.screen.blit(time_text, (next_area_left, time_y))
             
             # 调整控制说明的起始位置
-            controls_y = time_y + 50
+            controls_y = time_y + px(50)
         else:
             # 没有时间显示时的控制说明位置
-            controls_y = mode_y + 50
+            controls_y = mode_y + px(50)
         
         # 控制说明
         controls = [
@@ -282,46 +402,82 @@ class GameRenderer:
         ]
         
         # 计算所需总高度，确保不会超出屏幕底部
-        screen_height = self.screen.get_height()
-        line_height = 20
+        bottom = self.layout.bottom - px(10)
+        line_height = px(20)
         total_controls_height = len(controls) * line_height
         
         # 如果预计位置会超出屏幕，则调整起始位置
-        if controls_y + total_controls_height > screen_height - 10:
-            controls_y = screen_height - total_controls_height - 10
+        if controls_y + total_controls_height > bottom:
+            controls_y = bottom - total_controls_height
         
         for i, control in enumerate(controls):
-            control_text = self.font_manager.render_text(control, 18, (200, 200, 200))
+            control_text = self._text(control, 18, (200, 200, 200))
             self.screen.blit(control_text, (next_area_left, controls_y + i * line_height))
     
     def _render_overlay_message(self, main_text, sub_text, color, show_q_tip=True):
-        """渲染覆盖在游戏上的消息"""
+        """渲染覆盖在游戏上的消息 - 每种消息只合成一次，之后每帧一次blit"""
+        size = self.screen.get_size()
+        key = (main_text, sub_text, color, show_q_tip, size)
+        overlay = self._overlay_cache.get(key)
+        if overlay is None:
+            overlay = self._compose_overlay_message(main_text, sub_text, color, show_q_tip, size)
+            self._cache_surface(self._overlay_cache, key, overlay)
+        self.screen.blit(overlay, (0, 0))
+    
+    def _compose_overlay_message(self, main_text, sub_text, color, show_q_tip, size):
+        """合成覆盖消息层：半透明背景和全部文本"""
+        width, height = size
+        px = self.layout.px
         # 创建半透明背景
-        overlay = pygame.Surface((self.screen.get_width(), self.screen.get_height()), pygame.SRCALPHA)
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))  # 半透明黑色
-        self.screen.blit(overlay, (0, 0))
         
         # 渲染主要文本
-        main_surface = self.font_manager.render_text(main_text, 48, color)
-        main_rect = main_surface.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 - 30))
-        self.screen.blit(main_surface, main_rect)
+        main_surface = self._text(main_text, 48, color)
+        main_rect = main_surface.get_rect(center=(width//2, height//2 - px(30)))
+        overlay.blit(main_surface, main_rect)
         
         # 渲染辅助文本
-        sub_surface = self.font_manager.render_text(sub_text, 28, (200, 200, 200))
-        sub_rect = sub_surface.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 30))
-        self.screen.blit(sub_surface, sub_rect)
+        sub_surface = self._text(sub_text, 28, (200, 200, 200))
+        sub_rect = sub_surface.get_rect(center=(width//2, height//2 + px(30)))
+        overlay.blit(sub_surface, sub_rect)
         
         # 添加Q键提示 - 只在需要时显示
         if show_q_tip:
-            q_text = self.font_manager.render_text("按 Q 键返回菜单", 24, (255, 255, 0))
-            q_rect = q_text.get_rect(center=(self.screen.get_width()//2, self.screen.get_height()//2 + 70))
-            self.screen.blit(q_text, q_rect)
+            q_text = self._text("按 Q 键返回菜单", 24, (255, 255, 0))
+            q_rect = q_text.get_rect(center=(width//2, height//2 + px(70)))
+            overlay.blit(q_text, q_rect)
+        return overlay
+    
+    def _cache_surface(self, cache, key, surface):
+        """将合成好的Surface放入缓存，超过上限时整体清空"""
+        if len(cache) >= self.surface_cache_limit:
+            cache.clear()
+        cache[key] = surface
+    
+    def _render_combo_effect(self, combo_count, lines_cleared, alpha=None):
+        """渲染连消特效 - 显示"perfect X 连消的行数"（画质降低时不画边框和装饰）"""
+        decorated = self.quality > QUALITY_REDUCED
+        key = (combo_count, lines_cleared, decorated)
+        overlay = self._combo_cache.get(key)
+        if overlay is None:
+            overlay = self._compose_combo_effect(combo_count, lines_cleared, decorated)
+            self._cache_surface(self._combo_cache, key, overlay)
+        
+        # 计算显示位置 - 在游戏区域中央偏上
+        pos_x = self.board_left + self.board_pixel_width // 2 - overlay.get_width() // 2
+        pos_y = self.board_top + self.layout.px(150)  # 固定在游戏区域中上部
+        
+        # 绘制到屏幕 - 通过整体透明度实现淡出效果
+        overlay.set_alpha(255 if alpha is None else alpha)
+        self.screen.blit(overlay, (pos_x, pos_y))
     
-    def _render_combo_effect(self, combo_count, lines_cleared):
-        """渲染连消特效 - 显示"perfect X 连消的行数" """
+    def _compose_combo_effect(self, combo_count, lines_cleared, decorated=True):
+        """合成连消横幅；decorated为False时只有背景和文本"""
         # 增大连消显示的尺寸
-        overlay_width = 250
-        overlay_height = 100
+        px = self.layout.px
+        overlay_width = px(250)
+        overlay_height = px(100)
         
         # 创建半透明效果层
         overlay = pygame.Surface((overlay_width, overlay_height), pygame.SRCALPHA)
@@ -336,33 +492,32 @@ class GameRenderer:
         
         overlay.fill(bg_color)
         
-        # 计算显示位置 - 在游戏区域中央偏上
-        pos_x = self.board_left + (self.block_size * 10) // 2 - overlay_width // 2
-        pos_y = self.board_top + 150  # 固定在游戏区域中上部
-        
         # 设置边框颜色和宽度
         border_color = (255, 215, 0)  # 金色边框
-        border_width = 3  # 边框宽度为3像素
+        border_width = self.layout.line(3)  # 边框宽度为3（逻辑）像素
         
         # 渲染"Perfect"文本
-        perfect_text = self.font_manager.render_text("Perfect", 48, (255, 215, 0))  # 金色
+        perfect_text = self._text("Perfect", 48, (255, 215, 0))  # 金色
         
         # 渲染连消行数文本
-        combo_text = self.font_manager.render_text(f"x{combo_count} 连消{lines_cleared}行", 32, (255, 255, 255))
+        combo_text = self._text(f"x{combo_count} 连消{lines_cleared}行", 32, (255, 255, 255))
         
         # 计算文本位置，使其居中显示
         perfect_x = (overlay_width - perfect_text.get_width()) // 2
         combo_x = (overlay_width - combo_text.get_width()) // 2
         
         # 绘制文本到覆盖层
-        overlay.blit(perfect_text, (perfect_x, 10))
-        overlay.blit(combo_text, (combo_x, 60))
+        overlay.blit(perfect_text, (perfect_x, px(10)))
+        overlay.blit(combo_text, (combo_x, px(60)))
+        
+        if not decorated:
+            return overlay
         
         # 绘制边框到覆盖层
         pygame.draw.rect(overlay, border_color, overlay.get_rect(), border_width)
         
         # 添加装饰性元素 - 四角星标记
-        star_size = 10
+        star_size = px(10)
         star_positions = [
             (border_width, border_width),  # 左上
             (overlay_width - border_width - star_size, border_width),  # 右上
@@ -378,5 +533,4 @@ class GameRenderer:
                 (x, y + star_size//2),  # 左
             ])
         
-        # 绘制到屏幕 - 添加淡入淡出效果
-        self.screen.blit(overlay, (pos_x, pos_y))
+        return overlay
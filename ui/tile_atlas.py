@@ -0,0 +1,135 @@
+import pygame
+
+# 单元格样式
+STYLE_BOARD = "board"    # 已固定在游戏板上的方块
+STYLE_ACTIVE = "active"  # 当前活动方块 / 下一个方块预览
+STYLE_GHOST = "ghost"    # 幽灵方块（只有轮廓）
+STYLE_GHOST_PLAIN = "ghost_plain"  # 最低画质下的幽灵方块（单线轮廓，没有十字线）
+STYLES = (STYLE_BOARD, STYLE_ACTIVE, STYLE_GHOST, STYLE_GHOST_PLAIN)
+
+# 各样式的边框颜色
+BORDER_COLORS = {
+    STYLE_BOARD: (100, 100, 100),
+    STYLE_ACTIVE: (200, 200, 200)
+}
+
+# 带特殊标记的单元格值（爆炸、彩虹、冰冻）
+SPECIAL_VALUES = (-1, -2, -3)
+
+
+def draw_special_marker(surface, rect, value):
+    """在特殊方块上绘制标记"""
+    center_x = rect.x + rect.width // 2
+    center_y = rect.y + rect.height // 2
+    radius = min(rect.width, rect.height) // 4
+
+    if value == -1:  # 爆炸方块
+        pygame.draw.circle(surface, (255, 255, 255), (center_x, center_y), radius)
+    elif value == -2:  # 彩虹方块
+        # 绘制彩虹图案
+        for i in range(3):
+            pygame.draw.circle(surface, (255, 255, 255), (center_x, center_y), radius - i * 2, 1)
+    elif value == -3:  # 冰冻方块
+        # 绘制雪花图案
+        pygame.draw.line(surface, (255, 255, 255),
+                        (center_x - radius, center_y), (center_x + radius, center_y), 1)
+        pygame.draw.line(surface, (255, 255, 255),
+                        (center_x, center_y - radius), (center_x, center_y + radius), 1)
+
+
+class _AreaTable(dict):
+    """单元格值 -> 图集区域的查找表，未预生成的值按规则映射到已有图块"""
+
+    def __init__(self, atlas, style):
+        super().__init__()
+        self.atlas = atlas
+        self.style = style
+
+    def __missing__(self, value):
+        area = self[self.atlas.normalize(value)]
+        self[value] = area
+        return area
+
+
+class TileAtlas:
+    """预渲染的单元格图集：每种颜色和样式只绘制一次，渲染时直接blit对应区域"""
+
+    def __init__(self):
+        self.surface = None
+        self.block_size = None
+        self.palette = None
+        self.areas = {}  # 样式 -> _AreaTable
+        self.version = 0  # 每次重建递增，供依赖图集的缓存判断是否失效
+
+    def ensure(self, block_size, palette):
+        """确保图集与当前方块大小和调色板一致，必要时重建，返回是否发生重建"""
+        if self.surface is not None and block_size == self.block_size and palette == self.palette:
+            return False
+        self._build(block_size, list(palette))
+        return True
+
+    def normalize(self, value):
+        """把任意单元格值映射到图集中存在的图块值"""
+        if value in SPECIAL_VALUES:
+            return value
+        color_index = abs(value)
+        if color_index >= len(self.palette):
+            color_index = 0
+        return color_index
+
+    def _values(self):
+        """图集中每一列对应的单元格值"""
+        return SPECIAL_VALUES + tuple(range(len(self.palette)))
+
+    def _build(self, block_size, palette):
+        """按行（样式）和列（单元格值）重新绘制所有图块"""
+        self.block_size = block_size
+        self.palette = palette
+        self.version += 1
+
+        values = self._values()
+        surface = pygame.Surface((len(values) * block_size, len(STYLES) * block_size), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+
+        self.areas = {}
+        for row, style in enumerate(STYLES):
+            table = _AreaTable(self, style)
+            for column, value in enumerate(values):
+                rect = pygame.Rect(column * block_size, row * block_size, block_size, block_size)
+                self._draw_tile(surface, rect, style, value)
+                table[value] = rect
+            self.areas[style] = table
+
+        # 有显示模式时转换为显示格式以加速blit
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.surface = surface
+
+    def _draw_tile(self, surface, rect, style, value):
+        """绘制单个图块"""
+        color = self.palette[abs(value)]
+
+        if style == STYLE_GHOST:
+            # 使用轮廓方式渲染幽灵方块，看起来更像"预览"
+            pygame.draw.rect(surface, color, rect, 1)
+            smaller_rect = pygame.Rect(rect.left + 2, rect.top + 2, rect.width - 4, rect.height - 4)
+            pygame.draw.rect(surface, color, smaller_rect, 1)
+            # 十字线增强可见性
+            pygame.draw.line(surface, color, (rect.left, rect.top), (rect.right - 1, rect.bottom - 1), 1)
+            pygame.draw.line(surface, color, (rect.left, rect.bottom - 1), (rect.right - 1, rect.top), 1)
+            return
+        if style == STYLE_GHOST_PLAIN:
+            pygame.draw.rect(surface, color, rect, 1)
+            return
+
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, BORDER_COLORS[style], rect, 1)
+        if value < 0:
+            draw_special_marker(surface, rect, value)
+
+    def blit_sequence(self, style, cells, left, top):
+        """为一组 (x, y, 单元格值) 生成 Surface.blits 所需的序列"""
+        surface = self.surface
+        areas = self.areas[style]
+        size = self.block_size
+        return [(surface, (left + x * size, top + y * size), areas[value]) for x, y, value in cells]
@@ -0,0 +1,239 @@
+"""资源包：把音效和字体打包为一个带索引和内容哈希的文件，运行时内存映射后按需取用
+
+文件格式：
+    魔数 b"TBUN" | 版本(u16) | 索引长度(u32) | 索引(JSON) | 各资源数据（按16字节对齐）
+索引记录混音器格式和每个资源的偏移、长度、SHA-256；音效同时保存原文件和按混音器格式
+解码好的PCM，混音器格式一致时直接把内存映射的切片交给 pygame.mixer.Sound(buffer=...)，
+不再逐个打开、探测和解码文件。构建时缺失的资源记入索引，运行时使用静音占位，不再每次启动都警告。
+
+构建和检查（资源文件或清单变化后重新构建）：
+    python -m utils.asset_bundle build
+    python -m utils.asset_bundle check    # 比较资源包中的哈希与现有文件，过期时返回1
+"""
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+
+BUNDLE_NAME = "assets.bundle"
+MAGIC = b"TBUN"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+ALIGN = 16
+
+# 除音效清单（sound.audio_manager.SOUND_FILES）外打包的字体
+FONT_FILES = ("simhei.ttf",)
+
+
+def manifest():
+    """资源清单：包内名称（相对资源目录的路径） -> 类型"""
+    from sound.audio_manager import SOUND_FILES
+    entries = {f"sounds/{filename}": "sound" for filename in SOUND_FILES.values()}
+    entries.update({f"fonts/{filename}": "font" for filename in FONT_FILES})
+    return entries
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def build(assets_dir, path=None, mixer_format=None):
+    """构建资源包，返回索引；mixer_format为(频率, 位数, 声道)，默认取当前混音器格式"""
+    import pygame
+    path = path or os.path.join(assets_dir, BUNDLE_NAME)
+    if not pygame.mixer.get_init():
+        if mixer_format:
+            pygame.mixer.init(*mixer_format)
+        else:
+            pygame.mixer.init()
+    mixer_format = pygame.mixer.get_init()
+
+    blobs = []
+    entries = {}
+    missing = []
+    offset = 0
+
+    def add(data):
+        nonlocal offset
+        start = offset
+        blobs.append(data)
+        padding = -len(data) % ALIGN
+        if padding:
+            blobs.append(bytes(padding))
+        offset += len(data) + padding
+        return [start, len(data)]
+
+    for name, kind in manifest().items():
+        source = os.path.join(assets_dir, name)
+        try:
+            with open(source, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            missing.append(name)
+            print(f"资源文件不存在，运行时将使用静音占位: {source}")
+            continue
+        entry = {"kind": kind, "sha256": _sha256(data), "data": add(data)}
+        if kind == "sound":
+            entry["pcm"] = add(pygame.mixer.Sound(file=io.BytesIO(data)).get_raw())
+        entries[name] = entry
+
+    index = {"mixer": list(mixer_format), "entries": entries, "missing": missing}
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    # 数据区从对齐的位置开始，偏移是相对数据区的
+    data_start = HEADER.size + len(index_bytes)
+    data_start += -data_start % ALIGN
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(bytes(data_start - f.tell()))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, path)
+    return index
+
+
+class AssetBundle:
+    """内存映射的资源包（只读）"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_index()
+        except (ValueError, KeyError, TypeError, struct.error) as error:
+            # 截断或损坏的资源包：关闭映射后统一报ValueError，由调用方改为读取单独的资源文件
+            self._map.close()
+            raise ValueError(f"不是可用的资源包: {path} ({error})") from error
+        self._view = memoryview(self._map)
+
+    def _read_index(self):
+        """校验文件头并解析索引（json.JSONDecodeError是ValueError的子类）"""
+        if len(self._map) < HEADER.size:
+            raise ValueError("文件头不完整")
+        magic, version, index_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("魔数或版本不符")
+        data_start = HEADER.size + index_size
+        data_start += -data_start % ALIGN
+        if len(self._map) < HEADER.size + index_size:
+            raise ValueError("索引不完整")
+        index = json.loads(self._map[HEADER.size:HEADER.size + index_size])
+        self.mixer_format = tuple(index["mixer"])
+        self.entries = index["entries"]
+        self.missing = set(index["missing"])
+        # 各资源的数据必须都在文件范围内
+        size = len(self._map)
+        for name, entry in self.entries.items():
+            for part in ("data", "pcm"):
+                if part in entry:
+                    start, length = entry[part]
+                    if data_start + start + length > size:
+                        raise ValueError(f"资源数据不完整: {name}")
+        self._data_start = data_start
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def view(self, name, part="data"):
+        """资源数据的零拷贝切片（memoryview）"""
+        start, size = self.entries[name][part]
+        start += self._data_start
+        return self._view[start:start + size]
+
+    def verify(self, name):
+        """检查资源数据与索引中的哈希是否一致"""
+        return _sha256(self.view(name)) == self.entries[name]["sha256"]
+
+    def sound(self, name):
+        """创建音效：混音器格式与构建时一致时直接使用PCM切片，否则解码原文件；缺失的资源返回None"""
+        import pygame
+        if name not in self.entries:
+            return None
+        if pygame.mixer.get_init() == self.mixer_format:
+            return pygame.mixer.Sound(buffer=self.view(name, "pcm"))
+        return pygame.mixer.Sound(file=io.BytesIO(self.view(name)))
+
+    def font_file(self, name):
+        """字体文件对象（pygame.font.Font可以直接读取），资源包中没有时返回None"""
+        if name not in self.entries:
+            return None
+        return io.BytesIO(self.view(name))
+
+    def stale(self, assets_dir):
+        """与资源目录中的现有文件比较，返回内容不一致或缺失状态变化的资源名称"""
+        changed = []
+        for name in manifest():
+            source = os.path.join(assets_dir, name)
+            if not os.path.exists(source):
+                if name in self.entries:
+                    changed.append(name)
+                continue
+            with open(source, "rb") as f:
+                digest = _sha256(f.read())
+            entry = self.entries.get(name)
+            if entry is None or entry["sha256"] != digest:
+                changed.append(name)
+        return changed
+
+
+_bundles = {}
+
+
+def open_bundle(assets_dir):
+    """打开资源目录下的资源包（每个目录只打开一次），没有资源包或无法使用时返回None"""
+    if assets_dir not in _bundles:
+        path = os.path.join(assets_dir, BUNDLE_NAME)
+        bundle = None
+        if os.path.exists(path):
+            try:
+                bundle = AssetBundle(path)
+            except (OSError, ValueError) as error:
+                print(f"无法使用资源包 {path}: {error}，改为读取单独的资源文件")
+        _bundles[assets_dir] = bundle
+    return _bundles[assets_dir]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="构建或检查资源包")
+    parser.add_argument("command", choices=("build", "check"))
+    parser.add_argument("--assets", default=None, help="资源目录，默认使用设置中的 assets_dir")
+    args = parser.parse_args(argv)
+
+    from utils.settings import settings_store
+    assets_dir = args.assets or settings_store.current.assets_dir
+    if args.command == "build":
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        index = build(assets_dir)
+        size = os.path.getsize(os.path.join(assets_dir, BUNDLE_NAME))
+        print(f"已打包 {len(index['entries'])} 个资源（缺失 {len(index['missing'])} 个），"
+              f"{size / 1024:.0f} KB，混音器格式 {tuple(index['mixer'])}")
+        return 0
+
+    path = os.path.join(assets_dir, BUNDLE_NAME)
+    if not os.path.exists(path):
+        print(f"资源包不存在: {path}")
+        return 1
+    bundle = AssetBundle(path)
+    corrupt = [name for name in bundle.entries if not bundle.verify(name)]
+    changed = bundle.stale(assets_dir)
+    for name in corrupt:
+        print(f"资源包中的数据损坏: {name}")
+    for name in changed:
+        print(f"资源已变化，需要重新构建: {name}")
+    if not corrupt and not changed:
+        print(f"资源包是最新的（{len(bundle.entries)} 个资源）")
+    return 1 if corrupt or changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AssetLoader:
+    """后台资源加载：按清单把资源交给工作线程加载，游戏不必等全部加载完才显示菜单
+
+    每个资源用一个名称登记（submit），get()取用时如果还没加载好：尚未开始的直接在调用线程中
+    加载，正在加载的则等待完成。progress()返回已完成的数量，供菜单显示加载进度。
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._executor = None
+        self._jobs = {}  # 名称 -> (Future, 加载函数, 参数)
+        self._inline = {}  # 已在调用线程中加载的资源
+        self._lock = threading.Lock()
+
+    def submit(self, name, loader, *args):
+        """登记一个资源并在后台开始加载；同名资源只加载一次"""
+        with self._lock:
+            if name in self._jobs:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+            self._jobs[name] = (self._executor.submit(loader, *args), loader, args)
+
+    def get(self, name):
+        """取得资源，还没加载好时立即加载或等待（加载出错时抛出加载函数的异常）"""
+        future, loader, args = self._jobs[name]
+        if future.done() and not future.cancelled():
+            return future.result()
+        if future.cancel():
+            # 还在队列中（或已被其他线程取消）：不再等待工作线程，在锁内加载，
+            # 多个线程同时取用时只加载一次；结果和异常都保存下来，之后的get()得到同样的结果
+            with self._lock:
+                if name not in self._inline:
+                    try:
+                        self._inline[name] = (loader(*args), None)
+                    except Exception as error:
+                        self._inline[name] = (None, error)
+                value, error = self._inline[name]
+            if error is not None:
+                raise error
+            return value
+        return future.result()
+
+    def _done(self, name, future):
+        return name in self._inline if future.cancelled() else future.done()
+
+    def ready(self, name):
+        """资源是否已经可以直接取用"""
+        job = self._jobs.get(name)
+        return job is not None and self._done(name, job[0])
+
+    def progress(self):
+        """返回(已完成的数量, 登记的总数)"""
+        jobs = list(self._jobs.items())
+        done = sum(1 for name, (future, _, _) in jobs if self._done(name, future))
+        return done, len(jobs)
+
+    def wait(self):
+        """等待所有登记的资源加载完成"""
+        for name in list(self._jobs):
+            self.get(name)
+
+
+# 全局资源加载器，各模块共享
+assets = AssetLoader()
@@ -1,18 +1,36 @@
 import pygame
 import os
 import sys
+from collections import OrderedDict
+from utils.profiler import profiler
+from utils.asset_bundle import open_bundle
+from utils.settings import settings_store
+
+# 所有FontManager实例共享的缓存：系统字体列表、Font对象和渲染好的文本
+_system_fonts_cache = None
+_font_cache = {}
+_text_cache = OrderedDict()
 
 class FontManager:
+    # 文本Surface缓存的最大条目数
+    text_cache_size = 256
+    
     def __init__(self):
         # 字体目录
-        self.fonts_dir = os.path.join("d:\\Github Doc\\tetris-common", "assets", "fonts")
-        os.makedirs(self.fonts_dir, exist_ok=True)
+        assets_dir = settings_store.current.assets_dir
+        self.fonts_dir = os.path.join(assets_dir, "fonts")
         
-        # 尝试加载自定义字体，如果存在
+        # 尝试加载自定义字体，如果存在；有资源包时从资源包中读取
         self.custom_font_path = os.path.join(self.fonts_dir, "simhei.ttf")
+        self.bundle = open_bundle(assets_dir)
         
-        # 尝试找到系统中支持中文的字体
-        self.system_fonts = self._find_system_fonts()
+    @property
+    def system_fonts(self):
+        """系统中可能支持中文的字体（第一次需要时才扫描，所有实例共享）"""
+        global _system_fonts_cache
+        if _system_fonts_cache is None:
+            _system_fonts_cache = self._find_system_fonts()
+        return _system_fonts_cache
         
     def _find_system_fonts(self):
         """寻找系统中可能支持中文的字体"""
@@ -54,9 +72,24 @@ class FontManager:
         return system_fonts
     
     def get_font(self, size, bold=False):
-        """获取支持中文的字体"""
-        # 首先尝试加载自定义字体
-        if os.path.exists(self.custom_font_path):
+        """获取支持中文的字体（按字号缓存Font对象）"""
+        key = (size, bold)
+        font = _font_cache.get(key)
+        if font is None:
+            font = self._load_font(size, bold)
+            _font_cache[key] = font
+        return font
+    
+    def _load_font(self, size, bold=False):
+        """加载支持中文的字体"""
+        # 首先尝试加载自定义字体：资源包中的或者字体目录中的
+        font_file = self.bundle.font_file("fonts/simhei.ttf") if self.bundle is not None else None
+        if font_file is not None:
+            try:
+                return pygame.font.Font(font_file, size)
+            except pygame.error:
+                pass
+        elif os.path.exists(self.custom_font_path):
             try:
                 return pygame.font.Font(self.custom_font_path, size)
             except:
@@ -78,6 +111,17 @@ class FontManager:
         return pygame.font.SysFont(None, size)
     
     def render_text(self, text, size, color, bold=False):
-        """渲染文本并返回Surface对象"""
-        font = self.get_font(size, bold)
-        return font.render(text, True, color)
+        """渲染文本并返回Surface对象（相同参数的文本直接复用缓存，调用者不应修改返回的Surface）"""
+        key = (text, size, color, bold)
+        surface = _text_cache.get(key)
+        if surface is not None:
+            _text_cache.move_to_end(key)
+            return surface
+        
+        with profiler.section("text"):
+            font = self.get_font(size, bold)
+            surface = font.render(text, True, color)
+        _text_cache[key] = surface
+        if len(_text_cache) > self.text_cache_size:
+            _text_cache.popitem(last=False)
+        return surface
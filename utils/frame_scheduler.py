@@ -0,0 +1,131 @@
+import time
+from array import array
+
+import pygame
+
+
+class FrameScheduler:
+    """主循环的帧调度：按画面状态选择刷新方式、控制帧间隔，并在持续超时时降低画质
+
+    画面在变化时（方块下落、对战）按 fps 满帧率运行，帧间隔用"先睡眠、最后 spin_ms 毫秒忙等"
+    的方式控制：比 clock.tick 的抖动小，又不像 tick_busy_loop 那样整帧占满CPU。
+    画面静止时（菜单、暂停、游戏结束）等待事件，最多 idle_wait_ms 毫秒刷新一次。
+
+    连续 overrun_frames 帧的工作耗时超过帧预算时，画质降一级（targets中对象的quality属性，
+    例如GameRenderer），连续 recover_frames 帧耗时低于预算的一半后再恢复一级。
+    """
+
+    def __init__(self, fps=60, idle_wait_ms=100, spin_ms=2.0, max_quality=2,
+                 overrun_frames=20, recover_frames=180, capacity=600):
+        self.frame_budget = 1.0 / fps  # 秒
+        self.idle_wait_ms = idle_wait_ms
+        self.spin = spin_ms / 1000.0
+        self.max_quality = max_quality
+        self.quality = max_quality
+        self.overrun_frames = overrun_frames
+        self.recover_frames = recover_frames
+        self.targets = []  # 画质随调度变化的对象（需要有quality属性）
+
+        self.idle = False  # 上一帧结束时画面是否静止
+        self._frame_start = time.perf_counter()
+        self._deadline = None  # 下一帧开始的目标时间；静止或刚恢复满帧率时为None
+        self._over_streak = 0
+        self._under_streak = 0
+
+        # 统计：最近capacity帧的工作耗时（毫秒，不含等待），超时帧数和画质调整次数
+        self.capacity = capacity
+        self._work = array("d", bytes(8 * capacity))
+        self._index = 0
+        self.frame_count = 0
+        self.overruns = 0
+        self.downgrades = 0
+        self.upgrades = 0
+
+    def add_target(self, target):
+        """登记一个随画质调整的对象，并立即同步当前画质"""
+        target.quality = self.quality
+        self.targets.append(target)
+
+    def wait(self):
+        """开始新的一帧：画面静止时先等待事件（等待不计入帧耗时），返回等到的事件，没有时为None"""
+        waited = pygame.event.wait(self.idle_wait_ms) if self.idle else None
+        self._frame_start = time.perf_counter()
+        if waited is not None and waited.type != pygame.NOEVENT:
+            return waited
+        return None
+
+    def poll_events(self, waited=None):
+        """取得本帧的事件（waited为wait()等到的事件，放在最前面）"""
+        events = pygame.event.get()
+        if waited is not None:
+            events.insert(0, waited)
+        return events
+
+    def end_frame(self, idle=False):
+        """结束一帧：记录耗时、调整画质，画面变化时等待到下一帧的开始时间"""
+        now = time.perf_counter()
+        work = now - self._frame_start
+        self._work[self._index] = work * 1000.0
+        self._index = (self._index + 1) % self.capacity
+        self.frame_count += 1
+
+        self.idle = idle
+        if idle:
+            # 静止画面不控制帧率，下一帧由 wait() 等待事件
+            self._deadline = None
+            return
+        self._adapt(work)
+
+        deadline = (self._deadline or self._frame_start) + self.frame_budget
+        if deadline <= now:
+            # 已经超时：从现在重新计时，不为追赶进度连续跑多帧
+            self._deadline = now
+            return
+        self._deadline = deadline
+        remaining = deadline - now
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.perf_counter() < deadline:
+            pass
+
+    def _adapt(self, work):
+        """根据连续超时或连续富余的帧数调整画质"""
+        budget = self.frame_budget
+        if work > budget:
+            self.overruns += 1
+            self._over_streak += 1
+            self._under_streak = 0
+            if self._over_streak >= self.overrun_frames and self.quality > 0:
+                self._set_quality(self.quality - 1)
+                self.downgrades += 1
+        else:
+            self._over_streak = 0
+            if work < budget / 2 and self.quality < self.max_quality:
+                self._under_streak += 1
+                if self._under_streak >= self.recover_frames:
+                    self._set_quality(self.quality + 1)
+                    self.upgrades += 1
+            else:
+                self._under_streak = 0
+
+    def _set_quality(self, quality):
+        self.quality = quality
+        self._over_streak = 0
+        self._under_streak = 0
+        for target in self.targets:
+            target.quality = quality
+
+    def stats(self):
+        """最近若干帧工作耗时的 p50/p95/p99/最大值（毫秒），以及超时帧数和当前画质"""
+        count = min(self.frame_count, self.capacity)
+        values = sorted(self._work[:count]) if count else [0.0]
+        last = len(values) - 1
+        return {
+            "p50": values[int(round(0.50 * last))],
+            "p95": values[int(round(0.95 * last))],
+            "p99": values[int(round(0.99 * last))],
+            "max": values[-1],
+            "budget": self.frame_budget * 1000.0,
+            "overruns": self.overruns,
+            "quality": self.quality,
+        }
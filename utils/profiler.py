@@ -0,0 +1,149 @@
+import csv
+import json
+import os
+import time
+from array import array
+
+
+class _NullSection:
+    """性能分析关闭时使用的空计时区段，进入和退出都不做任何事"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """可复用的计时区段，同一帧内多次进入时耗时累加"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """帧耗时分析器：记录每帧各阶段的耗时（毫秒）到环形缓冲区，并计算分位数统计"""
+
+    def __init__(self, capacity=600, enabled=False):
+        self.capacity = capacity  # 环形缓冲区保存的帧数
+        self.enabled = enabled
+        self.overlay_visible = False  # 是否显示屏幕调试信息
+        self._overlay_enabled = False  # 性能分析是否只是因为显示调试信息才开启的
+        self.phases = []  # 按首次出现顺序记录的阶段名称
+        self._columns = {}  # 阶段名称 -> 每帧耗时（毫秒）
+        self._sections = {}
+        self._current = {}
+        self._frame_start = 0.0
+        self._index = 0  # 下一帧写入的位置
+        self.frame_count = 0  # 已记录的总帧数
+
+    def section(self, name):
+        """返回指定阶段的计时区段，用法：with profiler.section("render"): ..."""
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def begin_frame(self):
+        """标记一帧开始"""
+        if self.enabled:
+            self._current = {}
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """标记一帧结束，把本帧各阶段耗时写入环形缓冲区"""
+        if not self.enabled:
+            return
+        current = self._current
+        current["frame"] = time.perf_counter() - self._frame_start
+        for name in current:
+            if name not in self._columns:
+                self.phases.append(name)
+                self._columns[name] = array("d", bytes(8 * self.capacity))
+        index = self._index
+        for name, column in self._columns.items():
+            column[index] = current.get(name, 0.0) * 1000.0
+        self._index = (index + 1) % self.capacity
+        self.frame_count += 1
+        self._current = {}
+
+    def toggle_overlay(self):
+        """切换屏幕调试信息，显示时自动开启性能分析，隐藏时关闭由此开启的性能分析"""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self._overlay_enabled = not self.enabled
+            self.enabled = True
+        elif self._overlay_enabled:
+            self._overlay_enabled = False
+            self.enabled = False
+
+    def samples(self, name):
+        """按时间顺序返回某阶段缓冲区内的耗时样本"""
+        column = self._columns.get(name)
+        if column is None:
+            return []
+        if self.frame_count < self.capacity:
+            return column[:self.frame_count].tolist()
+        return column[self._index:].tolist() + column[:self._index].tolist()
+
+    def stats(self):
+        """计算各阶段的 p50/p95/p99/平均耗时（毫秒）"""
+        result = {}
+        for name in self.phases:
+            values = sorted(self.samples(name))
+            if not values:
+                continue
+            last = len(values) - 1
+            result[name] = {
+                "p50": values[int(round(0.50 * last))],
+                "p95": values[int(round(0.95 * last))],
+                "p99": values[int(round(0.99 * last))],
+                "mean": sum(values) / len(values)
+            }
+        return result
+
+    def dump(self, path):
+        """导出缓冲区数据，扩展名为 .csv 时导出逐帧表格，否则导出JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.lower().endswith(".csv"):
+            columns = [self.samples(name) for name in self.phases]
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["index"] + self.phases)
+                first = self.frame_count - len(columns[0]) if columns else 0
+                for i, row in enumerate(zip(*columns)):
+                    writer.writerow([first + i] + [f"{value:.4f}" for value in row])
+        else:
+            with open(path, "w") as f:
+                json.dump({
+                    "frames": self.frame_count,
+                    "capacity": self.capacity,
+                    "stats": self.stats(),
+                    "samples": {name: self.samples(name) for name in self.phases}
+                }, f)
+
+
+# 全局分析器实例，由main.py根据环境变量 TETRIS_PROFILE 开启
+profiler = FrameProfiler()
@@ -0,0 +1,182 @@
+"""持久化设置：一个JSON配置文件，启动时读取一次，以只读快照的形式提供给各模块
+
+配置文件位置（按优先级）：
+    环境变量 TETRIS_CONFIG_DIR 指定的目录
+    Windows: %APPDATA%\\tetris
+    macOS:   ~/Library/Application Support/tetris
+    其他:    $XDG_CONFIG_HOME/tetris（默认 ~/.config/tetris）
+文件名为 settings.json，只需写出与默认值不同的项。
+
+修改设置会得到新的快照，写盘在最后一次修改 debounce 秒后进行（连续调整音量等只写一次），
+先写临时文件再原子地替换，写到一半退出也不会损坏原有的配置文件。
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+
+APP_NAME = "tetris"
+
+# 项目自带资源的目录（音效、音乐、字体）
+PROJECT_ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+
+def _platform_dir(windows_var, xdg_var, xdg_default):
+    """按平台约定返回应用目录（配置或数据）"""
+    if sys.platform == "win32":
+        base = os.environ.get(windows_var) or os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get(xdg_var) or os.path.expanduser(xdg_default)
+    return os.path.join(base, APP_NAME)
+
+
+def config_dir():
+    """配置文件所在的目录"""
+    return os.environ.get("TETRIS_CONFIG_DIR") or _platform_dir("APPDATA", "XDG_CONFIG_HOME", "~/.config")
+
+
+def default_data_dir():
+    """默认的数据目录（游戏历史等）"""
+    return _platform_dir("LOCALAPPDATA", "XDG_DATA_HOME", "~/.local/share")
+
+
+# 默认设置；值为None的路径在加载时解析为平台默认目录
+DEFAULT_SETTINGS = {
+    "sound_volume": 0.7,
+    "music_volume": 0.5,
+    "show_ghost": True,
+    "soft_drop_factor": 3,  # 软降时下落间隔除以该系数
+    "time_limit": None,  # 限时模式的时长(秒)，None表示使用规则表中的值
+    "key_repeat_ms": 200,  # 菜单中按住方向键时的重复间隔(毫秒)
+    "assets_dir": None,  # 资源目录，默认使用项目自带的assets
+    "data_dir": None,  # 数据目录，默认使用平台的应用数据目录
+    "window_size": [800, 680],  # 窗口大小，可以拖动调整
+    "fullscreen": False,  # 全屏（使用桌面分辨率）
+    "render_scaling": "native",  # native 按窗口分辨率绘制，smooth 放大逻辑分辨率的画面（见ui/layout.py）
+    "history_fsync": "batch",  # 游戏历史的fsync策略：always、batch或off（见analytics/history_store.py）
+    "telemetry": False,  # 记录逐个方块的遥测数据到数据目录的telemetry下（见analytics/telemetry.py）
+}
+
+
+class Settings:
+    """设置的只读快照：按属性读取，修改时用replace()得到新的快照"""
+    __slots__ = ("_values",)
+
+    def __init__(self, values):
+        object.__setattr__(self, "_values", dict(values))
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"没有名为 {name} 的设置") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("设置快照是只读的，请使用 replace() 或 SettingsStore.update()")
+
+    def replace(self, **changes):
+        """返回修改了部分项的新快照"""
+        unknown = set(changes) - set(self._values)
+        if unknown:
+            raise KeyError(f"未知的设置项: {', '.join(sorted(unknown))}")
+        return Settings({**self._values, **changes})
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+def _resolve(values):
+    """把为None的路径项解析为默认目录"""
+    values = dict(values)
+    values["assets_dir"] = values["assets_dir"] or PROJECT_ASSETS_DIR
+    values["data_dir"] = values["data_dir"] or default_data_dir()
+    return values
+
+
+class SettingsStore:
+    """设置文件的读写：current是当前的只读快照，update()修改后延迟写盘"""
+
+    def __init__(self, path=None, debounce=1.0):
+        self.path = path
+        self.debounce = debounce  # 最后一次修改后多久写盘(秒)
+        self._current = None
+        self._overrides = {}  # 与默认值不同、需要写入文件的项
+        self._lock = threading.Lock()
+        self._timer = None
+        self.writes = 0
+
+    @property
+    def current(self):
+        """当前设置的快照，第一次访问时读取配置文件"""
+        if self._current is None:
+            self.load()
+        return self._current
+
+    def load(self):
+        """读取配置文件（不存在或无法解析时使用默认值），返回快照"""
+        if self.path is None:
+            self.path = os.path.join(config_dir(), "settings.json")
+        overrides = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                overrides = {key: value for key, value in data.items() if key in DEFAULT_SETTINGS}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as error:
+            print(f"无法读取设置文件 {self.path}: {error}，使用默认设置")
+        self._overrides = overrides
+        self._current = Settings(_resolve({**DEFAULT_SETTINGS, **overrides}))
+        return self._current
+
+    def update(self, **changes):
+        """修改设置，返回新的快照；写盘在 debounce 秒内没有新的修改后进行"""
+        with self._lock:
+            self._current = self.current.replace(**changes)
+            self._overrides.update(changes)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return self._current
+
+    def flush(self):
+        """立即写入还未写盘的修改（退出游戏前调用）"""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            overrides = dict(self._overrides)
+        self._write(overrides)
+
+    def _write(self, overrides):
+        """写入临时文件后原子地替换配置文件"""
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(overrides, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self.writes += 1
+        except OSError as error:
+            print(f"无法保存设置文件 {self.path}: {error}")
+
+
+# 默认设置的快照，供不读取配置文件的场合使用（无界面的模拟、服务器）
+DEFAULTS = Settings(_resolve(DEFAULT_SETTINGS))
+
+# 全局设置，各模块共享
+settings_store = SettingsStore()